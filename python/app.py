@@ -1,298 +1,241 @@
 import logging
-from datetime import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-from slack_bolt import App, Ack
+from slack_bolt import App, Ack, BoltContext, BoltRequest, BoltResponse, Respond
+from slack_bolt.oauth.oauth_settings import OAuthSettings
 from slack_sdk import WebClient
-
-logging.basicConfig(level=logging.DEBUG)
-
-app = App()
-
-step1_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": ":wave: Select a category."},
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "static_select",
-                    "action_id": "helpdesk-request-modal-category-selection",
-                    "options": [
-                        {
-                            "text": {"type": "plain_text", "text": "Laptop"},
-                            "value": "laptop",
-                        },
-                        {
-                            "text": {"type": "plain_text", "text": "Mobile"},
-                            "value": "mobile",
-                        },
-                        {
-                            "text": {"type": "plain_text", "text": "Other"},
-                            "value": "other",
-                        },
-                    ],
-                }
-            ],
-        },
-    ],
-}
-step2_laptop_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your laptop.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "Laptop Replacement",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "laptop-model",
-            "label": {"type": "plain_text", "text": "Laptop Model"},
-            "element": {
-                "type": "static_select",
-                "action_id": "element",
-                "options": [
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "MacBook Pro (16-inch, 2019)",
-                        },
-                        "value": "MacBookPro16,1",
-                    },
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "MacBook Pro (13-inch, 2019, Two Thunderbolt 3 ports)",
-                        },
-                        "value": "MacBookPro15,4",
-                    },
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Surface Book 3 for Business",
-                        },
-                        "value": "SurfaceBook3",
-                    },
-                ],
-            },
-        },
-    ],
-}
-
-step2_mobile_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your mobile devices.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "Mobile Device Replacement",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "os",
-            "label": {"type": "plain_text", "text": "Mobile OS"},
-            "element": {
-                "type": "static_select",
-                "action_id": "element",
-                "placeholder": {"type": "plain_text", "text": "Select an item"},
-                "options": [
-                    {"text": {"type": "plain_text", "text": "iOS"}, "value": "ios"},
-                    {
-                        "text": {"type": "plain_text", "text": "Android"},
-                        "value": "android",
-                    },
-                ],
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "approver",
-            "label": {"type": "plain_text", "text": "Approver"},
-            "element": {
-                "type": "users_select",
-                "action_id": "element",
-                "placeholder": {"type": "plain_text", "text": "Select your approver"},
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "due-date",
-            "element": {"type": "datepicker", "action_id": "element"},
-            "label": {"type": "plain_text", "text": "Due date", "emoji": True},
-        },
-    ],
-}
-
-step2_other_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your This may be a bit rare one. Please share the details with us as much as possible.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "description",
-            "label": {"type": "plain_text", "text": "Description"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "multiline": True,
-            },
-        },
-    ],
-}
-
-
-@app.shortcut("new-helpdesk-request")
-def open_modal_step1(ack: Ack, body: dict, client: WebClient):
+from slack_sdk.oauth.installation_store.sqlite3 import SQLite3InstallationStore
+from slack_sdk.oauth.state_store.sqlite3 import SQLite3OAuthStateStore
+
+from helpdesk import logs
+from helpdesk.authorization import SCOPES, BotAuthorize, CachedInstallationStore
+from helpdesk.catalog import Catalogs
+from helpdesk.categories import CategoryRegistry
+from helpdesk.dedup import Deduplicator
+from helpdesk.metrics import Metrics
+from helpdesk.notifications import NotificationWorker
+from helpdesk.rate_limits import RateLimitScheduler
+from helpdesk.reports import CachedReport
+from helpdesk.server import AppServer
+from helpdesk.store import SubmissionStore
+from helpdesk.submissions import SubmissionParser
+from helpdesk.transport import ConnectionPool, PooledWebClient
+from helpdesk.users import UserCache
+from helpdesk.views import ViewRegistry
+
+# Non-blocking; set LOG_LEVEL, LOG_LEVELS, LOG_FORMAT=json, etc. for production
+log_listener = logs.configure_from_env()
+
+# Keep-alive connections to slack.com shared by all the API calls
+http_pool = ConnectionPool(
+    max_connections=int(os.environ.get("SLACK_API_MAX_CONNECTIONS", 10))
+)
+web_client = PooledWebClient(
+    token=os.environ.get("SLACK_BOT_TOKEN"),
+    base_url=os.environ.get("SLACK_API_URL", WebClient.BASE_URL),
+    pool=http_pool,
+)
+if os.environ.get("SLACK_CLIENT_ID"):
+    # Installed into any number of workspaces from /slack/install; requests
+    # get their workspace's bot token from the installations (in a TTL cache)
+    installations = CachedInstallationStore(
+        SQLite3InstallationStore(
+            database=os.environ.get("HELPDESK_DB", "helpdesk.db"),
+            client_id=os.environ["SLACK_CLIENT_ID"],
+        ),
+        ttl=float(os.environ.get("SLACK_INSTALLATION_CACHE_TTL", 600)),
+    )
+    authorization = dict(
+        authorize=BotAuthorize(
+            installations,
+            client_id=os.environ["SLACK_CLIENT_ID"],
+            client_secret=os.environ["SLACK_CLIENT_SECRET"],
+            client=web_client,
+        ),
+        oauth_settings=OAuthSettings(
+            client_id=os.environ["SLACK_CLIENT_ID"],
+            client_secret=os.environ["SLACK_CLIENT_SECRET"],
+            scopes=os.environ.get("SLACK_SCOPES", SCOPES),
+            installation_store=installations,
+            state_store=SQLite3OAuthStateStore(
+                database=os.environ.get("HELPDESK_DB", "helpdesk.db"),
+                expiration_seconds=600,
+            ),
+        ),
+    )
+else:
+    # A single workspace's SLACK_BOT_TOKEN. SLACK_TOKEN_VERIFICATION=false
+    # skips the auth.test call while booting; Bolt makes it on the first
+    # request instead (see serverless_app.py)
+    authorization = dict(
+        token_verification_enabled=os.environ.get("SLACK_TOKEN_VERIFICATION") != "false"
+    )
+app = App(
+    client=web_client,
+    **authorization,
+    # Listeners respond right after ack() and leave API calls to lazy functions,
+    # which run in this executor (at most DEFERRED_WORK_CONCURRENCY at a time)
+    process_before_response=True,
+    listener_executor=ThreadPoolExecutor(
+        max_workers=int(os.environ.get("DEFERRED_WORK_CONCURRENCY", 10)),
+        thread_name_prefix="deferred-work",
+    ),
+)
+
+# The modal definitions are shared with the JavaScript app (../src/modals)
+views = ViewRegistry()
+# Each category's step2 modal; the step1 select lists these categories
+categories = CategoryRegistry(views)
+categories.register_step1()
+
+submissions = SubmissionParser(categories.fields)
+# Search indexes for the external_selects, built from ./catalogs/<block_id>.csv
+catalogs = Catalogs()
+users = UserCache()
+notifications = NotificationWorker(users=users, digests=categories.digests)
+store = SubmissionStore(os.environ.get("HELPDESK_DB", "helpdesk.db"))
+# Per-workspace aggregates for /helpdesk-report, updated with new submissions
+report = CachedReport(store)
+rate_limits = RateLimitScheduler()
+deliveries = Deduplicator()
+
+if app.oauth_flow is not None:
+    # Deleting an uninstalled workspace's installation drops its cached bot
+    app.enable_token_revocation_listeners()
+
+# Served on /metrics in the Prometheus text format
+metrics = Metrics()
+metrics.register_rate_limits(rate_limits)
+metrics.register_deduplicator(deliveries)
+metrics.register_notifications(notifications)
+metrics.register_cache("user_cache", users)
+if os.environ.get("SLACK_CLIENT_ID"):
+    metrics.register_cache("installation_cache", installations)
+
+
+@app.middleware
+def ignore_duplicate_deliveries(
+    body: dict, request: BoltRequest, next, logger: logging.Logger
+):
+    # A lazy listener run on its own (serverless_app.py) is not a new delivery
+    if not request.lazy_only and deliveries.is_duplicate(body):
+        # Acknowledging without running the listeners again
+        logger.debug(
+            "Skipped a duplicate delivery", extra={"deliveries": deliveries.stats()}
+        )
+        return BoltResponse(status=200, body="")
+    next()
+
+
+@app.error
+def release_failed_delivery(error: Exception, body: dict, logger: logging.Logger):
+    logger.exception(f"Failed to run listener function (error: {error})")
+    # Slack's retry (if any) should run the listeners again
+    deliveries.release(body)
+
+
+@app.middleware
+def use_rate_limited_client(context: BoltContext, next):
+    # All the API calls made by listeners go through the scheduler
+    context["client"] = rate_limits.client(context.client, pool=http_pool)
+    # say() etc. created for earlier middleware hold the previous client
+    # (and its session, which lazy listeners' copies of the request cannot hold)
+    for name in ("say", "complete", "fail"):
+        context.pop(name, None)
+    next()
+
+
+def ack_immediately(ack: Ack):
     ack()
-    res = client.views_open(trigger_id=body["trigger_id"], view=step1_modal)
 
 
-@app.action("helpdesk-request-modal-category-selection")
-def show_modal_step2(ack: Ack, body: dict, action: dict, client: WebClient):
-    ack()
-    category = action["selected_option"]["value"]
-    view = {}
-    if category == "laptop":
-        view = step2_laptop_modal
-    elif category == "mobile":
-        view = step2_mobile_modal
-    else:
-        view = step2_other_modal
+@metrics.timed
+def open_modal_step1(body: dict, client: WebClient):
+    res = client.views_open(trigger_id=body["trigger_id"], view=views.payload("step1"))
+
+
+app.shortcut("new-helpdesk-request")(ack=ack_immediately, lazy=[open_modal_step1])
+
+
+@metrics.timed
+def show_modal_step2(body: dict, action: dict, client: WebClient):
+    view = categories.step2_payload(action["selected_option"]["value"])
     res = client.views_update(
         view_id=body["view"]["id"], hash=body["view"]["hash"], view=view
     )
 
 
-@app.action("helpdesk-request-modal-reset")
-def show_modal_step1_again(ack: Ack, body: dict, client: WebClient):
-    ack()
+app.action("helpdesk-request-modal-category-selection")(
+    ack=ack_immediately, lazy=[show_modal_step2]
+)
+
+
+@metrics.timed
+def show_modal_step1_again(body: dict, client: WebClient):
     res = client.views_update(
-        view_id=body["view"]["id"], hash=body["view"]["hash"], view=step1_modal
+        view_id=body["view"]["id"],
+        hash=body["view"]["hash"],
+        view=views.payload("step1"),
     )
 
 
-@app.view("helpdesk-request-modal")
-def accept_view_submission(ack: Ack, body: dict, logger: logging.Logger):
-    values = body["view"]["state"]["values"]
-    actionId = "element"
-    title = values["title"][actionId]["value"] if "title" in values else None
-    laptop_model = (
-        values["laptop-model"][actionId]["selected_option"]["value"]
-        if "laptop-model" in values
-        else None
-    )
-    os = values["os"][actionId]["selected_option"]["value"] if "os" in values else None
-    description = (
-        values["description"][actionId]["value"] if "description" in values else None
-    )
-    due_date = (
-        values["due-date"][actionId]["selected_date"] if "due-date" in values else None
-    )
-    approver = (
-        values["approver"][actionId]["selected_user"] if "approver" in values else None
-    )
+app.action("helpdesk-request-modal-reset")(
+    ack=ack_immediately, lazy=[show_modal_step1_again]
+)
+
+
+@metrics.timed
+def respond_with_report(respond: Respond, context: BoltContext):
+    # Only the requesting workspace's submissions
+    respond(text=report.message(context.team_id))
+
 
-    errors = {}
-    if title is not None and len(title) <= 5:
-        errors["title"] = "Title must be longer than 5 characters"
-    if (
-        due_date is not None
-        and datetime.strptime(due_date, "%Y-%m-%d") <= datetime.today()
-    ):
-        errors["due-date"] = "Due date must be in the future"
+app.command("/helpdesk-report")(ack=ack_immediately, lazy=[respond_with_report])
 
+
+@app.options("element")
+@metrics.timed
+def suggest_options(ack: Ack, payload: dict):
+    # Called for every keystroke in the menu, so this has to answer fast
+    ack(options=catalogs.options(payload["block_id"], payload["value"]))
+
+
+@app.view("helpdesk-request-modal")
+@metrics.timed
+def accept_view_submission(
+    ack: Ack,
+    body: dict,
+    client: WebClient,
+    context: BoltContext,
+    logger: logging.Logger,
+):
+    request = submissions.parse(
+        body["view"],
+        user_id=body["user"]["id"],
+        team_id=context.team_id,
+        enterprise_id=context.enterprise_id,
+    )
+    errors = submissions.validate(request)
     if len(errors) > 0:
         ack(response_action="errors", errors=errors)
         return
 
     ack()
 
-    logger.info(
-        f"title: {title}, "
-        f"laptop_model: {laptop_model}, "
-        f"os: {os}, "
-        f"description: {description}, "
-        f"due_date: {due_date}, "
-        f"approver: {approver}"
-    )
+    # The request is turned into JSON on the logging thread, if at all
+    logger.info("Accepted a submission", extra={"submission": request})
+    # Sending notifications to the helpdesk channel, the submitter, and the approver
+    notifications.submit(client, request)
+    store.add(request)
 
 
 if __name__ == "__main__":
-    app.start(port=3000)
+    # Slack's requests on /slack/events, and metrics for Prometheus to scrape
+    port = int(os.environ.get("PORT", 3000))
+    AppServer(
+        app,
+        port=port,
+        pages={"/metrics": metrics.render},
+        response_seconds=metrics.ack_seconds,
+    ).start()
@@ -1,320 +1,376 @@
+import asyncio
 import os
 import logging
-from datetime import datetime
+import multiprocessing
+import time
 
-from slack_bolt.async_app import AsyncApp, AsyncAck
+from slack_bolt import BoltResponse
+from slack_bolt.async_app import AsyncApp, AsyncAck, AsyncBoltContext, AsyncRespond
 from slack_bolt.adapter.sanic import AsyncSlackRequestHandler
+from slack_bolt.adapter.sanic.async_handler import (
+    to_async_bolt_request,
+    to_sanic_response,
+)
+from slack_bolt.oauth.async_oauth_settings import AsyncOAuthSettings
+from slack_sdk.oauth.installation_store.sqlite3 import SQLite3InstallationStore
+from slack_sdk.oauth.state_store.sqlite3 import SQLite3OAuthStateStore
 from slack_sdk.web.async_client import AsyncWebClient
 
-logging.basicConfig(level=logging.DEBUG)
-
-app = AsyncApp()
-
-step1_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": ":wave: Select a category."},
-        },
-        {
-            "type": "actions",
-            "elements": [
-                {
-                    "type": "static_select",
-                    "action_id": "helpdesk-request-modal-category-selection",
-                    "options": [
-                        {
-                            "text": {"type": "plain_text", "text": "Laptop"},
-                            "value": "laptop",
-                        },
-                        {
-                            "text": {"type": "plain_text", "text": "Mobile"},
-                            "value": "mobile",
-                        },
-                        {
-                            "text": {"type": "plain_text", "text": "Other"},
-                            "value": "other",
-                        },
-                    ],
-                }
-            ],
-        },
-    ],
-}
-step2_laptop_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your laptop.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "Laptop Replacement",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "laptop-model",
-            "label": {"type": "plain_text", "text": "Laptop Model"},
-            "element": {
-                "type": "static_select",
-                "action_id": "element",
-                "options": [
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "MacBook Pro (16-inch, 2019)",
-                        },
-                        "value": "MacBookPro16,1",
-                    },
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "MacBook Pro (13-inch, 2019, Two Thunderbolt 3 ports)",
-                        },
-                        "value": "MacBookPro15,4",
-                    },
-                    {
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Surface Book 3 for Business",
-                        },
-                        "value": "SurfaceBook3",
-                    },
-                ],
-            },
-        },
-    ],
-}
-
-step2_mobile_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your mobile devices.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "Mobile Device Replacement",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "os",
-            "label": {"type": "plain_text", "text": "Mobile OS"},
-            "element": {
-                "type": "static_select",
-                "action_id": "element",
-                "placeholder": {"type": "plain_text", "text": "Select an item"},
-                "options": [
-                    {"text": {"type": "plain_text", "text": "iOS"}, "value": "ios"},
-                    {
-                        "text": {"type": "plain_text", "text": "Android"},
-                        "value": "android",
-                    },
-                ],
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "approver",
-            "label": {"type": "plain_text", "text": "Approver"},
-            "element": {
-                "type": "users_select",
-                "action_id": "element",
-                "placeholder": {"type": "plain_text", "text": "Select your approver"},
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "due-date",
-            "element": {"type": "datepicker", "action_id": "element"},
-            "label": {"type": "plain_text", "text": "Due date", "emoji": True},
-        },
-    ],
-}
-
-step2_other_modal = {
-    "type": "modal",
-    "callback_id": "helpdesk-request-modal",
-    "title": {"type": "plain_text", "text": "Helpdesk Request"},
-    "submit": {"type": "plain_text", "text": "Submit"},
-    "close": {"type": "plain_text", "text": "Close"},
-    "blocks": [
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "You're making a request on your This may be a bit rare one. Please share the details with us as much as possible.",
-            },
-            "accessory": {
-                "type": "button",
-                "action_id": "helpdesk-request-modal-reset",
-                "text": {"type": "plain_text", "text": "Back"},
-                "value": "1",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "title",
-            "label": {"type": "plain_text", "text": "Title"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "initial_value": "",
-            },
-        },
-        {
-            "type": "input",
-            "block_id": "description",
-            "label": {"type": "plain_text", "text": "Description"},
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "element",
-                "multiline": True,
-            },
-        },
-    ],
-}
-
-
-@app.shortcut("new-helpdesk-request")
-async def open_modal_step1(ack: AsyncAck, body: dict, client: AsyncWebClient):
-    await ack()
-    res = await client.views_open(trigger_id=body["trigger_id"], view=step1_modal)
+from helpdesk import logs
+from helpdesk.async_authorization import AsyncBotAuthorize
+from helpdesk.async_dedup import AsyncDeduplicator
+from helpdesk.async_rate_limits import AsyncRateLimitScheduler
+from helpdesk.authorization import SCOPES, CachedInstallationStore
+from helpdesk.catalog import Catalogs
+from helpdesk.categories import CategoryRegistry
+from helpdesk.dedup import SQLiteDeliveryStore
+from helpdesk.deferred import AsyncDeferredWork
+from helpdesk.home import AsyncHomeTabPublisher, HomeTabs
+from helpdesk.ingress import Ingress
+from helpdesk.instrumentation import observe_response
+from helpdesk.metrics import Metrics
+from helpdesk.notifications import AsyncNotificationWorker
+from helpdesk.rate_limits import METHOD_RATES
+from helpdesk.reports import CachedReport
+from helpdesk.store import SubmissionStore
+from helpdesk.submissions import SubmissionParser
+from helpdesk.transport import create_session
+from helpdesk.users import AsyncUserCache, SharedCache
+from helpdesk.views import ViewRegistry
 
+# Non-blocking; set LOG_LEVEL, LOG_LEVELS, LOG_FORMAT=json, etc. for production
+logs.configure_from_env()
 
-@app.action("helpdesk-request-modal-category-selection")
-async def show_modal_step2(
-    ack: AsyncAck, body: dict, action: dict, client: AsyncWebClient
-):
+# The number of Sanic worker processes
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+web_client = AsyncWebClient(
+    token=os.environ.get("SLACK_BOT_TOKEN"),
+    base_url=os.environ.get("SLACK_API_URL", AsyncWebClient.BASE_URL),
+)
+authorization = {}
+if os.environ.get("SLACK_CLIENT_ID"):
+    # The same as app.py; each worker process has its own cache
+    installations = CachedInstallationStore(
+        SQLite3InstallationStore(
+            database=os.environ.get("HELPDESK_DB", "helpdesk.db"),
+            client_id=os.environ["SLACK_CLIENT_ID"],
+        ),
+        ttl=float(os.environ.get("SLACK_INSTALLATION_CACHE_TTL", 600)),
+    )
+    authorization = dict(
+        authorize=AsyncBotAuthorize(
+            installations,
+            client_id=os.environ["SLACK_CLIENT_ID"],
+            client_secret=os.environ["SLACK_CLIENT_SECRET"],
+            client=web_client,
+        ),
+        oauth_settings=AsyncOAuthSettings(
+            client_id=os.environ["SLACK_CLIENT_ID"],
+            client_secret=os.environ["SLACK_CLIENT_SECRET"],
+            scopes=os.environ.get("SLACK_SCOPES", SCOPES),
+            installation_store=installations,
+            state_store=SQLite3OAuthStateStore(
+                database=os.environ.get("HELPDESK_DB", "helpdesk.db"),
+                expiration_seconds=600,
+            ),
+        ),
+    )
+app = AsyncApp(
+    client=web_client,
+    **authorization,
+    # Requests are verified by the ingress in front of the endpoint
+    request_verification_enabled=False,
+    # Listeners respond right after ack() and leave API calls to lazy functions
+    process_before_response=True,
+)
+
+# The modal definitions are shared with the JavaScript app (../src/modals)
+views = ViewRegistry()
+# Each category's step2 modal; the step1 select lists these categories
+categories = CategoryRegistry(views)
+categories.register_step1()
+
+submissions = SubmissionParser(categories.fields)
+# Search indexes for the external_selects, built from ./catalogs/<block_id>.csv
+catalogs = Catalogs()
+users = AsyncUserCache()
+notifications = AsyncNotificationWorker(users=users, digests=categories.digests)
+store = SubmissionStore(os.environ.get("HELPDESK_DB", "helpdesk.db"))
+# Other workers write to the same store, so cached Home tabs are reloaded
+# before the (debounced) publish
+home_tabs = HomeTabs(store, max_age=None if WORKERS == 1 else 1.0)
+home_tab_publisher = AsyncHomeTabPublisher(home_tabs)
+# Per-workspace aggregates for /helpdesk-report, updated with the new
+# submissions only (including the other workers')
+report = CachedReport(store)
+# Workers see each other's deliveries through the database
+deliveries = AsyncDeduplicator(
+    SQLiteDeliveryStore(os.environ.get("HELPDESK_DB", "helpdesk.db"))
+    if WORKERS > 1
+    else None
+)
+# Each worker schedules its calls within its share of the rate limits
+deferred_work = AsyncDeferredWork(
+    max_concurrency=int(os.environ.get("DEFERRED_WORK_CONCURRENCY", 10))
+)
+rate_limits = AsyncRateLimitScheduler(
+    method_rates={method: rate / WORKERS for method, rate in METHOD_RATES.items()}
+)
+
+if app.oauth_flow is not None:
+    # Deleting an uninstalled workspace's installation drops its cached bot
+    app.enable_token_revocation_listeners()
+
+# Served on /metrics in the Prometheus text format
+metrics = Metrics()
+metrics.register_rate_limits(rate_limits)
+metrics.register_deduplicator(deliveries)
+metrics.register_notifications(notifications)
+metrics.register_cache("user_cache", users)
+if os.environ.get("SLACK_CLIENT_ID"):
+    metrics.register_cache("installation_cache", installations)
+
+
+@app.middleware
+async def ignore_duplicate_deliveries(body: dict, next, logger: logging.Logger):
+    if await deliveries.is_duplicate(body):
+        # Acknowledging without running the listeners again
+        logger.debug(
+            "Skipped a duplicate delivery", extra={"deliveries": deliveries.stats()}
+        )
+        return BoltResponse(status=200, body="")
+    await next()
+
+
+@app.error
+async def release_failed_delivery(error: Exception, body: dict, logger: logging.Logger):
+    logger.exception(f"Failed to run listener function (error: {error})")
+    # Slack's retry (if any) should run the listeners again
+    await deliveries.release(body)
+
+
+@app.middleware
+async def use_rate_limited_client(context: AsyncBoltContext, next):
+    # All the API calls made by listeners go through the scheduler
+    context["client"] = rate_limits.client(context.client)
+    # say() etc. created for earlier middleware hold the previous client
+    # (and its session, which lazy listeners' copies of the request cannot hold)
+    for name in ("say", "complete", "fail"):
+        context.pop(name, None)
+    await next()
+
+
+async def ack_immediately(ack: AsyncAck):
     await ack()
-    category = action["selected_option"]["value"]
-    view = {}
-    if category == "laptop":
-        view = step2_laptop_modal
-    elif category == "mobile":
-        view = step2_mobile_modal
-    else:
-        view = step2_other_modal
+
+
+@deferred_work
+@metrics.timed
+async def open_modal_step1(body: dict, client: AsyncWebClient):
+    res = await client.views_open(
+        trigger_id=body["trigger_id"], view=views.payload("step1")
+    )
+
+
+app.shortcut("new-helpdesk-request")(ack=ack_immediately, lazy=[open_modal_step1])
+
+
+@deferred_work
+@metrics.timed
+async def show_modal_step2(body: dict, action: dict, client: AsyncWebClient):
+    view = categories.step2_payload(action["selected_option"]["value"])
     res = await client.views_update(
         view_id=body["view"]["id"], hash=body["view"]["hash"], view=view
     )
 
 
-@app.action("helpdesk-request-modal-reset")
-async def show_modal_step1_again(ack: AsyncAck, body: dict, client: AsyncWebClient):
-    await ack()
+app.action("helpdesk-request-modal-category-selection")(
+    ack=ack_immediately, lazy=[show_modal_step2]
+)
+
+
+@deferred_work
+@metrics.timed
+async def show_modal_step1_again(body: dict, client: AsyncWebClient):
     res = await client.views_update(
-        view_id=body["view"]["id"], hash=body["view"]["hash"], view=step1_modal
+        view_id=body["view"]["id"],
+        hash=body["view"]["hash"],
+        view=views.payload("step1"),
     )
 
 
-@app.view("helpdesk-request-modal")
-async def accept_view_submission(ack: AsyncAck, body: dict, logger: logging.Logger):
-    values = body["view"]["state"]["values"]
-    actionId = "element"
-    title = values["title"][actionId]["value"] if "title" in values else None
-    laptop_model = (
-        values["laptop-model"][actionId]["selected_option"]["value"]
-        if "laptop-model" in values
-        else None
-    )
-    os = values["os"][actionId]["selected_option"]["value"] if "os" in values else None
-    description = (
-        values["description"][actionId]["value"] if "description" in values else None
-    )
-    due_date = (
-        values["due-date"][actionId]["selected_date"] if "due-date" in values else None
-    )
-    approver = (
-        values["approver"][actionId]["selected_user"] if "approver" in values else None
+app.action("helpdesk-request-modal-reset")(
+    ack=ack_immediately, lazy=[show_modal_step1_again]
+)
+
+
+@deferred_work
+@metrics.timed
+async def respond_with_report(respond: AsyncRespond, context: AsyncBoltContext):
+    # Only the requesting workspace's submissions; reading the rows added
+    # since the last report would block the event loop
+    message = await asyncio.get_running_loop().run_in_executor(
+        None, report.message, context.team_id
     )
+    await respond(text=message)
+
 
-    errors = {}
-    if title is not None and len(title) <= 5:
-        errors["title"] = "Title must be longer than 5 characters"
-    if (
-        due_date is not None
-        and datetime.strptime(due_date, "%Y-%m-%d") <= datetime.today()
-    ):
-        errors["due-date"] = "Due date must be in the future"
+app.command("/helpdesk-report")(ack=ack_immediately, lazy=[respond_with_report])
 
+
+@app.options("element")
+@metrics.timed
+async def suggest_options(ack: AsyncAck, payload: dict):
+    # Called for every keystroke in the menu, so this has to answer fast
+    await ack(options=catalogs.options(payload["block_id"], payload["value"]))
+
+
+@metrics.timed
+async def accept_view_submission(
+    ack: AsyncAck,
+    body: dict,
+    context: AsyncBoltContext,
+    logger: logging.Logger,
+):
+    request = submissions.parse(
+        body["view"],
+        user_id=body["user"]["id"],
+        team_id=context.team_id,
+        enterprise_id=context.enterprise_id,
+    )
+    errors = submissions.validate(request)
     if len(errors) > 0:
         await ack(response_action="errors", errors=errors)
         return
 
     await ack()
 
-    logger.info(
-        f"title: {title}, "
-        f"laptop_model: {laptop_model}, "
-        f"os: {os}, "
-        f"description: {description}, "
-        f"due_date: {due_date}, "
-        f"approver: {approver}"
-    )
+    # The request is turned into JSON on the logging thread, if at all
+    logger.info("Accepted a submission", extra={"submission": request})
+    # Handed over to record_submission, which runs after the response
+    context["submission"] = request
+
+
+@metrics.timed
+async def record_submission(client: AsyncWebClient, context: AsyncBoltContext):
+    request = context.get("submission")
+    if request is None:
+        # Not accepted (the modal shows the errors)
+        return
+    # Sending notifications to the helpdesk channel, the submitter, and the approver
+    notifications.submit(client, request)
+    # Updating the submitter's Home tab with the up-to-date list of requests
+    # (the cached tab is loaded from the store, in an executor, before this
+    # request is added)
+    await asyncio.get_running_loop().run_in_executor(None, home_tabs.add, request)
+    store.add(request)
+    home_tab_publisher.refresh(client, context.team_id, request.user_id)
+
+
+app.view("helpdesk-request-modal")(ack=accept_view_submission, lazy=[record_submission])
+
+
+@app.event("app_home_opened")
+@metrics.timed
+async def update_home_tab(
+    event: dict, client: AsyncWebClient, context: AsyncBoltContext
+):
+    home_tab_publisher.refresh(client, context.team_id, event["user"])
 
 
 from sanic import Sanic
 from sanic.request import Request
+from sanic.response import text
 
 api = Sanic(name="awesome-slack-app")
 app_handler = AsyncSlackRequestHandler(app)
 
 
+@api.main_process_start
+async def start_shared_state(*args):
+    if WORKERS > 1:
+        # Workers share the DM channels they opened through
+        # a manager process (a local socket) in front of their own caches
+        api.ctx.manager = multiprocessing.Manager()
+        api.shared_ctx.user_cache = api.ctx.manager.dict()
+
+
+@api.main_process_stop
+async def stop_shared_state(*args):
+    if hasattr(api.ctx, "manager"):
+        api.ctx.manager.shutdown()
+
+
+@api.listener("before_server_start")
+async def start_ingress(*args):
+    # Fails to start without SLACK_SIGNING_SECRET (Socket Mode needs none)
+    api.ctx.ingress = Ingress(
+        os.environ.get("SLACK_SIGNING_SECRET", ""),
+        # The interactivity payload types the listeners above handle
+        handled_types=(
+            "shortcut",
+            "block_actions",
+            "block_suggestion",
+            "view_submission",
+        ),
+    )
+    metrics.register_ingress(api.ctx.ingress)
+
+
+@api.listener("before_server_start")
+async def open_http_session(*args):
+    # A single aiohttp session (connection pool) reused by every AsyncWebClient
+    app.client.session = create_session(
+        limit=int(os.environ.get("SLACK_API_MAX_CONNECTIONS", 100)),
+        limit_per_host=int(os.environ.get("SLACK_API_MAX_CONNECTIONS_PER_HOST", 10)),
+    )
+    if hasattr(api.shared_ctx, "user_cache"):
+        users.shared = SharedCache(api.shared_ctx.user_cache)
+
+
+@api.listener("after_server_stop")
+async def close_http_session(*args):
+    if app.client.session is not None:
+        await app.client.session.close()
+
+
 @api.post("/slack/events")
 async def endpoint(req: Request):
+    started = time.perf_counter()
+    screened = api.ctx.ingress.screen(req.body, req.headers)
+    if screened is not None:
+        return to_sanic_response(screened)
+    # What app_handler.handle() does for a POST, timed until the response
+    request = to_async_bolt_request(req)
+    response = await app.async_dispatch(request)
+    observe_response(metrics.ack_seconds, request, started)
+    return to_sanic_response(response)
+
+
+@api.get("/slack/install")
+async def install(req: Request):
+    return await app_handler.handle(req)
+
+
+@api.get("/slack/oauth_redirect")
+async def oauth_redirect(req: Request):
     return await app_handler.handle(req)
 
 
+@api.get("/metrics")
+async def metrics_endpoint(req: Request):
+    # Each worker process has its own; scrape each one (or run a single worker)
+    return text(metrics.render(), content_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
-    api.run(host="0.0.0.0", port=int(os.environ.get("PORT", 3000)))
+    api.run(host="0.0.0.0", port=int(os.environ.get("PORT", 3000)), workers=WORKERS)
 
 
 # pip install -r requirements.txt
 # export SLACK_SIGNING_SECRET=***
 # export SLACK_BOT_TOKEN=xoxb-***
+# (or SLACK_CLIENT_ID and SLACK_CLIENT_SECRET, then open /slack/install)
+# WEB_CONCURRENCY=4 python async_app.py
 # uvicorn async_app:api --reload --port 3000 --log-level debug
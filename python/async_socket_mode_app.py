@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from aiohttp import web
+
+from async_app import app, metrics
+from helpdesk.async_socket_mode import AsyncSocketModeRunner
+from helpdesk.transport import create_session
+
+# The same listeners as async_app.py, receiving requests over WebSocket
+# connections instead of on a public HTTP endpoint
+runner = AsyncSocketModeRunner(
+    app,
+    app_token=os.environ["SLACK_APP_TOKEN"],
+    connections=int(os.environ.get("SOCKET_MODE_CONNECTIONS", 2)),
+    # Tasks running the listeners, whatever the number of connections
+    concurrency=int(os.environ.get("SOCKET_MODE_CONCURRENCY", 10)),
+    # Each envelope's acknowledgement is its response to Slack
+    ack_seconds=metrics.ack_seconds,
+)
+
+
+async def metrics_endpoint(request: web.Request) -> web.Response:
+    return web.Response(
+        body=metrics.render(), headers={"Content-Type": "text/plain; version=0.0.4"}
+    )
+
+
+async def start_metrics_server() -> web.AppRunner:
+    # No requests from Slack over HTTP; only /metrics for Prometheus to scrape
+    server = web.Application()
+    server.router.add_get("/metrics", metrics_endpoint)
+    server_runner = web.AppRunner(server, access_log=None)
+    await server_runner.setup()
+    port = int(os.environ.get("PORT", 3000))
+    await web.TCPSite(server_runner, "0.0.0.0", port).start()
+    return server_runner
+
+
+async def main():
+    # What async_app.py's Sanic server does before starting
+    app.client.session = create_session(
+        limit=int(os.environ.get("SLACK_API_MAX_CONNECTIONS", 100)),
+        limit_per_host=int(os.environ.get("SLACK_API_MAX_CONNECTIONS_PER_HOST", 10)),
+    )
+    metrics_server = await start_metrics_server()
+    try:
+        await runner.start()
+    finally:
+        await runner.close()
+        await metrics_server.cleanup()
+        await app.client.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+# export SLACK_APP_TOKEN=xapp-***
+# export SLACK_BOT_TOKEN=xoxb-***
+# python async_socket_mode_app.py
@@ -0,0 +1,125 @@
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from slack_bolt import BoltContext  # noqa: E402
+from slack_bolt.authorization.authorize import InstallationStoreAuthorize  # noqa
+from slack_sdk import WebClient  # noqa: E402
+from slack_sdk.oauth.installation_store import Installation  # noqa: E402
+from slack_sdk.oauth.installation_store.sqlite3 import (  # noqa: E402
+    SQLite3InstallationStore,
+)
+
+from benchmarks.bench_transport import report  # noqa: E402
+from benchmarks.fake_slack import FakeSlackAPI  # noqa: E402
+from helpdesk.authorization import BotAuthorize, CachedInstallationStore  # noqa
+
+CLIENT_ID = "111.222"
+
+
+def install(store: SQLite3InstallationStore, workspaces: int) -> None:
+    for i in range(workspaces):
+        store.save(
+            Installation(
+                app_id="A111",
+                team_id=f"T{i:06d}",
+                user_id="U111",
+                bot_token=f"xoxb-{i}",
+                bot_id=f"B{i:06d}",
+                bot_user_id=f"U{i:06d}",
+                bot_scopes="commands,chat:write,chat:write.public,im:write",
+                installed_at=time.time(),
+            )
+        )
+
+
+def run(authorize: Callable, client: WebClient, team_ids: List[str]) -> List[float]:
+    latencies = []
+    for team_id in team_ids:
+        context = BoltContext(client=client, team_id=team_id, user_id="U222")
+        started = time.perf_counter()
+        result = authorize(
+            context=context, enterprise_id=None, team_id=team_id, user_id="U222"
+        )
+        latencies.append(time.perf_counter() - started)
+        assert result is not None and result.bot_token is not None
+    return latencies
+
+
+def main(workspaces: int = 5000, requests: int = 50_000, latency: float = 0.05):
+    workspaces, requests = int(workspaces), int(requests)
+    api = FakeSlackAPI(latency=latency).start()
+    client = WebClient(base_url=api.url)
+    logger = logging.getLogger(__name__)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLite3InstallationStore(
+            database=os.path.join(tmp, "helpdesk.db"), client_id=CLIENT_ID
+        )
+        started = time.perf_counter()
+        install(store, workspaces)
+        print(
+            f"{workspaces:,} workspaces installed in "
+            f"{time.perf_counter() - started:.1f}s; requests from random ones, "
+            f"auth.test takes {latency * 1000:g} ms"
+        )
+        # A few busy workspaces send most of the requests
+        team_ids = [
+            f"T{min(int(random.paretovariate(1.2)) - 1, workspaces - 1):06d}"
+            for _ in range(requests)
+        ] + [f"T{i:06d}" for i in random.sample(range(workspaces), workspaces)]
+        random.shuffle(team_ids)
+
+        def measure(name: str, authorize: Callable, count: int) -> None:
+            calls = api.stats()["calls"].get("auth.test", 0)
+            latencies = run(authorize, client, team_ids[:count])
+            calls = api.stats()["calls"].get("auth.test", 0) - calls
+            report(name, latencies)
+            print(f"{'':>30}{len(latencies):,} requests, {calls:,} auth.test calls")
+
+        # Bolt's default authorize with oauth_settings
+        measure(
+            "InstallationStoreAuthorize",
+            InstallationStoreAuthorize(logger=logger, installation_store=store),
+            200,
+        )
+        measure(
+            "  cache_enabled, bot_only",
+            InstallationStoreAuthorize(
+                logger=logger,
+                installation_store=store,
+                bot_only=True,
+                cache_enabled=True,
+            ),
+            2000,
+        )
+        measure("BotAuthorize", BotAuthorize(store), 2000)
+        installations = CachedInstallationStore(store)
+        authorize = BotAuthorize(installations)
+        measure("  CachedInstallationStore", authorize, len(team_ids))
+        measure("  (all cached)", authorize, len(team_ids))
+        print(f"{'':>30}{installations.stats()}")
+
+        tracemalloc.start()
+        installations = CachedInstallationStore(store)
+        for i in range(workspaces):
+            installations.find_bot(enterprise_id=None, team_id=f"T{i:06d}")
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"The cache of {workspaces:,} bots takes {size / 1024 / 1024:.1f} MiB "
+            f"({size / workspaces:,.0f} bytes each)"
+        )
+    api.stop()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:4]))
+
+# python benchmarks/bench_authorization.py [workspaces] [requests] [latency]
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.catalog import MAX_OPTIONS, SearchIndex  # noqa: E402
+
+VENDORS = {
+    "Apple": ["MacBook Pro", "MacBook Air"],
+    "Microsoft": ["Surface Laptop", "Surface Book", "Surface Pro"],
+    "Dell": ["XPS", "Latitude", "Precision", "Inspiron"],
+    "Lenovo": ["ThinkPad X1 Carbon", "ThinkPad T14", "ThinkPad P1", "IdeaPad"],
+    "HP": ["EliteBook", "ZBook Studio", "ProBook", "Spectre x360"],
+}
+
+
+def catalog(size: int):
+    random.seed(1)
+    options = []
+    while len(options) < size:
+        vendor = random.choice(list(VENDORS))
+        line = random.choice(VENDORS[vendor])
+        inch = random.choice([13, 14, 15, 16, 17])
+        year = random.randint(2012, 2020)
+        label = f"{vendor} {line} ({inch}-inch, {year}) #{len(options)}"
+        options.append((f"model-{len(options)}", label))
+    return options
+
+
+def linear_scan(options, query: str, limit: int = MAX_OPTIONS):
+    # What a handler without an index does: lower() and "in" for every option
+    words = query.lower().split()
+    found = []
+    for value, label in options:
+        text = label.lower()
+        if all(w in text for w in words):
+            found.append(value)
+            if len(found) == limit:
+                break
+    return found
+
+
+def main(size: int = 5_000, number: int = 200):
+    options = catalog(size)
+    started = time.perf_counter()
+    index = SearchIndex(options)
+    print(
+        f"{size:,} options indexed in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    # A user typing into the menu sends a request per keystroke
+    typed = "thinkpad x1 carbon 2019"
+    queries = [typed[:end] for end in range(1, len(typed) + 1)]
+    queries += ["pro 13", "inch 2015", "elitebook #4999", "spectre 2020"]
+    print(f"{'query':>24} {'matches':>8} {'linear scan':>14} {'index':>10}")
+    for query in queries:
+        matches = len(index.search(query, limit=size))
+        scan = timeit.timeit(lambda: linear_scan(options, query), number=number)
+        search = timeit.timeit(lambda: index.search(query), number=number)
+        print(
+            f"{query!r:>24} {matches:>8,} "
+            f"{scan / number * 1_000_000:>11,.0f} us {search / number * 1_000_000:>7,.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_catalog.py
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_slack import (  # noqa: E402
+    APP_DIR,
+    SIGNING_SECRET,
+    FakeSlackAPI,
+    sign,
+)
+from benchmarks.load_test import flow  # noqa: E402
+
+# Runs in a new interpreter, like a new Lambda execution environment
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import serverless_app
+if sys.argv[1] == "eager":
+    serverless_app.handler.handler
+initialized = time.perf_counter()
+timings = {"init": initialized - started}
+for name, event in zip(("first", "second"), json.loads(sys.stdin.read())):
+    started = time.perf_counter()
+    response = serverless_app.handler(event, type("Context", (), {
+        "function_name": "helpdesk",
+        "invoked_function_arn": "arn:aws:lambda:us-east-1:123456789012:function:helpdesk",
+    })())
+    assert response["statusCode"] == 200, response
+    timings[name] = time.perf_counter() - started
+timings["modules"] = sorted(m for m in ("aiohttp", "sanic", "slack_bolt.async_app", "boto3") if m in sys.modules)
+print(json.dumps(timings))
+"""
+
+
+def shortcut_event(index: int) -> dict:
+    """A function URL (API Gateway v2) event for a signed shortcut request."""
+    _, payload = next(flow(index))
+    body = urlencode({"payload": json.dumps(payload)}).encode()
+    return {
+        "version": "2.0",
+        "rawPath": "/slack/events",
+        "rawQueryString": "",
+        "headers": {k.lower(): v for k, v in sign(body).items()},
+        "requestContext": {"http": {"method": "POST", "path": "/slack/events"}},
+        "body": body.decode(),
+        "isBase64Encoded": False,
+    }
+
+
+def cold_start(mode: str, api: FakeSlackAPI, verify_token: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            SLACK_API_URL=api.url,
+            SLACK_SIGNING_SECRET=SIGNING_SECRET,
+            SLACK_BOT_TOKEN="xoxb-load-test",
+            SLACK_TOKEN_VERIFICATION="true" if verify_token else "false",
+            HELPDESK_DB=os.path.join(tmp, "helpdesk.db"),
+            LOG_LEVEL="WARNING",
+            # Lazy listeners are invoked through the fake API as well
+            AWS_ENDPOINT_URL_LAMBDA=api.url.rsplit("/api/", 1)[0],
+            AWS_ACCESS_KEY_ID="benchmark",
+            AWS_SECRET_ACCESS_KEY="benchmark",
+            AWS_DEFAULT_REGION="us-east-1",
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, mode],
+            cwd=APP_DIR,
+            env=env,
+            input=json.dumps([shortcut_event(0), shortcut_event(1)]),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(runs: int = 5, latency: float = 0.05):
+    api = FakeSlackAPI(latency=latency).start()
+    # Bolt's LambdaLazyListenerRunner: POST /2015-03-31/functions/<arn>/invocations
+    api.responses["invocations"] = lambda n: {}
+    print(
+        f"A new execution environment handling two shortcuts, median of {int(runs)} "
+        f"runs; Web API and Lambda API calls take {latency * 1000:g} ms"
+    )
+    print(f"  {'(ms)':<28} {'init':>8} {'1st':>8} {'2nd':>8} {'init+1st':>9}")
+    for label, mode, verify_token in (
+        ("app built at init", "eager", True),
+        ("  without auth.test", "eager", False),
+        ("app built by 1st invocation", "lazy", False),
+    ):
+        results = [cold_start(mode, api, verify_token) for _ in range(int(runs))]
+
+        def median(key: str) -> float:
+            return statistics.median(r[key] for r in results) * 1000
+
+        print(
+            f"  {label:<28} {median('init'):8.1f} {median('first'):8.1f}"
+            f" {median('second'):8.1f} {median('init') + median('first'):9.1f}"
+        )
+    print(f"  imported: {', '.join(results[-1]['modules'])}")
+    api.stop()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:3]))
+
+# Interpreter startup is not included. A shortcut makes Bolt invoke the
+# function again for its lazy listener, which happens before the response.
+# python benchmarks/bench_cold_start.py [runs] [latency seconds]
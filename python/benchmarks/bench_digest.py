@@ -0,0 +1,95 @@
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.digest import DigestBuffer, DigestPolicy  # noqa: E402
+from helpdesk.notifications import AsyncNotificationWorker  # noqa: E402
+from helpdesk.submissions import HelpdeskRequest  # noqa: E402
+
+
+def arrivals(per_minute: float, minutes: float, seed: int = 1):
+    random.seed(seed)
+    now, end = 0.0, minutes * 60
+    while True:
+        now += random.expovariate(per_minute / 60)
+        if now >= end:
+            return
+        yield now
+
+
+def channel_posts(times, policy: DigestPolicy) -> int:
+    """Counts channel messages, simulating the clock instead of waiting."""
+    buffer = DigestBuffer()
+    posts = 0
+    for now in times:
+        posts += len(buffer.due(now))
+        if buffer.add("C111", None, policy, now) is not None:
+            posts += 1
+    return posts + len(buffer.drain(float("inf")))
+
+
+def simulate():
+    policies = {
+        "no digest": None,
+        "10 / 60s": DigestPolicy(max_size=10, max_wait=60),
+        "24 / 60s": DigestPolicy(max_size=24, max_wait=60),
+        "10 / 15s": DigestPolicy(max_size=10, max_wait=15),
+    }
+    print(
+        f"{'requests/min':>12} {'requests':>9} " + "".join(f"{n:>12}" for n in policies)
+    )
+    for per_minute in (0.5, 5, 30, 120):
+        times = list(arrivals(per_minute, minutes=60))
+        row = f"{per_minute:>12} {len(times):>9} "
+        for policy in policies.values():
+            posts = len(times) if policy is None else channel_posts(times, policy)
+            # Each submission also sends DMs to the submitter and the approver
+            calls = posts + 2 * len(times)
+            row += f"{posts:>5} ({calls / (3 * len(times)):>4.0%})"
+        print(row)
+    print("channel messages (all chat.postMessage calls, relative to no digest)")
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = Counter()
+
+    async def conversations_open(self, users: str):
+        self.calls["conversations.open"] += 1
+        return {"channel": {"id": f"D{users}"}}
+
+    async def chat_postMessage(self, channel: str, text: str, blocks=None):
+        self.calls["chat.postMessage" if blocks is None else "digest"] += 1
+        await asyncio.sleep(0.001)
+
+
+async def spike(count: int = 200, seconds: float = 2.0):
+    """Runs the worker for a spike compressed to a few seconds."""
+    client = FakeClient()
+    worker = AsyncNotificationWorker(
+        digests={"laptop": DigestPolicy(max_size=10, max_wait=0.5)}
+    )
+    started = time.perf_counter()
+    for i in range(count):
+        request = HelpdeskRequest("laptop", user_id="U111", title=f"#{i}")
+        request.approver = "U222"
+        worker.submit(client, request)
+        await asyncio.sleep(seconds / count)
+    await worker.join()
+    await worker.flush()
+    elapsed = time.perf_counter() - started
+    print(f"\n{count} submissions in {elapsed:.1f}s with digests of 10 / 0.5s:")
+    print(f"  {dict(client.calls)}")
+    print(f"  {worker.stats()}")
+
+
+if __name__ == "__main__":
+    simulate()
+    asyncio.run(spike())
+
+# python benchmarks/bench_digest.py
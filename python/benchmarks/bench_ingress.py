@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from slack_bolt.adapter.sanic import AsyncSlackRequestHandler  # noqa: E402
+from slack_bolt.adapter.sanic.async_handler import to_sanic_response  # noqa: E402
+from slack_bolt.async_app import AsyncApp  # noqa: E402
+from slack_bolt.authorization import AuthorizeResult  # noqa: E402
+
+from benchmarks.fake_slack import SIGNING_SECRET, sign  # noqa: E402
+from helpdesk.ingress import Ingress  # noqa: E402
+from helpdesk.views import MODALS_DIR  # noqa: E402
+
+HANDLED_TYPES = ("shortcut", "block_actions", "view_submission")
+
+
+class FakeRequest:
+    """The attributes of sanic.request.Request used by the endpoint."""
+
+    method = "POST"
+    query_string = ""
+
+    def __init__(self, body: bytes, headers: dict):
+        self.body = body
+        self.headers = headers
+
+
+async def authorize(enterprise_id, team_id, user_id) -> AuthorizeResult:
+    return AuthorizeResult(
+        enterprise_id=enterprise_id,
+        team_id=team_id,
+        bot_token="xoxb-benchmark",
+        bot_id="B111",
+        bot_user_id="U000",
+    )
+
+
+def create_app(request_verification_enabled: bool) -> AsyncApp:
+    app = AsyncApp(
+        signing_secret=SIGNING_SECRET,
+        authorize=authorize,
+        request_verification_enabled=request_verification_enabled,
+    )
+
+    # Listeners acknowledging right away; only the request handling is measured
+    @app.shortcut("new-helpdesk-request")
+    @app.action("helpdesk-request-modal-category-selection")
+    @app.view("helpdesk-request-modal")
+    async def handle(ack):
+        await ack()
+
+    return app
+
+
+def interactivity(payload: dict) -> bytes:
+    return urlencode({"payload": json.dumps(payload, separators=(",", ":"))}).encode()
+
+
+def payloads() -> dict:
+    # Interactivity payloads carry the whole view, so they are a few KB
+    with open(os.path.join(MODALS_DIR, "step2_mobile.json")) as f:
+        view = json.load(f)
+    view.update(id="V111", hash="111.abc", state={"values": {}})
+    common = {
+        "team": {"id": "T111"},
+        "user": {"id": "U111", "team_id": "T111"},
+        "api_app_id": "A111",
+        "token": "legacy",
+    }
+    action = {
+        "type": "static_select",
+        "action_id": "helpdesk-request-modal-category-selection",
+        "block_id": "category",
+        "selected_option": {"value": "mobile"},
+    }
+    event = {
+        "token": "legacy",
+        "team_id": "T111",
+        "api_app_id": "A111",
+        "type": "event_callback",
+        "event_id": "Ev111",
+        "event_time": 1600000000,
+        "event": {"type": "app_home_opened", "user": "U111", "tab": "home"},
+    }
+    return {
+        "view_submission": interactivity(
+            {"type": "view_submission", **common, "view": view}
+        ),
+        "block_actions": interactivity(
+            {"type": "block_actions", **common, "view": view, "actions": [action]}
+        ),
+        "view_closed": interactivity({"type": "view_closed", **common, "view": view}),
+        "event retry": json.dumps(event).encode(),
+    }
+
+
+async def measure(
+    handler: AsyncSlackRequestHandler,
+    ingress: Optional[Ingress],
+    body: bytes,
+    headers: dict,
+    seconds: float,
+    concurrency: int = 64,
+) -> float:
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal count
+        while time.perf_counter() < deadline:
+            req = FakeRequest(body, headers)
+            screened = ingress.screen(req.body, req.headers) if ingress else None
+            if screened is not None:
+                to_sanic_response(screened)
+                # Let the other clients run as they would between requests
+                await asyncio.sleep(0)
+            else:
+                await handler.handle(req)
+            count += 1
+
+    # Concurrent clients, as Bolt waits for ack() by polling every 10ms
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return count / seconds
+
+
+async def main(seconds: float = 2):
+    baseline = AsyncSlackRequestHandler(create_app(True))
+    fast_path = AsyncSlackRequestHandler(create_app(False))
+    ingress = Ingress(SIGNING_SECRET, handled_types=HANDLED_TYPES)
+    print(f"{'':>16} {'size':>8} {'Bolt only':>12} {'with Ingress':>14}")
+    for name, body in payloads().items():
+        headers = {k.lower(): v for k, v in sign(body).items()}
+        if name == "event retry":
+            headers.update(
+                {"content-type": "application/json", "x-slack-retry-num": "1"}
+            )
+        before = await measure(baseline, None, body, headers, seconds)
+        after = await measure(fast_path, ingress, body, headers, seconds)
+        print(f"{name:>16} {len(body):>7,}B {before:>8,.0f} rps {after:>10,.0f} rps")
+    print(f"ingress: {ingress.stats()}")
+
+
+if __name__ == "__main__":
+    # Bolt logs a warning for every unhandled request
+    logging.disable(logging.WARNING)
+    asyncio.run(main())
+
+# python benchmarks/bench_ingress.py
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from slack_bolt import Ack, App, BoltRequest  # noqa: E402
+from slack_bolt.authorization import AuthorizeResult  # noqa: E402
+
+from helpdesk import logs  # noqa: E402
+from helpdesk.submissions import SubmissionParser  # noqa: E402
+from helpdesk.views import MODALS_DIR  # noqa: E402
+
+
+class SlowStream:
+    """A log destination taking 100us per write, like a busy pipe or disk."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text: str) -> None:
+        self.lines += text.count("\n")
+        time.sleep(0.0001)
+
+    def flush(self) -> None:
+        pass
+
+
+def authorize(enterprise_id, team_id, user_id) -> AuthorizeResult:
+    return AuthorizeResult(
+        enterprise_id=enterprise_id,
+        team_id=team_id,
+        bot_token="xoxb-benchmark",
+        bot_id="B111",
+        bot_user_id="U000",
+    )
+
+
+def create_app() -> App:
+    app = App(
+        signing_secret="benchmark",
+        authorize=authorize,
+        request_verification_enabled=False,
+        process_before_response=True,
+    )
+    parser = SubmissionParser()
+
+    # The work accept_view_submission does before notifying anyone
+    @app.view("helpdesk-request-modal")
+    def accept(ack: Ack, body: dict, logger: logging.Logger):
+        request = parser.parse(body["view"], user_id=body["user"]["id"])
+        ack()
+        logger.info("Accepted a submission", extra={"submission": request})
+
+    return app
+
+
+def view_submission() -> BoltRequest:
+    with open(os.path.join(MODALS_DIR, "step2_mobile.json")) as f:
+        view = json.load(f)
+    due_date = (date.today() + timedelta(days=7)).isoformat()
+    view.update(
+        id="V111",
+        hash="111.abc",
+        state={
+            "values": {
+                "title": {"element": {"type": "plain_text_input", "value": "iPhone"}},
+                "os": {
+                    "element": {
+                        "type": "external_select",
+                        "selected_option": {"value": "ios"},
+                    }
+                },
+                "due-date": {
+                    "element": {"type": "datepicker", "selected_date": due_date}
+                },
+            }
+        },
+    )
+    body = {
+        "type": "view_submission",
+        "team": {"id": "T111"},
+        "user": {"id": "U111", "team_id": "T111"},
+        "api_app_id": "A111",
+        "token": "legacy",
+        "view": view,
+    }
+    return BoltRequest(body=json.dumps(body), headers={})
+
+
+def basic_config(stream: SlowStream):
+    # What the apps did before: basicConfig(level=logging.DEBUG)
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    logging.basicConfig(level=logging.DEBUG, stream=stream)
+    return None
+
+
+def measure(name: str, setup, seconds: float = 2.0):
+    stream = SlowStream()
+    listener = setup(stream)
+    app = create_app()
+    request = view_submission()
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        app.dispatch(request)
+        count += 1
+    elapsed = time.perf_counter() - started
+    if listener is not None:
+        listener.stop()
+    dropped = sum(getattr(h, "dropped", 0) for h in logging.getLogger().handlers)
+    print(
+        f"{name:>34}: {count / elapsed:7,.0f} req/s, "
+        f"{stream.lines / count:5.1f} lines/req written, {dropped:,} dropped"
+    )
+    for name in ("slack_bolt", "slack_sdk"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+def main():
+    measure("basicConfig(DEBUG)", basic_config)
+    measure(
+        "queue, DEBUG, text",
+        lambda s: logs.configure("DEBUG", stream=s, max_queue_size=100_000),
+    )
+    measure(
+        "queue, DEBUG, json, 1 in 10",
+        lambda s: logs.configure("DEBUG", log_format="json", sample_every=10, stream=s),
+    )
+    measure(
+        "queue, INFO, json, Bolt at WARNING",
+        lambda s: logs.configure(
+            "INFO",
+            levels={"slack_bolt": "WARNING", "slack_sdk": "WARNING"},
+            log_format="json",
+            stream=s,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_logging.py
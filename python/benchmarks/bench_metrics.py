@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from slack_bolt import Ack, App, BoltRequest  # noqa: E402
+from slack_bolt.authorization import AuthorizeResult  # noqa: E402
+
+from helpdesk.instrumentation import observe_response  # noqa: E402
+from helpdesk.metrics import Metrics  # noqa: E402
+
+
+def authorize(enterprise_id, team_id, user_id) -> AuthorizeResult:
+    return AuthorizeResult(
+        enterprise_id=enterprise_id,
+        team_id=team_id,
+        bot_token="xoxb-benchmark",
+        bot_id="B111",
+        bot_user_id="U000",
+    )
+
+
+def create_app(metrics: Metrics = None) -> App:
+    app = App(
+        signing_secret="benchmark",
+        authorize=authorize,
+        request_verification_enabled=False,
+        process_before_response=True,
+    )
+
+    def suggest_options(ack: Ack, payload: dict):
+        ack(options=[])
+
+    if metrics is not None:
+        suggest_options = metrics.timed(suggest_options)
+    app.options("element")(suggest_options)
+    return app
+
+
+def block_suggestion() -> BoltRequest:
+    body = {
+        "type": "block_suggestion",
+        "team": {"id": "T111"},
+        "user": {"id": "U111", "team_id": "T111"},
+        "api_app_id": "A111",
+        "token": "legacy",
+        "action_id": "element",
+        "block_id": "laptop-model",
+        "value": "mac",
+    }
+    return BoltRequest(body=json.dumps(body), headers={})
+
+
+def measure(name: str, app: App, metrics: Metrics = None, count: int = 20_000) -> float:
+    request = block_suggestion()
+    started = time.perf_counter()
+    for _ in range(count):
+        dispatched = time.perf_counter()
+        app.dispatch(request)
+        if metrics is not None:
+            observe_response(metrics.ack_seconds, request, dispatched)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>16}: {elapsed / count * 1e6:6.1f} us/request")
+    return elapsed / count
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    plain = measure("no metrics", create_app())
+    metrics = Metrics()
+    timed = measure("metrics", create_app(metrics), metrics)
+    print(f"{(timed - plain) * 1e6:+.1f} us/request for the response time and timed()")
+    started = time.perf_counter()
+    text = metrics.render()
+    print(
+        f"render(): {(time.perf_counter() - started) * 1000:.2f} ms, "
+        f"{len(text.splitlines())} lines"
+    )
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_metrics.py
@@ -0,0 +1,75 @@
+import functools
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_store import generate  # noqa: E402
+from helpdesk.reports import (  # noqa: E402
+    CachedReport,
+    ReportAggregates,
+    export_csv,
+    export_jsonl,
+)
+from helpdesk.store import SubmissionStore  # noqa: E402
+
+
+class _Discard(io.TextIOBase):
+    def write(self, s: str) -> int:
+        return len(s)
+
+
+def timed(name: str, func, count: int):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed * 1000:10.1f} ms {count / elapsed:12,.0f} rows/s")
+    return result
+
+
+def peak_memory(name: str, func) -> None:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {peak / 1024 / 1024:10.1f} MiB peak")
+
+
+def full_report(store: SubmissionStore) -> dict:
+    aggregates = ReportAggregates()
+    for _, created_at, request in store.scan(team_id="T111"):
+        aggregates.add(created_at, request)
+    return aggregates.to_dict()
+
+
+def main(count: int = 300_000, new: int = 100):
+    count, new = int(count), int(new)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SubmissionStore(os.path.join(tmp, "bench.db"))
+        store.add_many(generate(count))
+        print(f"{count:,} requests in the store")
+
+        timed("export_csv", lambda: export_csv(store.scan(), _Discard()), count)
+        timed("export_jsonl", lambda: export_jsonl(store.scan(), _Discard()), count)
+        expected = timed("full report", lambda: full_report(store), count)
+
+        report = CachedReport(store)
+        team_report = functools.partial(report.to_dict, "T111")
+        timed("CachedReport (first)", team_report, count)
+        store.add_many(generate(new))
+        cached = timed(f"  after {new} new requests", team_report, new)
+        timed("  without new requests", team_report, 1)
+        assert cached["total"] == expected["total"] + new
+
+        peak_memory("full report", lambda: full_report(store))
+        peak_memory("  from a list of the rows", lambda: list(store.scan()))
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:3]))
+
+# python benchmarks/bench_reports.py [count] [new]
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_slack import APP_DIR, FakeSlackAPI  # noqa: E402
+from benchmarks.fake_socket_mode import FakeSocketModeServer  # noqa: E402
+from benchmarks.load_test import flow, report  # noqa: E402
+from benchmarks.load_test import run as run_http  # noqa: E402
+
+
+async def drive(
+    server: FakeSocketModeServer, duration: float, concurrency: int
+) -> Tuple[Dict[str, List[float]], int]:
+    """load_test.drive() over Socket Mode: the time until each envelope's ack."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user(offset: int):
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            for payload_type, payload in flow(index):
+                started = time.perf_counter()
+                try:
+                    response = await server.send(payload)
+                except asyncio.TimeoutError:
+                    errors += 1
+                    continue
+                if response and "response_action" in response:
+                    errors += 1
+                latencies[payload_type].append(time.perf_counter() - started)
+            index += concurrency
+
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+async def run_socket_mode(
+    app: str, api: FakeSlackAPI, duration: float, concurrency: int, connections: int
+) -> None:
+    server = FakeSocketModeServer()
+    url = await server.start()
+    api.responses["apps.connections.open"] = lambda n: {"ok": True, "url": url}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            SLACK_API_URL=api.url,
+            SLACK_APP_TOKEN="xapp-1-load-test",
+            SLACK_BOT_TOKEN="xoxb-load-test",
+            SLACK_SIGNING_SECRET="unused",
+            SOCKET_MODE_CONNECTIONS=str(connections),
+            HELPDESK_DB=os.path.join(tmp, "helpdesk.db"),
+            LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+        )
+        process = subprocess.Popen(
+            [sys.executable, app],
+            cwd=APP_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            await server.wait_for_connections(connections)
+            await drive(server, 2, concurrency)
+            latencies, errors = await drive(server, duration, concurrency)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            await server.stop()
+    print(f"{app} ({connections} connections):")
+    report(latencies, duration, errors)
+
+
+def main(
+    duration: float = 10,
+    concurrency: int = 16,
+    latency: float = 0.05,
+    connections: int = 2,
+):
+    api = FakeSlackAPI(latency=latency, jitter=latency).start()
+    print(
+        f"The full helpdesk flow for {duration:g}s by {int(concurrency)} users, "
+        f"over HTTP and over Socket Mode; ack latency includes the transport"
+    )
+    for http_app, socket_mode_app in (
+        ("app.py", "socket_mode_app.py"),
+        ("async_app.py", "async_socket_mode_app.py"),
+    ):
+        run_http(http_app, api, duration, int(concurrency))
+        asyncio.run(
+            run_socket_mode(
+                socket_mode_app, api, duration, int(concurrency), int(connections)
+            )
+        )
+    api.stop()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:5]))
+
+# python benchmarks/bench_socket_mode.py [seconds] [users] [latency] [connections]
@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.store import SubmissionStore  # noqa: E402
+from helpdesk.submissions import HelpdeskRequest  # noqa: E402
+
+USERS = 5_000
+APPROVERS = 200
+
+
+def generate(count: int):
+    today = date.today()
+    for i in range(count):
+        category = random.choice(("laptop", "mobile", "other"))
+        mobile = category == "mobile"
+        yield HelpdeskRequest(
+            category,
+            f"U{random.randrange(USERS):06d}",
+            title=f"Request #{i}",
+            laptop_model="MacBookPro16,1" if category == "laptop" else None,
+            os="ios" if mobile else None,
+            description="Details" if category == "other" else None,
+            due_date=today + timedelta(days=random.randrange(30)) if mobile else None,
+            approver=f"U{random.randrange(APPROVERS):06d}" if mobile else None,
+            team_id="T111",
+        )
+
+
+def main(count: int = 300_000, queries: int = 10_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SubmissionStore(os.path.join(tmp, "bench.db"))
+        requests = list(generate(count))
+
+        started = time.perf_counter()
+        for r in requests:
+            store.add(r)
+        store.flush()
+        elapsed = time.perf_counter() - started
+        print(f"add(): {count} requests in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+
+        for name, lookup, population in [
+            ("by_user", store.by_user, USERS),
+            ("by_approver", store.by_approver, APPROVERS),
+        ]:
+            ids = [f"U{random.randrange(population):06d}" for _ in range(queries)]
+            started = time.perf_counter()
+            rows = sum(len(lookup("T111", i)) for i in ids)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name}(): {elapsed / queries * 1_000_000:.1f} us/query "
+                f"({rows / queries:.1f} rows/query)"
+            )
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_store.py
@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.submissions import SubmissionParser  # noqa: E402
+
+due_date = (date.today() + timedelta(days=7)).isoformat()
+
+payloads = {
+    "laptop": {
+        "private_metadata": json.dumps({"category": "laptop"}),
+        "state": {
+            "values": {
+                "title": {
+                    "element": {
+                        "type": "plain_text_input",
+                        "value": "Laptop Replacement",
+                    }
+                },
+                "laptop-model": {
+                    "element": {
+                        "type": "static_select",
+                        "selected_option": {"value": "MacBookPro16,1"},
+                    }
+                },
+            }
+        },
+    },
+    "mobile": {
+        "private_metadata": json.dumps({"category": "mobile"}),
+        "state": {
+            "values": {
+                "title": {
+                    "element": {
+                        "type": "plain_text_input",
+                        "value": "Mobile Device Replacement",
+                    }
+                },
+                "os": {
+                    "element": {
+                        "type": "static_select",
+                        "selected_option": {"value": "ios"},
+                    }
+                },
+                "approver": {
+                    "element": {"type": "users_select", "selected_user": "U111"}
+                },
+                "due-date": {
+                    "element": {"type": "datepicker", "selected_date": due_date}
+                },
+            }
+        },
+    },
+    "other": {
+        "private_metadata": json.dumps({"category": "other"}),
+        "state": {
+            "values": {
+                "title": {
+                    "element": {"type": "plain_text_input", "value": "Need a new badge"}
+                },
+                "description": {
+                    "element": {"type": "plain_text_input", "value": "Lost it"}
+                },
+            }
+        },
+    },
+}
+
+
+# The inline parsing and validation accept_view_submission used to do
+def legacy(view: dict):
+    values = view["state"]["values"]
+    actionId = "element"
+    title = values["title"][actionId]["value"] if "title" in values else None
+    laptop_model = (
+        values["laptop-model"][actionId]["selected_option"]["value"]
+        if "laptop-model" in values
+        else None
+    )
+    os = values["os"][actionId]["selected_option"]["value"] if "os" in values else None
+    description = (
+        values["description"][actionId]["value"] if "description" in values else None
+    )
+    due_date = (
+        values["due-date"][actionId]["selected_date"] if "due-date" in values else None
+    )
+    approver = (
+        values["approver"][actionId]["selected_user"] if "approver" in values else None
+    )
+
+    errors = {}
+    if title is not None and len(title) <= 5:
+        errors["title"] = "Title must be longer than 5 characters"
+    if (
+        due_date is not None
+        and datetime.strptime(due_date, "%Y-%m-%d") <= datetime.today()
+    ):
+        errors["due-date"] = "Due date must be in the future"
+    return (title, laptop_model, os, description, due_date, approver), errors
+
+
+def parse_and_validate(parser: SubmissionParser, view: dict):
+    request = parser.parse(view, "U222")
+    return request, parser.validate(request)
+
+
+def main(number: int = 50_000, repeat: int = 10):
+    parser = SubmissionParser()
+    for category, view in payloads.items():
+        # The best of the runs, as the slower ones are mostly noise
+        legacy_time = min(
+            timeit.repeat(lambda: legacy(view), number=number, repeat=repeat)
+        )
+        parser_time = min(
+            timeit.repeat(
+                lambda: parse_and_validate(parser, view), number=number, repeat=repeat
+            )
+        )
+        print(
+            f"{category:>7}: legacy {legacy_time / number * 1_000_000:.2f} us, "
+            f"parser {parser_time / number * 1_000_000:.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_submissions.py
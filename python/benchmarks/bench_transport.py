@@ -0,0 +1,74 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from slack_sdk import WebClient  # noqa: E402
+from slack_sdk.web.async_client import AsyncWebClient  # noqa: E402
+
+from benchmarks.fake_slack import FakeSlackAPI  # noqa: E402
+from helpdesk.transport import ConnectionPool, PooledWebClient, create_session  # noqa
+
+
+def report(name: str, latencies: List[float]):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:>28}: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+def run_sync(client: WebClient, number: int) -> List[float]:
+    latencies = []
+    for _ in range(number):
+        started = time.perf_counter()
+        client.chat_postMessage(channel="C111", text="Hi there!")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run_async(client: AsyncWebClient, number: int) -> List[float]:
+    latencies = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await client.chat_postMessage(channel="C111", text="Hi there!")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main_async(base_url: str, number: int):
+    report(
+        "AsyncWebClient (no session)",
+        await run_async(AsyncWebClient(token="xoxb-", base_url=base_url), number),
+    )
+    session = create_session()
+    try:
+        client = AsyncWebClient(token="xoxb-", base_url=base_url, session=session)
+        report("AsyncWebClient (shared session)", await run_async(client, number))
+    finally:
+        await session.close()
+
+
+def main(number: int = 2_000):
+    api = FakeSlackAPI().start()
+    base_url = api.url
+    print(f"{number} sequential chat.postMessage calls to a fake API (plain HTTP)")
+
+    report("WebClient", run_sync(WebClient(token="xoxb-", base_url=base_url), number))
+    pool = ConnectionPool()
+    client = PooledWebClient(token="xoxb-", base_url=base_url, pool=pool)
+    report("PooledWebClient", run_sync(client, number))
+    print(f"{'':>28}  connections: {pool.stats()}")
+
+    asyncio.run(main_async(base_url, number))
+    api.stop()
+
+
+if __name__ == "__main__":
+    main()
+
+# Against slack.com, TLS handshakes make the difference much larger than here.
+# python benchmarks/bench_transport.py
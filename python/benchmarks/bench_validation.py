@@ -0,0 +1,86 @@
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.store import COLUMNS, read_csv  # noqa: E402
+from helpdesk.submissions import SubmissionParser  # noqa: E402
+
+
+def import_file(count: int) -> str:
+    """A CSV export of another ticketing system, with some invalid rows."""
+    random.seed(1)
+    today = date.today()
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    for i in range(count):
+        category = random.choice(["laptop", "mobile", "other"])
+        user = f"U{random.randint(1, 500)}"
+        title = random.choice(["Broken", "Replacement needed", "Screen cracked"])
+        due = today + timedelta(days=random.randint(-5, 60))
+        writer.writerow(
+            [
+                category,
+                user,
+                title,
+                "MacBookPro16,1" if category == "laptop" else "",
+                random.choice(["ios", "android"]) if category == "mobile" else "",
+                "Details" if category == "other" else "",
+                due.isoformat() if category == "mobile" else "",
+                random.choice([user, "U999"]) if category == "mobile" else "",
+            ]
+        )
+    return out.getvalue()
+
+
+# The checks accept_view_submission used to do inline, per request
+def legacy(rows):
+    invalid = 0
+    for row in rows:
+        title, due_date = row["title"], row["due_date"]
+        errors = {}
+        if title and len(title) <= 5:
+            errors["title"] = "Title must be longer than 5 characters"
+        if due_date and datetime.strptime(due_date, "%Y-%m-%d") <= datetime.today():
+            errors["due-date"] = "Due date must be in the future"
+        invalid += bool(errors)
+    return invalid
+
+
+def timed(name: str, func, count: int):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:>28}: {elapsed * 1000:7.1f} ms ({elapsed / count * 1e6:.2f} us/row)")
+    return result
+
+
+def main(count: int = 100_000):
+    text = import_file(count)
+    validator = SubmissionParser().validator
+    print(f"{count:,} imported requests")
+
+    dict_rows = list(csv.DictReader(io.StringIO(text)))
+    timed("legacy checks (2 rules)", lambda: legacy(dict_rows), count)
+
+    requests = timed("read_csv", lambda: list(read_csv(io.StringIO(text))), count)
+    one_by_one = timed(
+        "validate() per request",
+        lambda: [validator.validate(r) for r in requests],
+        count,
+    )
+    batch = timed("validate_many()", lambda: validator.validate_many(requests), count)
+    assert {i: e for i, e in enumerate(one_by_one) if e} == batch
+    print(f"{len(batch):,} invalid requests")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_validation.py
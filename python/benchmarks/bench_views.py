@@ -0,0 +1,52 @@
+import copy
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from helpdesk.views import MODALS_DIR, ViewRegistry  # noqa: E402
+
+
+def main(number: int = 100_000):
+    with open(os.path.join(MODALS_DIR, "step2_mobile.json")) as f:
+        view = json.load(f)
+
+    views = ViewRegistry()
+    views.load(
+        "step2-mobile",
+        "step2_mobile.json",
+        placeholders={"title": "blocks.title.element.initial_value"},
+    )
+
+    # slack_sdk encodes the whole JSON body (trigger_id + view) per request
+    def per_request_dict():
+        json.dumps({"trigger_id": "111.222.xxx", "view": view})
+
+    def per_request_payload():
+        json.dumps({"trigger_id": "111.222.xxx", "view": views.payload("step2-mobile")})
+
+    def per_request_deepcopy_patch():
+        v = copy.deepcopy(view)
+        v["blocks"][1]["element"]["initial_value"] = "New iPhone"
+        json.dumps({"trigger_id": "111.222.xxx", "view": v})
+
+    def per_request_template():
+        payload = views.payload("step2-mobile", title="New iPhone")
+        json.dumps({"trigger_id": "111.222.xxx", "view": payload})
+
+    for name, func in [
+        ("dict view", per_request_dict),
+        ("pre-serialized view", per_request_payload),
+        ("deepcopy + patch", per_request_deepcopy_patch),
+        ("compiled template", per_request_template),
+    ]:
+        elapsed = timeit.timeit(func, number=number)
+        print(f"{name:>20}: {elapsed / number * 1_000_000:.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/bench_views.py
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+from urllib.parse import urlencode
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_transport import report  # noqa: E402
+from benchmarks.fake_slack import (  # noqa: E402
+    APP_DIR,
+    SIGNING_SECRET,
+    FakeSlackAPI,
+    free_port,
+    sign,
+    wait_for_port,
+)
+
+
+def view_submission(index: int) -> bytes:
+    due_date = (date.today() + timedelta(days=7)).isoformat()
+    values = {
+        "title": {"element": {"type": "plain_text_input", "value": f"Request {index}"}},
+        "os": {
+            "element": {"type": "static_select", "selected_option": {"value": "ios"}}
+        },
+        "due-date": {"element": {"type": "datepicker", "selected_date": due_date}},
+        "approver": {"element": {"type": "users_select", "selected_user": "U222"}},
+    }
+    payload = {
+        "type": "view_submission",
+        "team": {"id": "T111"},
+        "user": {"id": f"U{index % 500:03d}", "team_id": "T111"},
+        "api_app_id": "A111",
+        "token": "legacy",
+        # Unique for every interaction, like the ones from Slack
+        "trigger_id": f"{index}.{time.time_ns()}",
+        "view": {
+            "id": "V111",
+            "type": "modal",
+            "callback_id": "helpdesk-request-modal",
+            "private_metadata": json.dumps({"category": "mobile"}),
+            "state": {"values": values},
+            "hash": "111.abc",
+        },
+    }
+    return urlencode({"payload": json.dumps(payload)}).encode()
+
+
+async def drive(url: str, duration: float, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def user(session: aiohttp.ClientSession, offset: int):
+        index = offset
+        while time.perf_counter() < deadline:
+            body = view_submission(index)
+            index += concurrency
+            started = time.perf_counter()
+            async with session.post(url, data=body, headers=sign(body)) as res:
+                await res.read()
+                if res.status != 200:
+                    raise RuntimeError(f"Unexpected status: {res.status}")
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(user(session, i) for i in range(concurrency)))
+    return latencies
+
+
+def run(workers: int, api_url: str, duration: float, concurrency: int) -> None:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PORT=str(port),
+            WEB_CONCURRENCY=str(workers),
+            SLACK_API_URL=api_url,
+            SLACK_SIGNING_SECRET=SIGNING_SECRET,
+            SLACK_BOT_TOKEN="xoxb-load-test",
+            HELPDESK_DB=os.path.join(tmp, "helpdesk.db"),
+        )
+        server = subprocess.Popen(
+            [sys.executable, "async_app.py"],
+            cwd=APP_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            url = f"http://127.0.0.1:{port}/slack/events"
+            # Warm up every worker (auth.test, imports, connections)
+            asyncio.run(drive(url, 2, concurrency))
+            latencies = asyncio.run(drive(url, duration, concurrency))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    print(f"{workers} worker(s): {len(latencies) / duration:,.0f} req/s")
+    report(f"{workers} worker(s)", latencies)
+
+
+def main(duration: float = 10, concurrency: int = 64):
+    api = FakeSlackAPI().start()
+    cores = os.cpu_count() or 1
+    print(
+        f"Signed view_submission requests to /slack/events for {duration:g}s "
+        f"({concurrency} concurrent clients, {cores} cores)"
+    )
+    counts = sorted({1, 2, cores // 2, cores} - {0})
+    for workers in counts:
+        run(workers, api.url, duration, concurrency)
+    api.stop()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:2]))
+
+# The load generator and the fake API share the machine with the workers,
+# so leave some cores for them when measuring scaling.
+# python benchmarks/bench_workers.py [seconds]
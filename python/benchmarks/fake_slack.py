@@ -0,0 +1,206 @@
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+# For running the apps against the fake API (see load_test.py)
+APP_DIR = os.path.join(os.path.dirname(__file__), "..")
+SIGNING_SECRET = "load-test-secret"
+
+
+def _auth_test(n: int) -> dict:
+    return {
+        "ok": True,
+        "url": "https://example.slack.com/",
+        "team": "Example",
+        "user": "helpdesk",
+        "team_id": "T111",
+        "user_id": "U000",
+        "bot_id": "B111",
+    }
+
+
+def _view(n: int) -> dict:
+    return {"ok": True, "view": {"id": f"V{n:08d}", "hash": f"{n}.abc"}}
+
+
+def _message(n: int) -> dict:
+    return {"ok": True, "channel": "C111", "ts": f"{time.time():.6f}"}
+
+
+def _user(n: int) -> dict:
+    return {
+        "ok": True,
+        "user": {"id": "U111", "name": "someone", "profile": {"real_name": "Someone"}},
+    }
+
+
+def _channel(n: int) -> dict:
+    return {"ok": True, "channel": {"id": f"D{n:08d}"}}
+
+
+# Web API methods and their responses, given a sequence number
+METHODS: Dict[str, Callable[[int], dict]] = {
+    "auth.test": _auth_test,
+    "views.open": _view,
+    "views.update": _view,
+    "views.push": _view,
+    "views.publish": _view,
+    "chat.postMessage": _message,
+    "users.info": _user,
+    "conversations.open": _channel,
+}
+
+
+class FakeSlackAPI(ThreadingHTTPServer):
+    """A local stand-in for https://slack.com/api/ to load-test the apps with.
+
+    Every call takes `latency` seconds (plus up to `jitter` more), and
+    a `rate_limit_ratio` share of them are rejected with 429 and
+    Retry-After: `retry_after`. Point the apps at it with
+    SLACK_API_URL=<url>.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: int = 1,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        # e.g. apps.connections.open for a local Socket Mode server
+        self.responses = dict(METHODS)
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/api/"
+
+    def start(self) -> "FakeSlackAPI":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def respond(self, method: str):
+        """Returns (status, headers, body) after the configured latency."""
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            n = next(self._sequence)
+            if method != "auth.test" and random.random() < self.rate_limit_ratio:
+                self.rate_limited[method] += 1
+                return (
+                    429,
+                    {"Retry-After": str(self.retry_after)},
+                    {"ok": False, "error": "ratelimited"},
+                )
+            self.calls[method] += 1
+        response = self.responses.get(method)
+        if response is None:
+            return 200, {}, {"ok": False, "error": "unknown_method"}
+        return 200, {}, response(n)
+
+    def handle_error(self, request, client_address) -> None:
+        # The apps being stopped in the middle of calls are not errors here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "rate_limited": dict(self.rate_limited),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: FakeSlackAPI
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        method = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        status, headers, body = self.server.respond(method)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def sign(body: bytes) -> dict:
+    """The headers of a request body signed with SIGNING_SECRET."""
+    timestamp = str(int(time.time()))
+    base = f"v0:{timestamp}:".encode() + body
+    digest = hmac.new(SIGNING_SECRET.encode(), base, hashlib.sha256).hexdigest()
+    return {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"The app did not start listening on {port}")
+
+
+def main(port: int = 8080, latency: float = 0.05, rate_limit_ratio: float = 0.0):
+    server = FakeSlackAPI(int(port), latency=latency, rate_limit_ratio=rate_limit_ratio)
+    print(f"SLACK_API_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(server.stats())
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:4]))
+
+# python benchmarks/fake_slack.py [port] [latency seconds] [429 ratio]
+# SLACK_API_URL=http://127.0.0.1:8080/api/ SLACK_BOT_TOKEN=xoxb-x python app.py
@@ -0,0 +1,91 @@
+import asyncio
+import itertools
+import json
+import uuid
+from typing import Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+
+class FakeSocketModeServer:
+    """A local stand-in for the WebSocket endpoint of Slack's Socket Mode.
+
+    Serve its url from apps.connections.open (see FakeSlackAPI.responses).
+    send() delivers an envelope over one of the connections, round-robin,
+    and returns the acknowledgement's payload.
+    """
+
+    def __init__(self):
+        self.connections: List[web.WebSocketResponse] = []
+        self.url: Optional[str] = None
+        self._acks: Dict[str, asyncio.Future] = {}
+        self._turns = itertools.count()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, port: int = 0) -> str:
+        application = web.Application()
+        application.router.add_get("/link", self._connect)
+        self._runner = web.AppRunner(application, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"ws://127.0.0.1:{port}/link"
+        return self.url
+
+    async def stop(self) -> None:
+        for ws in list(self.connections):
+            await ws.close()
+        await self._runner.cleanup()
+
+    async def _connect(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(autoping=True)
+        await ws.prepare(request)
+        await ws.send_json(
+            {
+                "type": "hello",
+                "num_connections": len(self.connections) + 1,
+                "connection_info": {"app_id": "A111"},
+            }
+        )
+        self.connections.append(ws)
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(message.data)
+                future = self._acks.pop(data.get("envelope_id"), None)
+                if future is not None and not future.done():
+                    future.set_result(data.get("payload"))
+        finally:
+            self.connections.remove(ws)
+        return ws
+
+    async def wait_for_connections(self, count: int, timeout: float = 30) -> None:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while len(self.connections) < count:
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f"{len(self.connections)}/{count} connected")
+            await asyncio.sleep(0.1)
+
+    async def send(
+        self, payload: dict, envelope_type: str = "interactive", timeout: float = 10
+    ) -> Optional[dict]:
+        envelope_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._acks[envelope_id] = future
+        ws = self.connections[next(self._turns) % len(self.connections)]
+        await ws.send_json(
+            {
+                "envelope_id": envelope_id,
+                "type": envelope_type,
+                "payload": payload,
+                "accepts_response_payload": True,
+                "retry_attempt": 0,
+                "retry_reason": "",
+            }
+        )
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._acks.pop(envelope_id, None)
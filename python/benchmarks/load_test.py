@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_slack import (  # noqa: E402
+    APP_DIR,
+    SIGNING_SECRET,
+    FakeSlackAPI,
+    free_port,
+    sign,
+    wait_for_port,
+)
+
+TEAM = {"id": "T111"}
+MODELS = ["MacBookPro16,1", "MacBookAir9,1", "ThinkPadX1CarbonG8"]
+
+
+def _view(category: str, values: dict) -> dict:
+    return {
+        "id": "V111",
+        "type": "modal",
+        "callback_id": "helpdesk-request-modal",
+        "private_metadata": json.dumps({"category": category}),
+        "state": {"values": values},
+        "hash": "111.abc",
+    }
+
+
+def _values(category: str, index: int) -> dict:
+    def element(**state) -> dict:
+        return {"element": state}
+
+    values = {"title": element(type="plain_text_input", value=f"Request #{index}")}
+    if category == "laptop":
+        model = {"value": MODELS[index % len(MODELS)]}
+        values["laptop-model"] = element(type="external_select", selected_option=model)
+    else:
+        due_date = (date.today() + timedelta(days=7)).isoformat()
+        values["os"] = element(type="external_select", selected_option={"value": "ios"})
+        values["approver"] = element(type="users_select", selected_user="U999")
+        values["due-date"] = element(type="datepicker", selected_date=due_date)
+    return values
+
+
+def flow(index: int) -> Iterator[Tuple[str, dict]]:
+    """The requests Slack sends while a user files one helpdesk request."""
+    category = "laptop" if index % 2 == 0 else "mobile"
+    user = {"id": f"U{index % 500:03d}", "team_id": "T111"}
+    common = {"team": TEAM, "user": user, "api_app_id": "A111", "token": "legacy"}
+
+    def trigger_id() -> str:
+        # Unique for every interaction, like the ones from Slack
+        return f"{index}.{time.time_ns()}"
+
+    yield "shortcut", dict(
+        common,
+        type="shortcut",
+        callback_id="new-helpdesk-request",
+        trigger_id=trigger_id(),
+    )
+    yield "block_actions", dict(
+        common,
+        type="block_actions",
+        trigger_id=trigger_id(),
+        container={"type": "view", "view_id": "V111"},
+        view=_view(category, {}),
+        actions=[
+            {
+                "type": "static_select",
+                "action_id": "helpdesk-request-modal-category-selection",
+                "block_id": "category",
+                "selected_option": {"value": category},
+                "action_ts": f"{time.time():.6f}",
+            }
+        ],
+    )
+    yield "block_suggestion", dict(
+        common,
+        type="block_suggestion",
+        view=_view(category, {}),
+        action_id="element",
+        block_id="laptop-model" if category == "laptop" else "os",
+        value="mac" if category == "laptop" else "i",
+    )
+    yield "view_submission", dict(
+        common,
+        type="view_submission",
+        trigger_id=trigger_id(),
+        view=_view(category, _values(category, index)),
+    )
+
+
+async def drive(
+    url: str, duration: float, concurrency: int
+) -> Tuple[Dict[str, List[float]], int]:
+    """Runs concurrent users filing requests; returns latencies per type."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user(session: aiohttp.ClientSession, offset: int):
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            for payload_type, payload in flow(index):
+                body = urlencode({"payload": json.dumps(payload)}).encode()
+                started = time.perf_counter()
+                async with session.post(url, data=body, headers=sign(body)) as res:
+                    text = await res.text()
+                if res.status != 200 or "response_action" in text:
+                    errors += 1
+                latencies[payload_type].append(time.perf_counter() - started)
+            index += concurrency
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(user(session, i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(latencies: List[float], p: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def report(latencies: Dict[str, List[float]], duration: float, errors: int) -> None:
+    everything = [v for values in latencies.values() for v in values]
+    print(
+        f"  {len(everything) / duration:,.0f} req/s "
+        f"({len(latencies['view_submission']) / duration:,.1f} submissions/s), "
+        f"{errors} errors"
+    )
+    print(f"  {'ack latency (ms)':<18} {'p50':>8} {'p95':>8} {'p99':>8} {'count':>7}")
+    for name, values in [*sorted(latencies.items()), ("all", everything)]:
+        print(
+            f"  {name:<18}"
+            + "".join(
+                f" {percentile(values, p) * 1000:8.2f}" for p in (0.5, 0.95, 0.99)
+            )
+            + f" {len(values):>7}"
+        )
+
+
+def run(app: str, api: FakeSlackAPI, duration: float, concurrency: int) -> None:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PORT=str(port),
+            SLACK_API_URL=api.url,
+            SLACK_SIGNING_SECRET=SIGNING_SECRET,
+            SLACK_BOT_TOKEN="xoxb-load-test",
+            HELPDESK_DB=os.path.join(tmp, "helpdesk.db"),
+            LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+        )
+        server = subprocess.Popen(
+            [sys.executable, app],
+            cwd=APP_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            url = f"http://127.0.0.1:{port}/slack/events"
+            # Warm up (auth.test, imports, connections, catalogs)
+            asyncio.run(drive(url, 2, concurrency))
+            before = api.stats()
+            latencies, errors = asyncio.run(drive(url, duration, concurrency))
+            # Lazy listeners and notifications still running
+            time.sleep(2)
+            after = api.stats()
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    print(f"{app}:")
+    report(latencies, duration, errors)
+    for key in ("calls", "rate_limited"):
+        counts = {
+            m: n - before[key].get(m, 0)
+            for m, n in sorted(after[key].items())
+            if n > before[key].get(m, 0)
+        }
+        print(f"  Web API {key}: {counts}")
+
+
+def main(
+    duration: float = 10,
+    concurrency: int = 16,
+    latency: float = 0.05,
+    rate_limit_ratio: float = 0.01,
+):
+    api = FakeSlackAPI(
+        latency=latency, jitter=latency, rate_limit_ratio=rate_limit_ratio
+    ).start()
+    print(
+        f"The full helpdesk flow for {duration:g}s by {int(concurrency)} users; "
+        f"Web API calls take {latency * 1000:g}-{latency * 2000:g} ms "
+        f"and {rate_limit_ratio:.0%} of them are rate limited"
+    )
+    apps = [a for a in ("app.py", "async_app.py") if a in sys.argv] or [
+        "app.py",
+        "async_app.py",
+    ]
+    for app in apps:
+        run(app, api, duration, int(concurrency))
+    api.stop()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:] if not arg.endswith(".py")))
+
+# The apps log at LOG_LEVEL=WARNING unless it is set. All the users are in
+# one workspace, so most Web API calls wait in the apps' rate limit
+# schedulers (e.g. views.open at 100/min) and few reach the fake API.
+# python benchmarks/load_test.py [seconds] [users] [latency seconds] [429 ratio]
+# python benchmarks/load_test.py 30 app.py
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from slack_bolt.authorization import AuthorizeResult
+from slack_bolt.authorization.async_authorize import AsyncAuthorize
+from slack_bolt.context.async_context import AsyncBoltContext
+from slack_sdk.oauth.installation_store.async_installation_store import (
+    AsyncInstallationStore,
+)
+from slack_sdk.oauth.token_rotation.async_rotator import AsyncTokenRotator
+from slack_sdk.web.async_client import AsyncWebClient
+
+from helpdesk.authorization import to_authorize_result
+
+
+class AsyncBotAuthorize(AsyncAuthorize):
+    """The AsyncApp version of BotAuthorize."""
+
+    def __init__(
+        self,
+        installation_store: AsyncInstallationStore,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        client: Optional[AsyncWebClient] = None,
+    ):
+        self.installation_store = installation_store
+        self.token_rotator = (
+            AsyncTokenRotator(
+                client_id=client_id, client_secret=client_secret, client=client
+            )
+            if client_id is not None and client_secret is not None
+            else None
+        )
+        self.token_rotation_expiration_minutes = 120
+
+    async def __call__(
+        self,
+        *,
+        context: AsyncBoltContext,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        user_id: Optional[str],
+        **kwargs,
+    ) -> Optional[AuthorizeResult]:
+        bot = await self.installation_store.async_find_bot(
+            enterprise_id=enterprise_id,
+            team_id=team_id,
+            is_enterprise_install=context.is_enterprise_install,
+        )
+        if bot is None:
+            return None
+        if bot.bot_refresh_token is not None and self.token_rotator is not None:
+            refreshed = await self.token_rotator.perform_bot_token_rotation(
+                bot=bot,
+                minutes_before_expiration=self.token_rotation_expiration_minutes,
+            )
+            if refreshed is not None:
+                await self.installation_store.async_save_bot(refreshed)
+                bot = refreshed
+        return to_authorize_result(bot)
@@ -0,0 +1,32 @@
+import asyncio
+
+from helpdesk.dedup import Deduplicator, SQLiteDeliveryStore, delivery_key
+
+
+class AsyncDeduplicator(Deduplicator):
+    """The AsyncApp version of Deduplicator.
+
+    Claims and releases in a SQLite store are write transactions, so they
+    run in the default executor instead of on the event loop.
+    """
+
+    async def is_duplicate(self, body: dict) -> bool:  # type: ignore
+        key = delivery_key(body)
+        if key is None:
+            return False
+        self.checked += 1
+        if await self._run(self.store.claim, key, self.ttl):
+            return False
+        self.duplicates += 1
+        return True
+
+    async def release(self, body: dict) -> None:  # type: ignore
+        key = delivery_key(body)
+        if key is not None:
+            self.released += 1
+            await self._run(self.store.release, key)
+
+    async def _run(self, func, *args):
+        if isinstance(self.store, SQLiteDeliveryStore):
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return func(*args)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from helpdesk.rate_limits import (
+    _SchedulerState,
+    rate_limit_channel,
+    trigger_deadline,
+)
+
+
+class AsyncRateLimitScheduler(_SchedulerState):
+    """The AsyncWebClient version of RateLimitScheduler."""
+
+    def __init__(
+        self,
+        method_rates: Optional[Dict[str, int]] = None,
+        max_in_flight: int = 20,
+        burst_seconds: float = 10,
+        max_retries: int = 2,
+        max_retry_after: float = 30,
+    ):
+        super().__init__(
+            method_rates, max_in_flight, burst_seconds, max_retries, max_retry_after
+        )
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def acquire(
+        self,
+        team_id: Optional[str],
+        method: str,
+        deadline: Optional[float] = None,
+        channel: Optional[str] = None,
+    ) -> None:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        started = time.monotonic()
+        async with self._condition:
+            bucket = self.bucket(team_id, method, channel)
+            queue = bucket.waiters
+            entry = self.enqueue(queue, method)
+            try:
+                while True:
+                    wait = self.try_take_token(bucket, entry)
+                    if wait == 0:
+                        break
+                    self.check_deadline(method, deadline, wait)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                queue = self.slot_waiters
+                entry = self.enqueue(queue, method)
+                self._condition.notify_all()
+                while not self.try_take_slot(entry):
+                    remaining = self.check_deadline(method, deadline, 0.0)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self.discard(queue, entry)
+                self._condition.notify_all()
+                raise
+        self.observe(method, time.monotonic() - started)
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def client(self, client: AsyncWebClient) -> "AsyncRateLimitedWebClient":
+        """Returns a copy of the per-request client that goes through this scheduler."""
+        return AsyncRateLimitedWebClient(
+            scheduler=self,
+            token=client.token,
+            base_url=client.base_url,
+            timeout=client.timeout,
+            ssl=client.ssl,
+            proxy=client.proxy,
+            session=client.session,
+            trust_env_in_session=client.trust_env_in_session,
+            headers=client.headers,
+            team_id=client.default_params.get("team_id"),
+            logger=client.logger,
+            retry_handlers=client.retry_handlers,
+        )
+
+
+class AsyncRateLimitedWebClient(AsyncWebClient):
+    def __init__(self, *, scheduler: AsyncRateLimitScheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+        self.team_id = kwargs.get("team_id")
+        # Created for each request by the middleware, when the request arrived
+        self.received_at = time.monotonic()
+
+    def __deepcopy__(self, memo: dict) -> "AsyncRateLimitedWebClient":
+        # The same as PooledWebClient; the session and scheduler are shared
+        return self
+
+    async def api_call(self, api_method: str, **kwargs):
+        attempt = 0
+        deadline = trigger_deadline(self.received_at, kwargs)
+        channel = rate_limit_channel(api_method, kwargs)
+        while True:
+            await self.scheduler.acquire(self.team_id, api_method, deadline, channel)
+            started, error = time.perf_counter(), None
+            try:
+                return await super().api_call(api_method, **kwargs)
+            except SlackApiError as e:
+                error = e.response.get("error") or str(e.response.status_code)
+                retry_after = self.scheduler.retry_wait(
+                    self.team_id, api_method, e, attempt, channel
+                )
+                if retry_after is None:
+                    raise
+                attempt += 1
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self.scheduler.observe_call(
+                    api_method, time.perf_counter() - started, error
+                )
+                await self.scheduler.release()
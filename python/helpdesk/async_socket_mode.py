@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from slack_bolt.adapter.socket_mode.internals import build_headers
+from slack_bolt.async_app import AsyncAck, AsyncApp, AsyncBoltContext
+from slack_bolt.request.async_request import AsyncBoltRequest
+from slack_bolt.response import BoltResponse
+from slack_sdk.socket_mode.aiohttp import SocketModeClient as AsyncSocketModeClient
+from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from helpdesk.metrics import HistogramFamily
+from helpdesk.socket_mode import Envelope
+
+
+class AsyncEnvelopeAck(AsyncAck):
+    """The AsyncAck version of EnvelopeAck."""
+
+    def __init__(self, ack: AsyncAck, envelope: Envelope):
+        super().__init__()
+        self.ack = ack
+        self.envelope = envelope
+
+    async def __call__(self, *args, **kwargs) -> BoltResponse:
+        self.response = await self.ack(*args, **kwargs)
+        await self.envelope.async_send(self.response)
+        return self.response
+
+
+async def async_envelope_acks(
+    context: AsyncBoltContext, next: Callable[[], Awaitable[None]]
+):
+    envelope = context.get("envelope")
+    if envelope is not None:
+        context["ack"] = AsyncEnvelopeAck(context.ack, envelope)
+    await next()
+
+
+class AsyncSocketModeRunner:
+    """The AsyncApp version of SocketModeRunner, with `concurrency` tasks."""
+
+    def __init__(
+        self,
+        app: AsyncApp,
+        app_token: str,
+        connections: int = 2,
+        concurrency: int = 10,
+        logger: Optional[logging.Logger] = None,
+        ack_seconds: Optional[HistogramFamily] = None,
+    ):
+        self.app = app
+        self.app_token = app_token
+        self.connections = connections
+        self.concurrency = concurrency
+        self.logger = logger or logging.getLogger(__name__)
+        self.ack_seconds = ack_seconds or HistogramFamily()
+        self.clients: List[AsyncBaseSocketModeClient] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        app.middleware(async_envelope_acks)
+
+    async def _receive(
+        self, client: AsyncBaseSocketModeClient, req: SocketModeRequest
+    ) -> None:
+        self._queue.put_nowait(Envelope(client, req, self.ack_seconds))
+
+    async def _work(self) -> None:
+        while True:
+            envelope: Envelope = await self._queue.get()
+            try:
+                await self._dispatch(envelope)
+            except Exception as e:
+                self.logger.exception(f"Failed to dispatch a request: {e}")
+
+    async def _dispatch(self, envelope: Envelope) -> None:
+        req = envelope.request
+        res = await self.app.async_dispatch(
+            AsyncBoltRequest(
+                mode="socket_mode",
+                body=req.payload,
+                headers=build_headers(req),
+                context={"envelope": envelope},
+            )
+        )
+        if res.status == 200:
+            await envelope.async_send(res)
+        else:
+            self.logger.info(f"Unsuccessful Bolt execution result: {res.status}")
+
+    async def connect(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+        for _ in range(self.connections):
+            client = AsyncSocketModeClient(
+                self.app_token, logger=self.logger, web_client=self.app.client
+            )
+            client.socket_mode_request_listeners.append(self._receive)
+            await client.connect()
+            self.clients.append(client)
+
+    async def start(self) -> None:
+        await self.connect()
+        self.app.logger.info(f"Connected with {len(self.clients)} connections")
+        await asyncio.Event().wait()
+
+    async def close(self) -> None:
+        for client in self.clients:
+            await client.close()
+        for task in self._workers:
+            task.cancel()
@@ -0,0 +1,231 @@
+from logging import Logger
+from typing import Any, Optional, Tuple, Union
+
+from slack_bolt import BoltContext
+from slack_bolt.authorization import AuthorizeResult
+from slack_bolt.authorization.authorize import Authorize
+from slack_sdk import WebClient
+from slack_sdk.oauth import InstallationStore
+from slack_sdk.oauth.installation_store import Bot, Installation
+from slack_sdk.oauth.installation_store.async_installation_store import (
+    AsyncInstallationStore,
+)
+from slack_sdk.oauth.token_rotation import TokenRotator
+
+from helpdesk.users import _MISSING, TTLCache
+
+# For the shortcut, chat.postMessage (also to channels the bot is not in),
+# and conversations.open (DMs)
+SCOPES = ["commands", "chat:write", "chat:write.public", "im:write"]
+
+
+def bot_key(
+    enterprise_id: Optional[str],
+    team_id: Optional[str],
+    is_enterprise_install: Optional[bool] = False,
+) -> Tuple[Optional[str], Optional[str]]:
+    # An org-wide installation serves every workspace in the organization
+    return enterprise_id or None, None if is_enterprise_install else team_id or None
+
+
+def to_authorize_result(bot: Bot) -> AuthorizeResult:
+    """Everything Bolt gets from auth.test was saved with the installation."""
+    return AuthorizeResult(
+        enterprise_id=bot.enterprise_id,
+        team_id=bot.team_id,
+        bot_id=bot.bot_id,
+        bot_user_id=bot.bot_user_id,
+        bot_token=bot.bot_token,
+        bot_scopes=bot.bot_scopes,
+    )
+
+
+class CachedInstallationStore(InstallationStore, AsyncInstallationStore):
+    """An InstallationStore keeping the bots it has found in a TTL cache.
+
+    Every request from a workspace needs its bot token, so find_bot()
+    reads the underlying store once per TTL for each workspace (or each
+    organization, for org-wide installations). Workspaces without an
+    installation are remembered for negative_ttl seconds.
+
+    Saving or deleting through this store drops the cached bot, so a
+    reinstall (with a new token) takes effect right away in this process,
+    and within the TTL in the others.
+    """
+
+    def __init__(
+        self,
+        store: Union[InstallationStore, AsyncInstallationStore],
+        max_size: int = 100_000,
+        ttl: float = 600,
+        negative_ttl: float = 10,
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._bots = TTLCache(max_size)
+
+    @property
+    def logger(self) -> Logger:
+        return self.store.logger
+
+    def stats(self) -> dict:
+        return {"size": len(self._bots), "hits": self.hits, "misses": self.misses}
+
+    def _lookup(self, key: Tuple) -> Any:
+        bot = self._bots.get(key)
+        if bot is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return bot
+
+    def _store(self, key: Tuple, bot: Optional[Bot]) -> None:
+        self._bots.set(key, bot, self.ttl if bot is not None else self.negative_ttl)
+
+    def _forget(self, enterprise_id: Optional[str], team_id: Optional[str]) -> None:
+        self._bots.discard(bot_key(enterprise_id, team_id))
+        self._bots.discard(bot_key(enterprise_id, team_id, True))
+
+    def save(self, installation: Installation):
+        self.store.save(installation)
+        self._forget(installation.enterprise_id, installation.team_id)
+
+    def save_bot(self, bot: Bot):
+        self.store.save_bot(bot)
+        self._forget(bot.enterprise_id, bot.team_id)
+
+    def find_bot(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        is_enterprise_install: Optional[bool] = False,
+    ) -> Optional[Bot]:
+        key = bot_key(enterprise_id, team_id, is_enterprise_install)
+        bot = self._lookup(key)
+        if bot is _MISSING:
+            bot = self.store.find_bot(
+                enterprise_id=enterprise_id,
+                team_id=team_id,
+                is_enterprise_install=is_enterprise_install,
+            )
+            self._store(key, bot)
+        return bot
+
+    def find_installation(self, **kwargs) -> Optional[Installation]:
+        # Only the OAuth flow looks for installations, not every request
+        return self.store.find_installation(**kwargs)
+
+    def delete_bot(self, *, enterprise_id: Optional[str], team_id: Optional[str]):
+        self.store.delete_bot(enterprise_id=enterprise_id, team_id=team_id)
+        self._forget(enterprise_id, team_id)
+
+    def delete_installation(self, **kwargs):
+        self.store.delete_installation(**kwargs)
+        self._forget(kwargs.get("enterprise_id"), kwargs.get("team_id"))
+
+    def delete_all(self, *, enterprise_id: Optional[str], team_id: Optional[str]):
+        self.store.delete_all(enterprise_id=enterprise_id, team_id=team_id)
+        self._forget(enterprise_id, team_id)
+
+    async def async_save(self, installation: Installation):
+        await self.store.async_save(installation)
+        self._forget(installation.enterprise_id, installation.team_id)
+
+    async def async_save_bot(self, bot: Bot):
+        await self.store.async_save_bot(bot)
+        self._forget(bot.enterprise_id, bot.team_id)
+
+    async def async_find_bot(
+        self,
+        *,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        is_enterprise_install: Optional[bool] = False,
+    ) -> Optional[Bot]:
+        key = bot_key(enterprise_id, team_id, is_enterprise_install)
+        bot = self._lookup(key)
+        if bot is _MISSING:
+            bot = await self.store.async_find_bot(
+                enterprise_id=enterprise_id,
+                team_id=team_id,
+                is_enterprise_install=is_enterprise_install,
+            )
+            self._store(key, bot)
+        return bot
+
+    async def async_find_installation(self, **kwargs) -> Optional[Installation]:
+        return await self.store.async_find_installation(**kwargs)
+
+    async def async_delete_bot(
+        self, *, enterprise_id: Optional[str], team_id: Optional[str]
+    ):
+        await self.store.async_delete_bot(enterprise_id=enterprise_id, team_id=team_id)
+        self._forget(enterprise_id, team_id)
+
+    async def async_delete_installation(self, **kwargs):
+        await self.store.async_delete_installation(**kwargs)
+        self._forget(kwargs.get("enterprise_id"), kwargs.get("team_id"))
+
+    async def async_delete_all(
+        self, *, enterprise_id: Optional[str], team_id: Optional[str]
+    ):
+        await self.store.async_delete_all(enterprise_id=enterprise_id, team_id=team_id)
+        self._forget(enterprise_id, team_id)
+
+
+class BotAuthorize(Authorize):
+    """Authorizes requests with the bot installed in their workspace.
+
+    Bolt's InstallationStoreAuthorize reads the installation and calls
+    auth.test for every request (or, with cache_enabled, once per token
+    and for good). The bot ID and bot user ID saved at installation are
+    all it needs from auth.test, so this reads only the (cached) bot.
+    """
+
+    def __init__(
+        self,
+        installation_store: InstallationStore,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        client: Optional[WebClient] = None,
+    ):
+        self.installation_store = installation_store
+        # Only for apps with token rotation enabled; set by App as well
+        self.token_rotator = (
+            TokenRotator(
+                client_id=client_id, client_secret=client_secret, client=client
+            )
+            if client_id is not None and client_secret is not None
+            else None
+        )
+        self.token_rotation_expiration_minutes = 120
+
+    def __call__(
+        self,
+        *,
+        context: BoltContext,
+        enterprise_id: Optional[str],
+        team_id: Optional[str],
+        user_id: Optional[str],
+        **kwargs,
+    ) -> Optional[AuthorizeResult]:
+        bot = self.installation_store.find_bot(
+            enterprise_id=enterprise_id,
+            team_id=team_id,
+            is_enterprise_install=context.is_enterprise_install,
+        )
+        if bot is None:
+            return None
+        if bot.bot_refresh_token is not None and self.token_rotator is not None:
+            refreshed = self.token_rotator.perform_bot_token_rotation(
+                bot=bot,
+                minutes_before_expiration=self.token_rotation_expiration_minutes,
+            )
+            if refreshed is not None:
+                self.installation_store.save_bot(refreshed)
+                bot = refreshed
+        return to_authorize_result(bot)
@@ -0,0 +1,158 @@
+import csv
+import os
+import re
+import time
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+CATALOGS_DIR = os.path.join(os.path.dirname(__file__), "..", "catalogs")
+
+# Block Kit allows up to 100 options in a block_suggestion response
+MAX_OPTIONS = 100
+# ... and up to 75 characters in an option's text
+MAX_TEXT_LENGTH = 75
+
+# Word prefixes up to this length are indexed; longer query words are checked
+MAX_PREFIX = 12
+
+_WORD = re.compile(r"\w+")
+_EMPTY: FrozenSet[int] = frozenset()
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(word: str) -> Set[str]:
+    return {word[i : i + 3] for i in range(len(word) - 2)}
+
+
+def _intersect(sets: Sequence[FrozenSet[int]]) -> FrozenSet[int]:
+    sets = sorted(sets, key=len)
+    return sets[0].intersection(*sets[1:])
+
+
+class SearchIndex:
+    """Options searchable by the words a user types into an external_select.
+
+    Every query word has to match a word in the option's label, either as
+    a prefix (word prefix index) or, for three or more characters, anywhere
+    inside it (trigram index). Options matching all words by prefix come
+    first; within each group, options keep the catalog's order.
+    """
+
+    def __init__(self, options: Sequence[Tuple[str, str]]):
+        self.options = [
+            {
+                "text": {"type": "plain_text", "text": label[:MAX_TEXT_LENGTH]},
+                "value": value,
+            }
+            for value, label in options
+        ]
+        self._words: List[List[str]] = []
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        for index, (_, label) in enumerate(options):
+            words = _words(label)
+            self._words.append(words)
+            for word in words:
+                for end in range(1, min(len(word), MAX_PREFIX) + 1):
+                    self._prefixes.setdefault(word[:end], set()).add(index)
+                for trigram in _trigrams(word):
+                    self._trigrams.setdefault(trigram, set()).add(index)
+        # frozensets are a bit faster to intersect and cannot be modified
+        self._prefixes = {k: frozenset(v) for k, v in self._prefixes.items()}
+        self._trigrams = {k: frozenset(v) for k, v in self._trigrams.items()}
+
+    def search(self, query: str, limit: int = MAX_OPTIONS) -> List[dict]:
+        words = _words(query)
+        if not words:
+            return self.options[:limit]
+        prefix_matches = [self._prefix_matches(w) for w in words]
+        best = _intersect(prefix_matches)
+        found = sorted(best)[:limit]
+        if len(found) < limit and any(len(w) >= 3 for w in words):
+            matches = [
+                self._substring_matches(w, p) if len(w) >= 3 else p
+                for w, p in zip(words, prefix_matches)
+            ]
+            others = _intersect(matches) - best
+            found += sorted(others)[: limit - len(found)]
+        return [self.options[i] for i in found]
+
+    def _prefix_matches(self, word: str) -> FrozenSet[int]:
+        matches = self._prefixes.get(word[:MAX_PREFIX], _EMPTY)
+        if len(word) > MAX_PREFIX:
+            matches = frozenset(
+                i for i in matches if any(w.startswith(word) for w in self._words[i])
+            )
+        return matches
+
+    def _substring_matches(
+        self, word: str, prefix_matches: FrozenSet[int]
+    ) -> FrozenSet[int]:
+        # Options with the word as a prefix have it as a substring as well
+        others = (
+            _intersect([self._trigrams.get(t, _EMPTY) for t in _trigrams(word)])
+            - prefix_matches
+        )
+        if len(word) > 3:
+            # Having all the trigrams does not mean having them in this order
+            others = frozenset(
+                i for i in others if any(word in w for w in self._words[i])
+            )
+        return prefix_matches | others
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+
+def load_options(path: str) -> List[Tuple[str, str]]:
+    """Reads (value, label) rows from a CSV file."""
+    with open(path, encoding="utf-8", newline="") as f:
+        return [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2]
+
+
+class Catalogs:
+    """Search indexes over the CSV catalogs in a directory, keyed by block_id.
+
+    <block_id>.csv serves the options for the external_select in that
+    block. Each index is built once and rebuilt when its file changes,
+    which is checked at most once per reload_interval seconds.
+    """
+
+    def __init__(
+        self, directory: str = CATALOGS_DIR, reload_interval: Optional[float] = 1.0
+    ):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        # block_id -> (mtime, next check, index)
+        self._indexes: Dict[str, Tuple[int, float, SearchIndex]] = {}
+
+    def __contains__(self, block_id: str) -> bool:
+        return os.path.exists(self._path(block_id))
+
+    def options(
+        self, block_id: str, query: str, limit: int = MAX_OPTIONS
+    ) -> List[dict]:
+        index = self.index(block_id)
+        return index.search(query, limit) if index is not None else []
+
+    def index(self, block_id: str) -> Optional[SearchIndex]:
+        now = time.monotonic()
+        cached = self._indexes.get(block_id)
+        if cached is not None:
+            mtime, next_check, index = cached
+            if self.reload_interval is None or now < next_check:
+                return index
+        path = self._path(block_id)
+        try:
+            current = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if cached is None or current != cached[0]:
+            index = SearchIndex(load_options(path))
+        self._indexes[block_id] = (current, now + (self.reload_interval or 0), index)
+        return index
+
+    def _path(self, block_id: str) -> str:
+        return os.path.join(self.directory, f"{os.path.basename(block_id)}.csv")
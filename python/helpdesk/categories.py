@@ -0,0 +1,174 @@
+import logging
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from helpdesk.digest import DigestPolicy
+from helpdesk.submissions import CATEGORY_FIELDS, Field, category_from_metadata
+from helpdesk.views import TemplateError, Transform, ViewRegistry
+
+SELECT_ACTION_ID = "helpdesk-request-modal-category-selection"
+
+# The maximum number of options in a static_select
+MAX_OPTIONS = 100
+
+
+class Category:
+    """A request category: its option in step1 and its step2 modal.
+
+    With a digest policy, busy periods' channel notifications for the
+    category are combined into digest messages.
+    """
+
+    __slots__ = ("value", "label", "filename", "fields", "digest")
+
+    def __init__(
+        self,
+        value: str,
+        label: str,
+        filename: str,
+        fields: Sequence[Field],
+        digest: Optional[DigestPolicy] = None,
+    ):
+        self.value = value
+        self.label = label
+        self.filename = filename
+        self.fields = tuple(fields)
+        self.digest = digest
+
+    @property
+    def view_name(self) -> str:
+        return f"step2-{self.value}"
+
+
+CATEGORIES = (
+    Category(
+        "laptop",
+        "Laptop",
+        "step2_laptop.json",
+        CATEGORY_FIELDS["laptop"],
+        digest=DigestPolicy(max_size=10, max_wait=60),
+    ),
+    Category(
+        "mobile",
+        "Mobile",
+        "step2_mobile.json",
+        CATEGORY_FIELDS["mobile"],
+        digest=DigestPolicy(max_size=10, max_wait=60),
+    ),
+    # Requests that fit no category tend to need a closer look; no digests
+    Category("other", "Other", "step2_other.json", CATEGORY_FIELDS["other"]),
+)
+
+
+class CategoryRegistry:
+    """Request categories keyed by their option value.
+
+    Each category's step2 modal is loaded into the view registry once, and
+    the category select in step1 is generated from the registered
+    categories, so adding a category means adding one entry here (and its
+    modal file). Unknown values get the default category's modal.
+    """
+
+    def __init__(
+        self,
+        views: ViewRegistry,
+        categories: Iterable[Category] = CATEGORIES,
+        default: str = "other",
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.views = views
+        self.default = default
+        self.logger = logger or logging.getLogger(__name__)
+        self._categories: Dict[str, Category] = {}
+        for category in categories:
+            self.add(category)
+
+    def add(self, category: Category) -> None:
+        self.views.load(
+            category.view_name,
+            category.filename,
+            transform=_external_selects(category.fields),
+        )
+        metadata = self.views.get(category.view_name).get("private_metadata")
+        if category_from_metadata(metadata) != category.value:
+            raise TemplateError(
+                f"{category.filename}: private_metadata must have "
+                f'{{"category": "{category.value}"}}'
+            )
+        self._categories[category.value] = category
+
+    def get(self, value: Optional[str]) -> Category:
+        category = self._categories.get(value)
+        if category is None:
+            self.logger.warning(f"Unknown category {value!r}; using {self.default}")
+            category = self._categories[self.default]
+        return category
+
+    def step2_payload(self, value: Optional[str]) -> str:
+        return self.views.payload(self.get(value).view_name)
+
+    @property
+    def fields(self) -> Dict[str, Tuple[Field, ...]]:
+        """The field specs per category for SubmissionParser."""
+        return {value: c.fields for value, c in self._categories.items()}
+
+    @property
+    def digests(self) -> Dict[str, DigestPolicy]:
+        """The digest policies per category for the notification workers."""
+        return {
+            value: c.digest
+            for value, c in self._categories.items()
+            if c.digest is not None
+        }
+
+    def register_step1(self, name: str = "step1", filename: str = "step1.json") -> None:
+        """Registers the step1 modal with one select option per category."""
+        if len(self._categories) > MAX_OPTIONS:
+            raise TemplateError(
+                f"A static_select can have up to {MAX_OPTIONS} options, "
+                f"but there are {len(self._categories)} categories"
+            )
+        self.views.load(name, filename, transform=self._add_category_options)
+
+    def _add_category_options(self, view: dict) -> None:
+        select = _find_element(view, SELECT_ACTION_ID)
+        if select is None:
+            raise TemplateError(f"{SELECT_ACTION_ID} does not exist")
+        select["options"] = [
+            {"text": {"type": "plain_text", "text": c.label}, "value": c.value}
+            for c in self._categories.values()
+        ]
+
+
+def _find_element(view: dict, action_id: str) -> Optional[dict]:
+    for block in view["blocks"]:
+        elements = block.get("elements") or [
+            block.get("element"),
+            block.get("accessory"),
+        ]
+        for element in elements:
+            if element and element.get("action_id") == action_id:
+                return element
+    return None
+
+
+def _external_selects(fields: Sequence[Field]) -> Optional[Transform]:
+    """Turns the selects of external_select fields into external_selects.
+
+    The modal files are shared with the JavaScript app, which keeps static
+    options in them; here the options come from block_suggestion requests.
+    """
+    block_ids = {f.block_id for f in fields if f.element_type == "external_select"}
+    if not block_ids:
+        return None
+
+    def transform(view: dict) -> None:
+        for block in view["blocks"]:
+            if block.get("block_id") in block_ids:
+                element = block["element"]
+                element["type"] = "external_select"
+                element.pop("options", None)
+                element.pop("option_groups", None)
+                # Show the first options as soon as the menu is opened
+                element["min_query_length"] = 0
+
+    return transform
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+from helpdesk.users import TTLCache
+
+# Slack retries an event three times: right away, after 1 minute, and after 5
+DEFAULT_TTL = 60 * 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Inserts the key, or takes over an expired one; changes nothing otherwise
+CLAIM = """
+INSERT INTO deliveries (key, expires_at) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET expires_at = excluded.expires_at
+WHERE deliveries.expires_at <= ?
+"""
+
+
+def delivery_key(body: dict) -> Optional[str]:
+    """Returns what identifies a delivery from Slack, or None if nothing does.
+
+    Events have a unique event_id. Every interaction (a shortcut, a button
+    click, a modal submission) comes with its own trigger_id, while the
+    view hash stays the same when a user fixes errors and submits again.
+    """
+    event_id = body.get("event_id")
+    if event_id:
+        return f"event:{event_id}"
+    trigger_id = body.get("trigger_id")
+    if trigger_id:
+        return f"trigger:{trigger_id}"
+    return None
+
+
+class MemoryDeliveryStore:
+    """Delivery keys kept in this process."""
+
+    def __init__(self, max_size: int = 100_000):
+        self._keys = TTLCache(max_size)
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """Returns True only for the first claim within the TTL."""
+        return self._keys.add(key, True, ttl)
+
+    def release(self, key: str) -> None:
+        self._keys.discard(key)
+
+
+class SQLiteDeliveryStore:
+    """Delivery keys in a SQLite database shared by worker processes."""
+
+    def __init__(self, path: str = "helpdesk.db", purge_interval: float = 60):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._purged_at = time.time()
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def claim(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            claimed = conn.execute(CLAIM, (key, now + ttl, now)).rowcount == 1
+            if now - self._purged_at > self.purge_interval:
+                self._purged_at = now
+                conn.execute("DELETE FROM deliveries WHERE expires_at <= ?", (now,))
+        return claimed
+
+    def release(self, key: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM deliveries WHERE key = ?", (key,))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class Deduplicator:
+    """Tells duplicate deliveries of the same request from Slack apart.
+
+    The first delivery claims its key; further deliveries within the TTL
+    are duplicates. A failed delivery can be released so that Slack's
+    retry runs the listeners again.
+    """
+
+    def __init__(
+        self,
+        store: Optional[Union[MemoryDeliveryStore, SQLiteDeliveryStore]] = None,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.store = store or MemoryDeliveryStore()
+        self.ttl = ttl
+        self.checked = 0
+        self.duplicates = 0
+        self.released = 0
+
+    def is_duplicate(self, body: dict) -> bool:
+        key = delivery_key(body)
+        if key is None:
+            return False
+        self.checked += 1
+        if self.store.claim(key, self.ttl):
+            return False
+        self.duplicates += 1
+        return True
+
+    def release(self, body: dict) -> None:
+        key = delivery_key(body)
+        if key is not None:
+            self.released += 1
+            self.store.release(key)
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "released": self.released,
+            "hit_rate": self.duplicates / self.checked if self.checked else 0.0,
+        }
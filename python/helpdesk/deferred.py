@@ -0,0 +1,50 @@
+import asyncio
+import functools
+from typing import Awaitable, Callable, Optional
+
+
+class AsyncDeferredWork:
+    """Limits how many lazy listener functions run at the same time.
+
+    AsyncApp starts each lazy function as a task as soon as the request is
+    acknowledged. Functions decorated with this wait for one of
+    max_concurrency slots first, so a burst of interactions cannot start
+    an unbounded number of API calls.
+    """
+
+    def __init__(self, max_concurrency: int = 10):
+        self.max_concurrency = max_concurrency
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __call__(
+        self, func: Callable[..., Awaitable[None]]
+    ) -> Callable[..., Awaitable[None]]:
+        # Bolt passes the arguments func asks for; it unwraps the signature
+        @functools.wraps(func)
+        async def run(**kwargs) -> None:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+            self.running += 1
+            try:
+                await func(**kwargs)
+            finally:
+                self.running -= 1
+                self.completed += 1
+                self._semaphore.release()
+
+        return run
+
+    def stats(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+        }
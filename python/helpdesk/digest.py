@@ -0,0 +1,82 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# A message can have up to 50 blocks: a header, then a divider and a section
+# for each request
+MAX_DIGEST_SIZE = 24
+
+
+class DigestPolicy:
+    """How long and for how many requests channel notifications are held."""
+
+    __slots__ = ("max_size", "max_wait")
+
+    def __init__(self, max_size: int = 10, max_wait: float = 60.0):
+        if not 1 <= max_size <= MAX_DIGEST_SIZE:
+            raise ValueError(f"max_size must be between 1 and {MAX_DIGEST_SIZE}")
+        self.max_size = max_size
+        self.max_wait = max_wait
+
+
+class _Batch:
+    __slots__ = ("items", "max_size", "deadline")
+
+    def __init__(self, max_size: int, deadline: float):
+        self.items: List[Any] = []
+        self.max_size = max_size
+        self.deadline = deadline
+
+
+class DigestBuffer:
+    """Notifications to be sent together, per destination channel.
+
+    A channel that has not been posted to within a policy's max_wait gets
+    a notification right away. While it is busy, notifications are held
+    until max_size of them are waiting or max_wait has passed since the
+    last post, and then go out as one message. When notifications held
+    together have different policies, the smaller limits apply.
+
+    Channels can be any hashable keys, such as (enterprise_id, team_id,
+    channel) when the same channel name exists in many workspaces. This does
+    no I/O and is not thread-safe; add() and due() return the batches to
+    send now.
+    """
+
+    def __init__(self):
+        self._batches: Dict[Hashable, _Batch] = {}
+        self._last_sent: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return sum(len(b.items) for b in self._batches.values())
+
+    def add(
+        self, channel: Hashable, item: Any, policy: DigestPolicy, now: float
+    ) -> Optional[List[Any]]:
+        batch = self._batches.get(channel)
+        if batch is None:
+            last_sent = self._last_sent.get(channel)
+            if last_sent is None or now - last_sent >= policy.max_wait:
+                self._last_sent[channel] = now
+                return [item]
+            batch = _Batch(policy.max_size, last_sent + policy.max_wait)
+            self._batches[channel] = batch
+        else:
+            batch.max_size = min(batch.max_size, policy.max_size)
+            batch.deadline = min(batch.deadline, now + policy.max_wait)
+        batch.items.append(item)
+        if len(batch.items) >= batch.max_size:
+            return self._take(channel, now)
+        return None
+
+    def next_deadline(self) -> Optional[float]:
+        return min((b.deadline for b in self._batches.values()), default=None)
+
+    def due(self, now: float) -> List[Tuple[Hashable, List[Any]]]:
+        channels = [c for c, b in self._batches.items() if b.deadline <= now]
+        return [(c, self._take(c, now)) for c in channels]
+
+    def drain(self, now: float) -> List[Tuple[Hashable, List[Any]]]:
+        return [(c, self._take(c, now)) for c in list(self._batches)]
+
+    def _take(self, channel: Hashable, now: float) -> List[Any]:
+        self._last_sent[channel] = now
+        return self._batches.pop(channel).items
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Tuple
+
+from helpdesk.notifications import build_message
+from helpdesk.store import SubmissionStore
+from helpdesk.submissions import HelpdeskRequest
+
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+
+# A Home tab can have up to 100 blocks and each submission uses two
+MAX_SUBMISSIONS = 50
+
+EMPTY_HOME_PAYLOAD = json.dumps(
+    {
+        "type": "home",
+        "blocks": [
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": "You have no requests yet."},
+            }
+        ],
+    },
+    separators=(",", ":"),
+)
+
+
+def render_submission(request: HelpdeskRequest) -> str:
+    # A section's text can have up to 3000 characters
+    text = build_message(request)[:3000]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": text}},
+        {"type": "divider"},
+    ]
+    # Without the enclosing brackets so that fragments can be joined as-is
+    return json.dumps(blocks, separators=(",", ":"))[1:-1]
+
+
+class HomeTabs:
+    """The latest submissions per user (in a workspace), as rendered fragments.
+
+    Adding a submission renders only that submission's blocks; building the
+    whole Home tab is a string join over the cached fragments. With a store,
+    a user's fragments are loaded from it the first time they are needed,
+    and again once they are older than max_age seconds (when other processes
+    write to the same store). Only the max_users most recently used users
+    are kept.
+
+    Loading reads the store, so the asyncio app calls add() and payload()
+    in an executor; they are thread-safe.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SubmissionStore] = None,
+        max_submissions: int = MAX_SUBMISSIONS,
+        max_age: Optional[float] = None,
+        max_users: int = 10_000,
+    ):
+        self.store = store
+        self.max_submissions = max_submissions
+        self.max_age = max_age
+        self.max_users = max_users
+        self._fragments: "OrderedDict[Tuple, Tuple[float, Deque[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, request: HelpdeskRequest) -> None:
+        fragments = self._user_fragments(request.team_id, request.user_id)
+        fragments.append(render_submission(request))
+
+    def payload(self, team_id: Optional[str], user_id: str) -> str:
+        fragments = self._user_fragments(team_id, user_id)
+        if not fragments:
+            return EMPTY_HOME_PAYLOAD
+        return '{"type":"home","blocks":[' + ",".join(fragments) + "]}"
+
+    def _user_fragments(self, team_id: Optional[str], user_id: str) -> Deque[str]:
+        now = time.monotonic()
+        key = (team_id, user_id)
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is not None:
+                loaded_at, fragments = entry
+                stale = self.max_age is not None and now - loaded_at >= self.max_age
+                if not stale or self.store is None:
+                    self._fragments.move_to_end(key)
+                    return fragments
+        fragments = deque(maxlen=self.max_submissions)
+        if self.store is not None:
+            # Not holding the lock, which other users' lookups need meanwhile
+            stored = self.store.by_user(team_id, user_id, limit=self.max_submissions)
+            fragments.extend(render_submission(r) for r in reversed(stored))
+        with self._lock:
+            self._fragments[key] = (now, fragments)
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_users:
+                self._fragments.popitem(last=False)
+        return fragments
+
+
+class AsyncHomeTabPublisher:
+    """Publishes Home tabs with per-user coalescing and per-team limits.
+
+    refresh() calls for a user within the debounce window share one
+    views.publish call, which always sends the latest state. At most
+    max_in_flight publishes run concurrently for each workspace.
+    """
+
+    def __init__(
+        self,
+        home_tabs: HomeTabs,
+        debounce: float = 1.0,
+        max_in_flight: int = 4,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.home_tabs = home_tabs
+        self.debounce = debounce
+        self.max_in_flight = max_in_flight
+        self.logger = logger or logging.getLogger(__name__)
+        self.published = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def refresh(self, client: "AsyncWebClient", team_id: str, user_id: str) -> None:
+        key = f"{team_id}:{user_id}"
+        if key in self._pending:
+            self.coalesced += 1
+            return
+        self._pending[key] = asyncio.ensure_future(
+            self._publish(client, team_id, user_id, key)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+    async def _publish(
+        self, client: "AsyncWebClient", team_id: str, user_id: str, key: str
+    ) -> None:
+        try:
+            await asyncio.sleep(self.debounce)
+            semaphore = self._semaphores.get(team_id)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_in_flight)
+                self._semaphores[team_id] = semaphore
+            async with semaphore:
+                # Refreshes arriving from here on need another publish
+                self._pending.pop(key, None)
+                # The tab may be (re)loaded from the store
+                view = await asyncio.get_running_loop().run_in_executor(
+                    None, self.home_tabs.payload, team_id, user_id
+                )
+                await client.views_publish(user_id=user_id, view=view)
+            self.published += 1
+        except Exception as e:
+            self.failed += 1
+            self.logger.error(f"Failed to publish the Home tab for {user_id}: {e}")
+        finally:
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
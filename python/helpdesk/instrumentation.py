@@ -0,0 +1,28 @@
+import time
+from typing import Union
+
+from slack_bolt import BoltRequest
+from slack_bolt.async_app import AsyncBoltRequest
+
+from helpdesk.metrics import HistogramFamily
+
+
+def payload_type(body: dict) -> str:
+    """e.g. "view_submission", or "app_home_opened" for Events API payloads."""
+    if body.get("type") == "event_callback":
+        return body.get("event", {}).get("type", "event_callback")
+    return body.get("type") or ("slash_command" if "command" in body else "unknown")
+
+
+def observe_response(
+    histogram: HistogramFamily,
+    request: Union[BoltRequest, AsyncBoltRequest],
+    started: float,
+) -> None:
+    """Records the time since a request arrived (perf_counter()), by payload type.
+
+    Called by the server once the response is ready, as listeners run with
+    process_before_response=True and Slack only gets the response after
+    they (and Bolt's middleware, e.g. authorization) have returned.
+    """
+    histogram.observe(payload_type(request.body), time.perf_counter() - started)
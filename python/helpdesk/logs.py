@@ -0,0 +1,220 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import sys
+from datetime import date, datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Collection, Dict, Mapping, Optional, TextIO
+
+# Keys whose values never show up in logs, at any depth of a logged payload
+SECRET_KEYS = frozenset(
+    {
+        "token",
+        "bot_token",
+        "user_token",
+        "access_token",
+        "client_secret",
+        "signing_secret",
+        "authorization",
+        "x-slack-signature",
+        "response_url",
+    }
+)
+REDACTED = "[REDACTED]"
+# Longer strings in logged payloads are cut, e.g. a whole view's JSON
+MAX_VALUE_LENGTH = 500
+
+# Tokens inside messages, e.g. in slack_sdk's debug logs of request headers
+_TOKEN = re.compile(r"\b(xox[a-z]|xapp)-[0-9A-Za-z-]+")
+
+# The attributes every LogRecord has; anything else came with extra={...}
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+
+def redact(value: Any, max_length: int = MAX_VALUE_LENGTH) -> Any:
+    """Returns a JSON-friendly copy of value without secrets or long strings."""
+    if isinstance(value, str):
+        if len(value) > max_length:
+            value = f"{value[:max_length]}...(+{len(value) - max_length} chars)"
+        return _TOKEN.sub(r"\1-" + REDACTED, value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Mapping):
+        return {
+            str(k): REDACTED if str(k).lower() in SECRET_KEYS else redact(v, max_length)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [redact(v, max_length) for v in value]
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    slots = getattr(type(value), "__slots__", None)
+    if slots:
+        # e.g. HelpdeskRequest
+        return redact({name: getattr(value, name, None) for name in slots}, max_length)
+    return redact(str(value), max_length)
+
+
+def extras(record: logging.LogRecord) -> Dict[str, Any]:
+    return {
+        k: redact(v) for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES
+    }
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the record's extra={...} fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": redact(record.getMessage(), max_length=sys.maxsize),
+            **extras(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """basicConfig's format, followed by the extra={...} fields as key=value."""
+
+    def __init__(self):
+        super().__init__(logging.BASIC_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        text = _TOKEN.sub(r"\1-" + REDACTED, text)
+        fields = extras(record)
+        if fields:
+            text += " " + " ".join(
+                f"{k}={json.dumps(v, ensure_ascii=False, default=str)}"
+                for k, v in fields.items()
+            )
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """Lets 1 in every `every` records below `level` through, and all others."""
+
+    def __init__(self, every: int, level: int = logging.WARNING):
+        super().__init__()
+        self.every = every
+        self.level = level
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level or self.every <= 1:
+            return True
+        # next() on itertools.count is atomic under the GIL
+        return next(self._counter) % self.every == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to a QueueListener thread without formatting them.
+
+    The message, the extra fields and the traceback are formatted on the
+    listener thread, so log arguments must not be changed after logging.
+    When the queue is full, records are dropped and counted rather than
+    making the caller wait.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogListener(QueueListener):
+    """A QueueListener that can be stopped when its queue is full, and twice."""
+
+    def enqueue_sentinel(self) -> None:
+        # Waits for the thread to make room, instead of raising queue.Full
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+    def join(self) -> None:
+        """Waits until the records queued so far have been written."""
+        self.queue.join()
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Parses "slack_bolt=WARNING,helpdesk=DEBUG" into {logger: level}."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.strip().partition("=")
+        if sep:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure(
+    level: str = "DEBUG",
+    levels: Optional[Mapping[str, str]] = None,
+    log_format: str = "text",
+    sample_every: int = 1,
+    max_queue_size: int = 10_000,
+    stream: Optional[TextIO] = None,
+    filters: Collection[logging.Filter] = (),
+) -> LogListener:
+    """Replaces the root logger's handlers with a non-blocking queue handler.
+
+    Records go through a bounded queue to a listener thread, which formats
+    and writes them to the stream (stderr by default). Returns the started
+    listener; it is stopped at exit, writing out what is still queued.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max_queue_size)
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if log_format == "json" else TextFormatter())
+    handler = NonBlockingQueueHandler(q)
+    if sample_every > 1:
+        handler.addFilter(SamplingFilter(sample_every))
+    for f in filters:
+        handler.addFilter(f)
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    listener = LogListener(q, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def configure_from_env() -> LogListener:
+    """configure() with LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, and LOG_SAMPLE_EVERY.
+
+    The defaults log everything as text, like logging.basicConfig(DEBUG).
+    For production, e.g. LOG_LEVEL=INFO LOG_FORMAT=json
+    LOG_LEVELS=slack_bolt=WARNING,slack_sdk=WARNING.
+    """
+    return configure(
+        level=os.environ.get("LOG_LEVEL", "DEBUG"),
+        levels=parse_levels(os.environ.get("LOG_LEVELS", "")),
+        log_format=os.environ.get("LOG_FORMAT", "text"),
+        sample_every=int(os.environ.get("LOG_SAMPLE_EVERY", 1)),
+    )
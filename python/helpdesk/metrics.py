@@ -0,0 +1,369 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple, TypeVar, Union
+
+# Seconds; from sub-millisecond work up to Slack's 3-second ack deadline and beyond
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 3, 5, 10)
+
+
+class Histogram:
+    """A cumulative histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self) -> Tuple[Tuple[str, int], ...]:
+        """Returns (upper bound, count) pairs including the +Inf bucket."""
+        with self._lock:
+            counts = list(self.counts)
+        result, total = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return tuple(result)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class HistogramFamily:
+    """Histograms keyed by a label value, created on first use."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo: dict) -> "HistogramFamily":
+        # Lazy listeners get a deep copy of the request and what its context holds
+        return self
+
+    def observe(self, label: str, value: float) -> None:
+        histogram = self.histograms.get(label)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(label, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def to_dict(self) -> dict:
+        return {label: h.to_dict() for label, h in list(self.histograms.items())}
+
+
+class CounterFamily:
+    """Counters keyed by a label value (or a tuple of them), created on first use."""
+
+    def __init__(self):
+        self.values: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo: dict) -> "CounterFamily":
+        # Lazy listeners get a deep copy of the request and what its context holds
+        return self
+
+    def inc(self, label: Hashable, amount: float = 1) -> None:
+        with self._lock:
+            self.values[label] = self.values.get(label, 0) + amount
+
+    def to_dict(self) -> dict:
+        return dict(self.values)
+
+
+class GaugeFamily(CounterFamily):
+    """Values keyed by a label value that go up and down."""
+
+    def dec(self, label: Hashable, amount: float = 1) -> None:
+        self.inc(label, -amount)
+
+
+class StatsFamily:
+    """Values keyed by a label value, read from a component when rendered.
+
+    read() returns the label values and their numbers, e.g. picked from
+    the component's stats(); kind is "counter" or "gauge".
+    """
+
+    def __init__(
+        self, read: Callable[[], Dict[Hashable, float]], kind: str = "counter"
+    ):
+        self.read = read
+        self.kind = kind
+
+    def to_dict(self) -> dict:
+        return dict(self.read())
+
+
+Family = Union[HistogramFamily, CounterFamily, StatsFamily]
+# A label name, or a tuple of them for values keyed by tuples (or by () for none)
+Labels = Union[str, Tuple[str, ...]]
+F = TypeVar("F", bound=Callable)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(label: Labels, value: Hashable, *extra: str) -> str:
+    if isinstance(label, str):
+        label, value = (label,), (value,)
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(label, value)]  # type: ignore
+    pairs += extra
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def exposition(name: str, help: str, label: Labels, family: Family) -> List[str]:
+    """Returns the lines of a family in the Prometheus text format."""
+    if isinstance(family, HistogramFamily):
+        kind = "histogram"
+    elif isinstance(family, GaugeFamily):
+        kind = "gauge"
+    elif isinstance(family, StatsFamily):
+        kind = family.kind
+    else:
+        kind = "counter"
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    if isinstance(family, HistogramFamily):
+        for value, histogram in sorted(list(family.histograms.items())):
+            labels = _labels(label, value)
+            for bound, count in histogram.cumulative():
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(label, value, le)} {count}")
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+    else:
+        for value, number in sorted(family.to_dict().items()):
+            lines.append(f"{name}{_labels(label, value)} {number:g}")
+    return lines
+
+
+class Metrics:
+    """Latency histograms, error counts and in-flight gauges for /metrics.
+
+    Listener functions decorated with timed() are measured by their name.
+    Other components' families (e.g. the rate limit scheduler's) are
+    added with register() and rendered along with these.
+    """
+
+    def __init__(self, prefix: str = "helpdesk"):
+        self.prefix = prefix
+        self.handler_seconds = HistogramFamily()
+        self.handler_errors = CounterFamily()
+        self.handler_in_flight = GaugeFamily()
+        # From receiving a request until responding to Slack, per payload type
+        self.ack_seconds = HistogramFamily()
+        self._families: List[Tuple[str, str, Labels, Family]] = [
+            (
+                "handler_seconds",
+                "Time spent in listener functions",
+                "handler",
+                self.handler_seconds,
+            ),
+            (
+                "handler_errors_total",
+                "Listener functions that raised",
+                "handler",
+                self.handler_errors,
+            ),
+            (
+                "handler_in_flight",
+                "Listener functions running now",
+                "handler",
+                self.handler_in_flight,
+            ),
+            (
+                "ack_seconds",
+                "Time until the response to Slack since a request was received",
+                "type",
+                self.ack_seconds,
+            ),
+        ]
+
+    def register(self, name: str, help: str, label: Labels, family: Family) -> None:
+        self._families.append((name, help, label, family))
+
+    def register_stats(
+        self,
+        name: str,
+        help: str,
+        label: Labels,
+        read: Callable[[], Dict[Hashable, float]],
+        kind: str = "counter",
+    ) -> None:
+        """Adds values read from a component (e.g. its stats()) when rendered."""
+        self.register(name, help, label, StatsFamily(read, kind))
+
+    def register_rate_limits(self, scheduler) -> None:
+        """Adds a (sync or async) rate limit scheduler's Web API call metrics."""
+        self.register(
+            "api_queue_wait_seconds",
+            "Time Web API calls waited for the rate limits",
+            "method",
+            scheduler.queue_wait,
+        )
+        self.register(
+            "api_priority_queue_wait_seconds",
+            "Time Web API calls waited for the rate limits, by priority",
+            "priority",
+            scheduler.priority_queue_wait,
+        )
+        self.register(
+            "api_call_seconds",
+            "Time Slack took to respond to Web API calls",
+            "method",
+            scheduler.call_seconds,
+        )
+        self.register(
+            "api_errors_total",
+            "Web API calls that failed, by the error Slack returned",
+            ("method", "error"),
+            scheduler.errors,
+        )
+        self.register_stats(
+            "api_calls_in_flight",
+            "Web API calls waiting for Slack's response now",
+            (),
+            lambda: {(): scheduler.in_flight},
+            kind="gauge",
+        )
+        self.register_stats(
+            "api_calls_not_made_total",
+            "Web API calls given up on: rate limited, or past their deadline",
+            "reason",
+            lambda: {
+                "rate_limited": scheduler.rate_limited,
+                "deadline": scheduler.dropped,
+            },
+        )
+
+    def register_deduplicator(self, deduplicator) -> None:
+        """Adds a Deduplicator's counts of the deliveries it has checked."""
+        self.register_stats(
+            "deliveries_total",
+            "Deliveries from Slack checked for duplicates, by result",
+            "result",
+            lambda: {
+                "checked": deduplicator.checked,
+                "duplicate": deduplicator.duplicates,
+                "released": deduplicator.released,
+            },
+        )
+
+    def register_notifications(self, worker) -> None:
+        """Adds a (sync or async) notification worker's queue and counts."""
+        self.register_stats(
+            "notification_queue_depth",
+            "Submissions waiting for their notifications to be sent",
+            (),
+            lambda: {(): worker.stats()["depth"]},
+            kind="gauge",
+        )
+        self.register_stats(
+            "notifications_total",
+            "Submissions whose notifications were queued, sent, failed or dropped",
+            "result",
+            lambda: {
+                "enqueued": worker.metrics.enqueued,
+                "sent": worker.metrics.processed,
+                "failed": worker.metrics.failed,
+                "dropped": worker.metrics.rejected,
+            },
+        )
+        self.register_stats(
+            "notification_digests_total",
+            "Channel notifications held for a digest, and the digests sent",
+            "result",
+            lambda: {
+                "held": worker.metrics.digested,
+                "sent": worker.metrics.digests,
+            },
+        )
+
+    def register_cache(self, name: str, cache) -> None:
+        """Adds a cache's size and lookups (e.g. a UserCache's) as name_*."""
+        self.register_stats(
+            f"{name}_entries",
+            "Entries in the cache now",
+            (),
+            lambda: {(): cache.stats()["size"]},
+            kind="gauge",
+        )
+        self.register_stats(
+            f"{name}_lookups_total",
+            "Cache lookups, by result",
+            "result",
+            lambda: {"hit": cache.hits, "miss": cache.misses},
+        )
+
+    def register_ingress(self, ingress) -> None:
+        """Adds the requests the Ingress answered before Bolt."""
+        self.register_stats(
+            "ingress_requests_total",
+            "Requests rejected, retries seen, and events ignored before Bolt",
+            "result",
+            lambda: {
+                "rejected": ingress.rejected,
+                "retry": ingress.retries,
+                "ignored": ingress.ignored,
+            },
+        )
+
+    def timed(self, func: F) -> F:
+        name = func.__name__
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def run_async(*args, **kwargs):
+                started = self._start(name)
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    self.handler_errors.inc(name)
+                    raise
+                finally:
+                    self._finish(name, started)
+
+            return run_async  # type: ignore
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            started = self._start(name)
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.handler_errors.inc(name)
+                raise
+            finally:
+                self._finish(name, started)
+
+        return run  # type: ignore
+
+    def _start(self, name: str) -> float:
+        self.handler_in_flight.inc(name)
+        return time.perf_counter()
+
+    def _finish(self, name: str, started: float) -> None:
+        self.handler_seconds.observe(name, time.perf_counter() - started)
+        self.handler_in_flight.dec(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, help, label, family in self._families:
+            lines += exposition(f"{self.prefix}_{name}", help, label, family)
+        return "\n".join(lines) + "\n"
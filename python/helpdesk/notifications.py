@@ -0,0 +1,446 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+
+from slack_sdk import WebClient
+
+from helpdesk.digest import DigestBuffer, DigestPolicy
+from helpdesk.submissions import HelpdeskRequest
+from helpdesk.users import AsyncUserCache, UserCache
+
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+
+HELPDESK_CHANNEL = os.environ.get("HELPDESK_CHANNEL", "#general")
+
+
+def build_message(request: HelpdeskRequest) -> str:
+    approver = f"<@{request.approver}>" if request.approver else "-"
+    return (
+        f"*Title*: {request.title}\n"
+        f"*Laptop Model*: {request.laptop_model or '-'}\n"
+        f"*Mobile OS*: {request.os or '-'}\n"
+        f"*Description*: {request.description or '-'}\n"
+        f"*Due Date*: {request.due_date or '-'}\n"
+        f"*Approver*: {approver}"
+    )
+
+
+def build_channel_text(request: HelpdeskRequest) -> str:
+    return (
+        f":new: *New Request* :new:\n"
+        f"We’ve got a request from <@{request.user_id}>:\n{build_message(request)}"
+    )
+
+
+def build_digest(requests: List[HelpdeskRequest]) -> Tuple[str, List[dict]]:
+    """Returns the text and blocks of a message for several requests."""
+    text = f":new: *{len(requests)} New Requests* :new:"
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
+    for request in requests:
+        section = f"From <@{request.user_id}>:\n{build_message(request)}"
+        blocks.append({"type": "divider"})
+        # A section's text can have up to 3000 characters
+        blocks.append(
+            {"type": "section", "text": {"type": "mrkdwn", "text": section[:3000]}}
+        )
+    return text, blocks
+
+
+def build_notifications(
+    request: HelpdeskRequest, channel: Optional[str] = HELPDESK_CHANNEL
+) -> List[Tuple[str, str]]:
+    """Returns (user or channel ID, text) pairs to send for a submission.
+
+    With channel=None, the channel notification is left to a digest.
+    """
+    message = build_message(request)
+    submitter = request.user_id
+    notifications = []
+    if channel is not None:
+        notifications.append((channel, build_channel_text(request)))
+    notifications.append(
+        (
+            submitter,
+            f"*Thank you!* :bow:\n"
+            f"You've sent the following request. "
+            f"I will update you on this shortly.\n{message}",
+        )
+    )
+    if request.approver:
+        notifications.append(
+            (
+                request.approver,
+                f":wave: Hi from Helpdesk team! <@{submitter}> needs "
+                f"*your approval* on the following request.\n{message}",
+            )
+        )
+    return notifications
+
+
+def _is_user_id(user_or_channel_id: str) -> bool:
+    return user_or_channel_id.startswith(("U", "W"))
+
+
+def send_notification(
+    client: WebClient,
+    user_or_channel_id: str,
+    text: str,
+    users: Optional[UserCache] = None,
+    team_id: Optional[str] = None,
+):
+    channel = user_or_channel_id
+    if _is_user_id(user_or_channel_id):
+        if users is not None:
+            channel = users.dm_channel(client, team_id, user_or_channel_id)
+            if channel is None:
+                # e.g., a deactivated approver; not asked again for a while
+                return
+        else:
+            res = client.conversations_open(users=user_or_channel_id)
+            channel = res["channel"]["id"]
+    client.chat_postMessage(channel=channel, text=text)
+
+
+async def async_send_notification(
+    client: "AsyncWebClient",
+    user_or_channel_id: str,
+    text: str,
+    users: Optional[AsyncUserCache] = None,
+    team_id: Optional[str] = None,
+):
+    channel = user_or_channel_id
+    if _is_user_id(user_or_channel_id):
+        if users is not None:
+            channel = await users.dm_channel(client, team_id, user_or_channel_id)
+            if channel is None:
+                # e.g., a deactivated approver; not asked again for a while
+                return
+        else:
+            res = await client.conversations_open(users=user_or_channel_id)
+            channel = res["channel"]["id"]
+    await client.chat_postMessage(channel=channel, text=text)
+
+
+# (enterprise_id, team_id, channel): a workspace's channel, posted to by its bot
+DigestKey = Tuple[Optional[str], Optional[str], str]
+
+
+def digest_key(request: HelpdeskRequest, channel: str) -> DigestKey:
+    return request.enterprise_id, request.team_id, channel
+
+
+def send_digest(client: WebClient, channel: str, requests: List[HelpdeskRequest]):
+    if len(requests) == 1:
+        client.chat_postMessage(channel=channel, text=build_channel_text(requests[0]))
+    else:
+        text, blocks = build_digest(requests)
+        client.chat_postMessage(channel=channel, text=text, blocks=blocks)
+
+
+async def async_send_digest(
+    client: "AsyncWebClient", channel: str, requests: List[HelpdeskRequest]
+):
+    if len(requests) == 1:
+        await client.chat_postMessage(
+            channel=channel, text=build_channel_text(requests[0])
+        )
+    else:
+        text, blocks = build_digest(requests)
+        await client.chat_postMessage(channel=channel, text=text, blocks=blocks)
+
+
+class NotificationMetrics:
+    __slots__ = (
+        "enqueued",
+        "processed",
+        "failed",
+        "rejected",
+        "max_depth",
+        # Channel notifications held for a digest, and the messages sent for them
+        "digested",
+        "digests",
+    )
+
+    def __init__(self):
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.digested = 0
+        self.digests = 0
+
+    def to_dict(self, depth: int) -> dict:
+        return {
+            "depth": depth,
+            **{name: getattr(self, name) for name in self.__slots__},
+        }
+
+
+class NotificationWorker:
+    """Sends submission notifications on background threads.
+
+    accept_view_submission only enqueues the request after ack(), so the
+    response to Slack never waits for chat.postMessage. The queue is bounded:
+    when the workers fall behind, submit() returns False and the rejection
+    is counted instead of letting memory grow without limit.
+
+    For the categories in digests, the channel notifications go through a
+    DigestBuffer, while the submitter and the approver still get their
+    DMs right away.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        channel: str = HELPDESK_CHANNEL,
+        users: Optional[UserCache] = None,
+        digests: Optional[Mapping[str, DigestPolicy]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.channel = channel
+        self.users = users
+        self.digests: Dict[str, DigestPolicy] = dict(digests or {})
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = NotificationMetrics()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._digest = DigestBuffer()
+        self._digest_changed = threading.Condition()
+        # Each job sends up to three messages at the same time
+        self._senders = ThreadPoolExecutor(max_workers=workers * 3)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"notification-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        if self.digests:
+            self._threads.append(
+                threading.Thread(
+                    target=self._run_digests, name="notification-digest", daemon=True
+                )
+            )
+        for t in self._threads:
+            t.start()
+
+    def submit(self, client: WebClient, request: HelpdeskRequest) -> bool:
+        try:
+            self._queue.put_nowait((client, request))
+        except queue.Full:
+            with self._lock:
+                self.metrics.rejected += 1
+            self.logger.warning("Notification queue is full; dropped a submission")
+            return False
+        with self._lock:
+            self.metrics.enqueued += 1
+            self.metrics.max_depth = max(self.metrics.max_depth, self._queue.qsize())
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self.metrics.to_dict(self._queue.qsize())
+
+    def join(self) -> None:
+        self._queue.join()
+
+    def flush(self) -> None:
+        """Sends the digests being held right now."""
+        with self._digest_changed:
+            batches = self._digest.drain(time.monotonic())
+        for key, batch in batches:
+            self._send_digest(key, batch)
+
+    def _run(self) -> None:
+        while True:
+            client, request = self._queue.get()
+            try:
+                policy = self.digests.get(request.category)
+                channel = self.channel if policy is None else None
+                futures = [
+                    self._senders.submit(
+                        send_notification,
+                        client,
+                        dest,
+                        text,
+                        self.users,
+                        request.team_id,
+                    )
+                    for dest, text in build_notifications(request, channel)
+                ]
+                if policy is not None:
+                    self._add_to_digest(client, request, policy)
+                wait(futures)
+                errors = [f.exception() for f in futures if f.exception()]
+                for e in errors:
+                    self.logger.error(f"Failed to send a notification: {e}")
+                with self._lock:
+                    if errors:
+                        self.metrics.failed += 1
+                    else:
+                        self.metrics.processed += 1
+            finally:
+                self._queue.task_done()
+
+    def _add_to_digest(
+        self, client: WebClient, request: HelpdeskRequest, policy: DigestPolicy
+    ) -> None:
+        key = digest_key(request, self.channel)
+        with self._digest_changed:
+            batch = self._digest.add(key, (client, request), policy, time.monotonic())
+            # The deadline to wait for may have changed
+            self._digest_changed.notify()
+        with self._lock:
+            self.metrics.digested += 1
+        if batch is not None:
+            self._senders.submit(self._send_digest, key, batch)
+
+    def _run_digests(self) -> None:
+        while True:
+            with self._digest_changed:
+                deadline = self._digest.next_deadline()
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is None or timeout > 0:
+                    self._digest_changed.wait(timeout)
+                batches = self._digest.due(time.monotonic())
+            for key, batch in batches:
+                self._senders.submit(self._send_digest, key, batch)
+
+    def _send_digest(self, key: DigestKey, batch: list) -> None:
+        # Every request in the batch came from the key's workspace, with a
+        # client holding its bot token; the latest one will do
+        client = batch[-1][0]
+        try:
+            send_digest(client, key[-1], [request for _, request in batch])
+        except Exception as e:
+            self.logger.error(f"Failed to send a digest of {len(batch)} requests: {e}")
+            return
+        with self._lock:
+            self.metrics.digests += 1
+
+
+class AsyncNotificationWorker:
+    """The asyncio version of NotificationWorker, running consumer tasks."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        channel: str = HELPDESK_CHANNEL,
+        users: Optional[AsyncUserCache] = None,
+        digests: Optional[Mapping[str, DigestPolicy]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.channel = channel
+        self.users = users
+        self.digests: Dict[str, DigestPolicy] = dict(digests or {})
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = NotificationMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._digest = DigestBuffer()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline = 0.0
+
+    def submit(self, client: "AsyncWebClient", request: HelpdeskRequest) -> bool:
+        if self._queue is None:
+            # The queue and tasks have to be created on the running event loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._tasks = [
+                asyncio.ensure_future(self._run()) for _ in range(self.workers)
+            ]
+        try:
+            self._queue.put_nowait((client, request))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            self.logger.warning("Notification queue is full; dropped a submission")
+            return False
+        self.metrics.enqueued += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self._queue.qsize())
+        return True
+
+    def stats(self) -> dict:
+        return self.metrics.to_dict(self._queue.qsize() if self._queue else 0)
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def flush(self) -> None:
+        """Sends the digests being held right now."""
+        batches = self._digest.drain(time.monotonic())
+        await asyncio.gather(*[self._send_digest(c, b) for c, b in batches])
+
+    async def _run(self) -> None:
+        while True:
+            client, request = await self._queue.get()
+            try:
+                policy = self.digests.get(request.category)
+                if policy is not None:
+                    self._add_to_digest(client, request, policy)
+                channel = self.channel if policy is None else None
+                results = await asyncio.gather(
+                    *[
+                        async_send_notification(
+                            client, dest, text, self.users, request.team_id
+                        )
+                        for dest, text in build_notifications(request, channel)
+                    ],
+                    return_exceptions=True,
+                )
+                errors = [r for r in results if isinstance(r, Exception)]
+                for e in errors:
+                    self.logger.error(f"Failed to send a notification: {e}")
+                if errors:
+                    self.metrics.failed += 1
+                else:
+                    self.metrics.processed += 1
+            finally:
+                self._queue.task_done()
+
+    def _add_to_digest(
+        self, client: "AsyncWebClient", request: HelpdeskRequest, policy: DigestPolicy
+    ) -> None:
+        key = digest_key(request, self.channel)
+        batch = self._digest.add(key, (client, request), policy, time.monotonic())
+        self.metrics.digested += 1
+        if batch is not None:
+            asyncio.ensure_future(self._send_digest(key, batch))
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        deadline = self._digest.next_deadline()
+        if deadline is None:
+            return
+        if self._timer is not None:
+            if self._timer_deadline <= deadline:
+                return
+            self._timer.cancel()
+        self._timer_deadline = deadline
+        self._timer = asyncio.get_running_loop().call_later(
+            max(0.0, deadline - time.monotonic()), self._flush_due
+        )
+
+    def _flush_due(self) -> None:
+        self._timer = None
+        for key, batch in self._digest.due(time.monotonic()):
+            asyncio.ensure_future(self._send_digest(key, batch))
+        self._schedule_flush()
+
+    async def _send_digest(self, key: DigestKey, batch: list) -> None:
+        # Every request in the batch came from the key's workspace, with a
+        # client holding its bot token; the latest one will do
+        client = batch[-1][0]
+        try:
+            await async_send_digest(client, key[-1], [request for _, request in batch])
+        except Exception as e:
+            self.logger.error(f"Failed to send a digest of {len(batch)} requests: {e}")
+            return
+        self.metrics.digests += 1
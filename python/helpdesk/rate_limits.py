@@ -0,0 +1,360 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from helpdesk.metrics import CounterFamily, HistogramFamily
+from helpdesk.transport import ConnectionPool, PooledWebClient
+
+# Requests per minute for each Web API rate limit tier
+# https://api.slack.com/docs/rate-limits
+TIERS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_RATES = {
+    "views.open": TIERS[4],
+    "views.update": TIERS[4],
+    "views.push": TIERS[4],
+    "views.publish": TIERS[4],
+    "users.info": TIERS[4],
+    "conversations.open": TIERS[3],
+    # chat.postMessage has a special limit of around one message per second
+    # per channel (see PER_CHANNEL_METHODS)
+    "chat.postMessage": 60,
+}
+DEFAULT_RATE = TIERS[3]
+# Methods limited per channel rather than per workspace
+PER_CHANNEL_METHODS = frozenset(["chat.postMessage"])
+# Idle buckets are dropped once there are more than this many (e.g. channels)
+MAX_BUCKETS = 10_000
+
+CRITICAL, BULK = 0, 1
+# Modals have to be opened within 3 seconds of receiving a trigger_id,
+# and the user is staring at a modal waiting for views.update
+CRITICAL_METHODS = frozenset(["views.open", "views.update", "views.push"])
+# A call with a trigger_id has to get its token this soon after the request
+# arrived, leaving time for the call itself before the trigger_id expires
+TRIGGER_DEADLINE = 2.5
+
+
+class DeadlineExceeded(Exception):
+    """A call could not be scheduled before its deadline, so it was dropped."""
+
+
+def trigger_deadline(received_at: float, kwargs: dict) -> Optional[float]:
+    """Returns the deadline for a call made with the kwargs, if it has any."""
+    for name in ("json", "data", "params"):
+        args = kwargs.get(name)
+        if args and "trigger_id" in args:
+            return received_at + TRIGGER_DEADLINE
+    return None
+
+
+def rate_limit_channel(method: str, kwargs: dict) -> Optional[str]:
+    """Returns the channel whose bucket a call takes from, if it has its own."""
+    if method not in PER_CHANNEL_METHODS:
+        return None
+    for name in ("json", "data", "params"):
+        args = kwargs.get(name)
+        if args and "channel" in args:
+            return args["channel"]
+    return None
+
+
+def _retry_after(e: SlackApiError) -> Optional[float]:
+    if e.response.status_code != 429:
+        return None
+    for name, value in (e.response.headers or {}).items():
+        if name.lower() == "retry-after":
+            return float(value)
+    return 1.0
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at", "blocked_until", "waiters")
+
+    def __init__(self, per_minute: int, burst_seconds: float):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+
+    def wait_time(self, now: float, ahead: int = 0) -> float:
+        """Returns how long until a token is left after the ones for ahead."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        needed = ahead + 1 - self.tokens
+        wait = needed / self.rate if needed > 0 else 0.0
+        if self.blocked_until > now:
+            return max(wait, self.blocked_until - now)
+        return wait
+
+
+class _SchedulerState:
+    """Token buckets and waiter queues shared by the sync/async schedulers.
+
+    A call first waits for a token from its (team, method) bucket, or its
+    (team, method, channel) one for PER_CHANNEL_METHODS, then for
+    one of max_in_flight slots. Both queues are ordered by (priority, arrival)
+    so a views.open never sits behind a backlog of notification posts.
+
+    A call with a deadline (see trigger_deadline()) raises DeadlineExceeded
+    as soon as its expected wait goes past the deadline, instead of holding
+    its thread or task until a token comes that would be useless by then.
+    """
+
+    def __init__(
+        self,
+        method_rates: Optional[Dict[str, int]],
+        max_in_flight: int,
+        burst_seconds: float,
+        max_retries: int,
+        max_retry_after: float,
+    ):
+        self.method_rates = method_rates or METHOD_RATES
+        self.max_in_flight = max_in_flight
+        self.burst_seconds = burst_seconds
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.in_flight = 0
+        self.slot_waiters: List[Tuple[int, int]] = []
+        # Calls given up on after 429s, and before their deadline passed
+        self.rate_limited = 0
+        self.dropped = 0
+        # Per method, and per priority ("critical" or "bulk")
+        self.queue_wait = HistogramFamily()
+        self.priority_queue_wait = HistogramFamily()
+        # How long Slack took to respond, and the errors it returned, per method
+        self.call_seconds = HistogramFamily()
+        self.errors = CounterFamily()
+        self._buckets: Dict[Tuple[Optional[str], str, Optional[str]], _TokenBucket] = {}
+        self._sequence = itertools.count()
+
+    def priority(self, method: str) -> int:
+        return CRITICAL if method in CRITICAL_METHODS else BULK
+
+    def bucket(
+        self, team_id: Optional[str], method: str, channel: Optional[str] = None
+    ) -> _TokenBucket:
+        key = (team_id, method, channel)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._drop_idle_buckets()
+            rate = self.method_rates.get(method, DEFAULT_RATE)
+            bucket = _TokenBucket(rate, self.burst_seconds)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _drop_idle_buckets(self) -> None:
+        # A full bucket nobody waits for is the same as a new one
+        now = time.monotonic()
+        for key, bucket in list(self._buckets.items()):
+            if (
+                not bucket.waiters
+                and bucket.wait_time(now) == 0
+                and bucket.tokens >= bucket.capacity
+            ):
+                del self._buckets[key]
+
+    def enqueue(self, queue: List[Tuple[int, int]], method: str) -> Tuple[int, int]:
+        entry = (self.priority(method), next(self._sequence))
+        heapq.heappush(queue, entry)
+        return entry
+
+    def try_take_token(self, bucket: _TokenBucket, entry: Tuple[int, int]) -> float:
+        """Returns 0 when the token is taken, otherwise how long to wait."""
+        now = time.monotonic()
+        if bucket.waiters[0] != entry:
+            ahead = sum(1 for waiter in bucket.waiters if waiter < entry)
+            return max(bucket.wait_time(now, ahead), 0.001)
+        wait = bucket.wait_time(now)
+        if wait > 0:
+            return wait
+        heapq.heappop(bucket.waiters)
+        bucket.tokens -= 1
+        return 0.0
+
+    def check_deadline(
+        self, method: str, deadline: Optional[float], wait: float
+    ) -> Optional[float]:
+        """Raises DeadlineExceeded if waiting would go past the deadline.
+
+        Returns the time left until the deadline (None without one).
+        """
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if wait >= remaining:
+            self.dropped += 1
+            raise DeadlineExceeded(
+                f"{method} would wait {wait:.2f}s with {max(remaining, 0):.2f}s left"
+            )
+        return remaining
+
+    def discard(self, queue: List[Tuple[int, int]], entry: Tuple[int, int]) -> None:
+        """Removes a waiter that gave up (e.g., a cancelled task)."""
+        if entry in queue:
+            queue.remove(entry)
+            heapq.heapify(queue)
+
+    def try_take_slot(self, entry: Tuple[int, int]) -> bool:
+        if self.slot_waiters[0] != entry or self.in_flight >= self.max_in_flight:
+            return False
+        heapq.heappop(self.slot_waiters)
+        self.in_flight += 1
+        return True
+
+    def observe(self, method: str, waited: float) -> None:
+        label = "critical" if self.priority(method) == CRITICAL else "bulk"
+        self.priority_queue_wait.observe(label, waited)
+        self.queue_wait.observe(method, waited)
+
+    def observe_call(self, method: str, seconds: float, error: Optional[str]) -> None:
+        self.call_seconds.observe(method, seconds)
+        if error is not None:
+            self.errors.inc((method, error))
+
+    def retry_wait(
+        self,
+        team_id: Optional[str],
+        method: str,
+        e: SlackApiError,
+        attempt: int,
+        channel: Optional[str] = None,
+    ) -> Optional[float]:
+        """Blocks the bucket for Retry-After and tells whether to retry."""
+        retry_after = _retry_after(e)
+        if retry_after is None:
+            return None
+        bucket = self.bucket(team_id, method, channel)
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+        limit = 3 if method in CRITICAL_METHODS else self.max_retry_after
+        if attempt >= self.max_retries or retry_after > limit:
+            self.rate_limited += 1
+            return None
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting_for_slot": len(self.slot_waiters),
+            "rate_limited": self.rate_limited,
+            "dropped": self.dropped,
+            "queue_wait": self.queue_wait.to_dict(),
+            "priority_queue_wait": self.priority_queue_wait.to_dict(),
+            "call_seconds": self.call_seconds.to_dict(),
+            "errors": self.errors.to_dict(),
+        }
+
+
+class RateLimitScheduler(_SchedulerState):
+    """Schedules WebClient calls within Slack's per-method rate limits."""
+
+    def __init__(
+        self,
+        method_rates: Optional[Dict[str, int]] = None,
+        max_in_flight: int = 20,
+        burst_seconds: float = 10,
+        max_retries: int = 2,
+        max_retry_after: float = 30,
+    ):
+        super().__init__(
+            method_rates, max_in_flight, burst_seconds, max_retries, max_retry_after
+        )
+        self._condition = threading.Condition()
+
+    def acquire(
+        self,
+        team_id: Optional[str],
+        method: str,
+        deadline: Optional[float] = None,
+        channel: Optional[str] = None,
+    ) -> None:
+        started = time.monotonic()
+        with self._condition:
+            bucket = self.bucket(team_id, method, channel)
+            queue = bucket.waiters
+            entry = self.enqueue(queue, method)
+            try:
+                while True:
+                    wait = self.try_take_token(bucket, entry)
+                    if wait == 0:
+                        break
+                    self.check_deadline(method, deadline, wait)
+                    self._condition.wait(wait)
+                queue = self.slot_waiters
+                entry = self.enqueue(queue, method)
+                self._condition.notify_all()
+                while not self.try_take_slot(entry):
+                    self._condition.wait(self.check_deadline(method, deadline, 0.0))
+            except BaseException:
+                self.discard(queue, entry)
+                self._condition.notify_all()
+                raise
+        self.observe(method, time.monotonic() - started)
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def client(
+        self, client: WebClient, pool: Optional[ConnectionPool] = None
+    ) -> "RateLimitedWebClient":
+        """Returns a copy of the per-request client that goes through this scheduler."""
+        return RateLimitedWebClient(
+            scheduler=self,
+            pool=pool or getattr(client, "pool", None),
+            token=client.token,
+            base_url=client.base_url,
+            timeout=client.timeout,
+            ssl=client.ssl,
+            proxy=client.proxy,
+            headers=client.headers,
+            team_id=client.default_params.get("team_id"),
+            logger=client.logger,
+            retry_handlers=client.retry_handlers,
+        )
+
+
+class RateLimitedWebClient(PooledWebClient):
+    def __init__(self, *, scheduler: RateLimitScheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+        self.team_id = kwargs.get("team_id")
+        # Created for each request by the middleware, when the request arrived
+        self.received_at = time.monotonic()
+
+    def api_call(self, api_method: str, **kwargs):
+        attempt = 0
+        deadline = trigger_deadline(self.received_at, kwargs)
+        channel = rate_limit_channel(api_method, kwargs)
+        while True:
+            self.scheduler.acquire(self.team_id, api_method, deadline, channel)
+            started, error = time.perf_counter(), None
+            try:
+                return super().api_call(api_method, **kwargs)
+            except SlackApiError as e:
+                error = e.response.get("error") or str(e.response.status_code)
+                retry_after = self.scheduler.retry_wait(
+                    self.team_id, api_method, e, attempt, channel
+                )
+                if retry_after is None:
+                    raise
+                attempt += 1
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self.scheduler.observe_call(
+                    api_method, time.perf_counter() - started, error
+                )
+                self.scheduler.release()
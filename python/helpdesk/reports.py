@@ -0,0 +1,191 @@
+import csv
+import heapq
+import json
+import threading
+from collections import Counter
+from operator import attrgetter
+from datetime import date, datetime, timezone
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+from helpdesk.store import COLUMNS, SubmissionStore
+from helpdesk.submissions import HelpdeskRequest
+from helpdesk.validation import today
+
+# (id, created_at, request) as yielded by SubmissionStore.scan()
+Row = Tuple[int, float, HelpdeskRequest]
+
+EXPORT_COLUMNS = ("id", "created_at") + COLUMNS
+
+
+def _timestamp(created_at: float) -> str:
+    return datetime.fromtimestamp(created_at, timezone.utc).isoformat(
+        timespec="seconds"
+    )
+
+
+_values = attrgetter(*COLUMNS)
+_DUE_DATE = COLUMNS.index("due_date")
+
+
+def _export_values(row: Row) -> list:
+    id, created_at, request = row
+    values = [id, _timestamp(created_at), *_values(request)]
+    due_date = values[_DUE_DATE + 2]
+    if due_date is not None:
+        values[_DUE_DATE + 2] = due_date.isoformat()
+    return values
+
+
+def export_csv(rows: Iterable[Row], out: IO[str]) -> int:
+    """Writes the rows as CSV (which read_csv() reads back) and returns the count."""
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in _export_values(row)])
+        count += 1
+    return count
+
+
+def export_jsonl(rows: Iterable[Row], out: IO[str]) -> int:
+    """Writes the rows as JSON Lines and returns the count."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row)))))
+        out.write("\n")
+        count += 1
+    return count
+
+
+class ReportAggregates:
+    """Counts by category, overdue requests by approver, and time-to-due.
+
+    add() updates the aggregates with one submission, so a report over any
+    number of them is built in a single pass and in constant memory: due
+    dates that have not passed yet are kept per day, and the days from
+    submission to due date as a histogram (from which the median is exact).
+    There is no completion status, so a request is overdue once its due
+    date has passed.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_category: Counter = Counter()
+        self.days_to_due: Counter = Counter()
+        self._overdue: Counter = Counter()
+        # Due date -> approver -> count, for the due dates not passed yet
+        self._upcoming: Dict[date, Counter] = {}
+        self._upcoming_dates: List[date] = []
+        self._today: Optional[date] = None
+
+    def add(self, created_at: float, request: HelpdeskRequest) -> None:
+        self.total += 1
+        self.by_category[request.category] += 1
+        due_date = request.due_date
+        if due_date is None:
+            return
+        self.days_to_due[(due_date - date.fromtimestamp(created_at)).days] += 1
+        if self._today is not None and due_date < self._today:
+            self._overdue[request.approver] += 1
+            return
+        approvers = self._upcoming.get(due_date)
+        if approvers is None:
+            approvers = self._upcoming[due_date] = Counter()
+            heapq.heappush(self._upcoming_dates, due_date)
+        approvers[request.approver] += 1
+
+    def overdue_by_approver(self, as_of: Optional[date] = None) -> Counter:
+        """Returns the overdue requests per approver (None for no approver).
+
+        Requests counted as overdue stay so, even when as_of goes back.
+        """
+        as_of = as_of or today()
+        if self._today is None or as_of > self._today:
+            self._today = as_of
+        dates = self._upcoming_dates
+        while dates and dates[0] < self._today:
+            self._overdue.update(self._upcoming.pop(heapq.heappop(dates)))
+        return self._overdue
+
+    def median_days_to_due(self) -> Optional[float]:
+        count = sum(self.days_to_due.values())
+        if count == 0:
+            return None
+        # The two middle values' ranks (the same one for an odd count)
+        lower_rank, upper_rank = (count + 1) // 2, count // 2 + 1
+        seen, lower = 0, None
+        for days in sorted(self.days_to_due):
+            seen += self.days_to_due[days]
+            if lower is None and seen >= lower_rank:
+                lower = days
+            if seen >= upper_rank:
+                return (lower + days) / 2
+        return None
+
+    def to_dict(self, as_of: Optional[date] = None) -> dict:
+        overdue = self.overdue_by_approver(as_of)
+        return {
+            "as_of": self._today.isoformat(),
+            "total": self.total,
+            "by_category": dict(self.by_category.most_common()),
+            "overdue_by_approver": {
+                approver or "-": count
+                for approver, count in overdue.most_common()
+                if count > 0
+            },
+            "median_days_to_due": self.median_days_to_due(),
+        }
+
+
+def build_report_message(report: dict, max_approvers: int = 10) -> str:
+    categories = "\n".join(
+        f"• {category or '-'}: {count}"
+        for category, count in report["by_category"].items()
+    )
+    overdue = list(report["overdue_by_approver"].items())
+    approvers = "\n".join(
+        f"• {'-' if approver == '-' else f'<@{approver}>'}: {count}"
+        for approver, count in overdue[:max_approvers]
+    )
+    if len(overdue) > max_approvers:
+        approvers += f"\n• ({len(overdue) - max_approvers} more approvers)"
+    median = report["median_days_to_due"]
+    return (
+        f"*Helpdesk Requests* (as of {report['as_of']}): {report['total']}\n"
+        f"*By Category*\n{categories or '-'}\n"
+        f"*Overdue by Approver*\n{approvers or '-'}\n"
+        f"*Median Days to Due Date*: {'-' if median is None else f'{median:g}'}"
+    )
+
+
+class CachedReport:
+    """Per-workspace aggregates over a store, updated with new submissions only.
+
+    Each call reads the rows committed after the last one it has seen
+    (by this or any other process writing to the store) and adds each of
+    them to its own workspace's aggregates, instead of going over the
+    whole history again. A workspace's report never includes another's
+    submissions.
+    """
+
+    def __init__(self, store: SubmissionStore):
+        self.store = store
+        self._aggregates: Dict[Optional[str], ReportAggregates] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def to_dict(self, team_id: Optional[str], as_of: Optional[date] = None) -> dict:
+        with self._lock:
+            for id, created_at, request in self.store.scan(after_id=self._last_id):
+                aggregates = self._aggregates.get(request.team_id)
+                if aggregates is None:
+                    aggregates = self._aggregates[request.team_id] = ReportAggregates()
+                aggregates.add(created_at, request)
+                self._last_id = id
+            aggregates = self._aggregates.get(team_id)
+            if aggregates is None:
+                aggregates = self._aggregates[team_id] = ReportAggregates()
+            return aggregates.to_dict(as_of)
+
+    def message(self, team_id: Optional[str]) -> str:
+        return build_report_message(self.to_dict(team_id))
@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Mapping, Optional, Sequence, Union
+
+from slack_bolt import App, BoltRequest, BoltResponse
+
+from helpdesk.instrumentation import observe_response
+from helpdesk.metrics import HistogramFamily
+
+# GET paths and the functions returning their (text) responses, e.g. /metrics
+Pages = Mapping[str, Callable[[], str]]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default of 5 makes clients retry connecting (after 1s)
+    # as soon as a few more arrive at once
+    request_queue_size = 128
+
+
+class AppServer:
+    """App.start()'s development server, with extra GET pages such as /metrics.
+
+    Each request is handled on its own thread, so a scrape of /metrics
+    never waits behind a request from Slack. Apps with an OAuth flow get
+    its install and redirect pages as well. With path=None (e.g. next to
+    Socket Mode), only the GET pages are served. The time until each
+    response from the app is sent goes to response_seconds, if given.
+    """
+
+    def __init__(
+        self,
+        app: App,
+        port: int = 3000,
+        path: Optional[str] = "/slack/events",
+        pages: Pages = {},
+        content_type: str = "text/plain; version=0.0.4",
+        response_seconds: Optional[HistogramFamily] = None,
+    ):
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive; every response has a Content-Length
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args) -> None:
+                app.logger.debug(format % args)
+
+            def do_GET(self):
+                request_path, _, query = self.path.partition("?")
+                oauth_flow = app.oauth_flow
+                if oauth_flow is not None and request_path in (
+                    oauth_flow.install_path,
+                    oauth_flow.redirect_uri_path,
+                ):
+                    request = BoltRequest(body="", query=query, headers=self.headers)
+                    if request_path == oauth_flow.install_path:
+                        response = oauth_flow.handle_installation(request)
+                    else:
+                        response = oauth_flow.handle_callback(request)
+                    self._send(response.status, response.headers, response.body)
+                    return
+                page = pages.get(request_path)
+                if page is None:
+                    self._send(404, {})
+                    return
+                self._send(200, {"Content-Type": [content_type]}, page())
+
+            def do_POST(self):
+                started = time.perf_counter()
+                request_path, _, query = self.path.partition("?")
+                if path is None or request_path != path:
+                    self._send(404, {})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                request = BoltRequest(
+                    body=self.rfile.read(length).decode("utf-8"),
+                    query=query,
+                    headers=self.headers,
+                )
+                response: BoltResponse = app.dispatch(request)
+                self._send(response.status, response.headers, response.body)
+                if response_seconds is not None:
+                    observe_response(response_seconds, request, started)
+
+            def _send(
+                self,
+                status: int,
+                headers: Dict[str, Sequence[str]],
+                body: Union[str, dict] = "",
+            ):
+                data = (body if isinstance(body, str) else json.dumps(body)).encode()
+                self.send_response(status)
+                for name, values in headers.items():
+                    for value in values:
+                        self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.app = app
+        self.port = port
+        self._server = _Server(("0.0.0.0", port), Handler)
+
+    def start(self) -> None:
+        logging.getLogger(__name__).info(f"Listening on port {self.port}")
+        try:
+            self._server.serve_forever(0.05)
+        finally:
+            self._server.server_close()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
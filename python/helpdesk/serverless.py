@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from slack_bolt import App
+    from slack_bolt.adapter.aws_lambda import SlackRequestHandler
+
+
+class LazyLambdaHandler:
+    """An AWS Lambda handler that imports and builds the app on first use.
+
+    Importing this module imports nothing but typing, so a new execution
+    environment is ready to be invoked right away; Bolt, boto3, and the
+    app's clients are set up during the first invocation and reused by
+    the following ones. Lazy listeners run as separate invocations of
+    the same function (Bolt's LambdaLazyListenerRunner).
+
+    An execution environment is frozen as soon as an invocation returns,
+    along with any background threads, so `after` is called to finish
+    their work first.
+    """
+
+    def __init__(
+        self, load: Callable[[], "App"], after: Optional[Callable[[], None]] = None
+    ):
+        self.load = load
+        self.after = after
+        # Lambda runs one invocation at a time in an execution environment
+        self._handler: Optional["SlackRequestHandler"] = None
+
+    @property
+    def handler(self) -> "SlackRequestHandler":
+        if self._handler is None:
+            # boto3 is required only by serverless_app.py
+            from slack_bolt.adapter.aws_lambda import SlackRequestHandler
+
+            self._handler = SlackRequestHandler(self.load())
+        return self._handler
+
+    def __call__(self, event: dict, context: Any) -> Dict[str, Any]:
+        response = self.handler.handle(event, context)
+        if self.after is not None:
+            self.after()
+        return response
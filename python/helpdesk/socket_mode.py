@@ -0,0 +1,172 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Optional, Union
+
+from slack_bolt import Ack, App, BoltContext, BoltRequest, BoltResponse
+from slack_bolt.adapter.socket_mode.internals import build_headers
+from slack_sdk.socket_mode.builtin import SocketModeClient
+from slack_sdk.socket_mode.client import BaseSocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+
+from helpdesk.instrumentation import payload_type
+from helpdesk.metrics import HistogramFamily
+
+if TYPE_CHECKING:
+    from slack_sdk.socket_mode.async_client import AsyncBaseSocketModeClient
+
+
+def to_socket_mode_response(envelope_id: str, res: BoltResponse) -> SocketModeResponse:
+    """The same conversion as Bolt's SocketModeHandler."""
+    if not res.body:
+        return SocketModeResponse(envelope_id=envelope_id)
+    content_type = res.headers.get("content-type", [""])[0]
+    if content_type.startswith("application/json"):
+        return SocketModeResponse(envelope_id=envelope_id, payload=json.loads(res.body))
+    return SocketModeResponse(envelope_id=envelope_id, payload={"text": res.body})
+
+
+class Envelope:
+    """A Socket Mode request to acknowledge once, over the connection it came on.
+
+    Bolt's SocketModeHandler acknowledges when app.dispatch() returns, that
+    is, after all the work a listener does before returning. Here ack()
+    sends the acknowledgement right away (see envelope_acks).
+    """
+
+    __slots__ = ("client", "request", "received_at", "acked", "ack_seconds")
+
+    def __init__(
+        self,
+        client: Union[BaseSocketModeClient, "AsyncBaseSocketModeClient"],
+        request: SocketModeRequest,
+        ack_seconds: HistogramFamily,
+    ):
+        self.client = client
+        self.request = request
+        self.received_at = time.perf_counter()
+        self.acked = False
+        self.ack_seconds = ack_seconds
+
+    def __deepcopy__(self, memo: dict) -> "Envelope":
+        # Lazy listeners get a deep copy of the request, including its context
+        return self
+
+    def _response(self, res: BoltResponse) -> Optional[SocketModeResponse]:
+        if self.acked:
+            return None
+        self.acked = True
+        self.ack_seconds.observe(
+            payload_type(self.request.payload), time.perf_counter() - self.received_at
+        )
+        return to_socket_mode_response(self.request.envelope_id, res)
+
+    def send(self, res: BoltResponse) -> None:
+        response = self._response(res)
+        if response is not None:
+            self.client.send_socket_mode_response(response)
+
+    async def async_send(self, res: BoltResponse) -> None:
+        response = self._response(res)
+        if response is not None:
+            await self.client.send_socket_mode_response(response)
+
+
+class EnvelopeAck(Ack):
+    """An ack() that also sends the envelope's acknowledgement right away."""
+
+    def __init__(self, ack: Ack, envelope: Envelope):
+        super().__init__()
+        self.ack = ack
+        self.envelope = envelope
+
+    def __call__(self, *args, **kwargs) -> BoltResponse:
+        self.response = self.ack(*args, **kwargs)
+        self.envelope.send(self.response)
+        return self.response
+
+
+def envelope_acks(context: BoltContext, next: Callable[[], None]):
+    # Registered last, so this wraps the ack() of the earlier middleware
+    envelope = context.get("envelope")
+    if envelope is not None:
+        context["ack"] = EnvelopeAck(context.ack, envelope)
+    next()
+
+
+class SocketModeRunner:
+    """Runs an App's listeners over several Socket Mode connections.
+
+    Each connection's receive loop only hands requests over to a shared
+    pool of `concurrency` threads, which dispatch them to the app. The
+    envelope is acknowledged as soon as a listener calls ack().
+    """
+
+    def __init__(
+        self,
+        app: App,
+        app_token: str,
+        connections: int = 2,
+        concurrency: int = 10,
+        logger: Optional[logging.Logger] = None,
+        ack_seconds: Optional[HistogramFamily] = None,
+    ):
+        self.app = app
+        self.logger = logger or logging.getLogger(__name__)
+        # From receiving an envelope until acknowledging it, per payload type
+        self.ack_seconds = ack_seconds or HistogramFamily()
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="socket-mode"
+        )
+        self.clients: List[SocketModeClient] = []
+        for _ in range(connections):
+            # Its own pool only parses messages and calls _receive()
+            client = SocketModeClient(
+                app_token, logger=self.logger, web_client=app.client, concurrency=1
+            )
+            client.socket_mode_request_listeners.append(self._receive)
+            self.clients.append(client)
+        app.middleware(envelope_acks)
+
+    def _receive(self, client: SocketModeClient, req: SocketModeRequest) -> None:
+        envelope = Envelope(client, req, self.ack_seconds)
+        self.executor.submit(self._work, envelope)
+
+    def _work(self, envelope: Envelope) -> None:
+        try:
+            self._dispatch(envelope)
+        except Exception as e:
+            self.logger.exception(f"Failed to dispatch a request: {e}")
+
+    def _dispatch(self, envelope: Envelope) -> None:
+        req = envelope.request
+        res = self.app.dispatch(
+            BoltRequest(
+                mode="socket_mode",
+                body=req.payload,
+                headers=build_headers(req),
+                context={"envelope": envelope},
+            )
+        )
+        if res.status == 200:
+            # e.g. a duplicate delivery skipped by a middleware without ack()
+            envelope.send(res)
+        else:
+            self.logger.info(f"Unsuccessful Bolt execution result: {res.status}")
+
+    def connect(self) -> None:
+        for client in self.clients:
+            client.connect()
+
+    def start(self) -> None:
+        self.connect()
+        self.app.logger.info(f"Connected with {len(self.clients)} connections")
+        threading.Event().wait()
+
+    def close(self) -> None:
+        for client in self.clients:
+            client.close()
+        self.executor.shutdown()
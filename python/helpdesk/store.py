@@ -0,0 +1,264 @@
+import csv
+import logging
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from helpdesk.submissions import HelpdeskRequest
+from helpdesk.validation import parse_iso_date
+
+COLUMNS = (
+    "category",
+    "user_id",
+    "title",
+    "laptop_model",
+    "os",
+    "description",
+    "due_date",
+    "approver",
+    "team_id",
+    "enterprise_id",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    category TEXT,
+    user_id TEXT,
+    title TEXT,
+    laptop_model TEXT,
+    os TEXT,
+    description TEXT,
+    due_date TEXT,
+    approver TEXT,
+    team_id TEXT,
+    enterprise_id TEXT
+);
+CREATE INDEX IF NOT EXISTS submissions_team_user_id
+    ON submissions (team_id, user_id, id);
+CREATE INDEX IF NOT EXISTS submissions_team_approver
+    ON submissions (team_id, approver, id) WHERE approver IS NOT NULL;
+"""
+
+INSERT = (
+    f"INSERT INTO submissions (created_at, {', '.join(COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in COLUMNS)})"
+)
+SELECT = f"SELECT {', '.join(COLUMNS)} FROM submissions"
+
+
+def _to_row(request: HelpdeskRequest, created_at: float) -> tuple:
+    due_date = request.due_date.isoformat() if request.due_date else None
+    return (
+        created_at,
+        request.category,
+        request.user_id,
+        request.title,
+        request.laptop_model,
+        request.os,
+        request.description,
+        due_date,
+        request.approver,
+        request.team_id,
+        request.enterprise_id,
+    )
+
+
+def _from_row(row: tuple) -> HelpdeskRequest:
+    (
+        category,
+        user_id,
+        title,
+        laptop_model,
+        os,
+        description,
+        due_date,
+        approver,
+        team_id,
+        enterprise_id,
+    ) = row
+    return HelpdeskRequest(
+        category,
+        user_id,
+        title=title,
+        laptop_model=laptop_model,
+        os=os,
+        description=description,
+        due_date=parse_iso_date(due_date) if due_date else None,
+        approver=approver,
+        team_id=team_id,
+        enterprise_id=enterprise_id,
+    )
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[HelpdeskRequest]:
+    """Reads requests from CSV with a header row naming (some of) the COLUMNS.
+
+    Empty cells are None, as with the modals' unanswered fields.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = [header.index(c) if c in header else None for c in COLUMNS]
+    for line, row in enumerate(reader, start=2):
+        values = [
+            (row[p] or None) if p is not None and p < len(row) else None
+            for p in positions
+        ]
+        try:
+            yield _from_row(tuple(values))
+        except ValueError as e:
+            raise ValueError(f"line {line}: {e}") from e
+
+
+def open_read_only(path: str) -> sqlite3.Connection:
+    """Connects to an existing store's database without writing to it.
+
+    Raises sqlite3.OperationalError when there is no database at path.
+    """
+    uri = f"{pathlib.Path(path).absolute().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+
+def scan(
+    conn: sqlite3.Connection,
+    after_id: int = 0,
+    since: float = 0.0,
+    team_id: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[Tuple[int, float, HelpdeskRequest]]:
+    """Yields (id, created_at, request) for every committed submission.
+
+    Rows are read in id order, batch_size at a time, so memory use does
+    not grow with the table and no read transaction is held between
+    batches. after_id resumes from the last id seen before. With
+    team_id, only that workspace's submissions are read.
+    """
+    # "+team_id" keeps SQLite on the id order instead of the team_id
+    # indexes, which would need every batch sorted again
+    query = (
+        f"SELECT id, created_at, {', '.join(COLUMNS)} FROM submissions "
+        "WHERE id > ? AND created_at >= ?"
+        + (" AND +team_id = ?" if team_id is not None else "")
+        + " ORDER BY id LIMIT ?"
+    )
+    team = (team_id,) if team_id is not None else ()
+    while True:
+        rows = conn.execute(query, (after_id, since, *team, batch_size)).fetchall()
+        for row in rows:
+            yield row[0], row[1], _from_row(row[2:])
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1][0]
+
+
+class SubmissionStore:
+    """Helpdesk requests persisted in a local SQLite database (WAL mode).
+
+    add() hands the request to a single writer thread, which commits
+    everything queued since its previous commit in one transaction
+    (group commit), so a burst of submissions costs a few fsyncs instead of
+    one per request. Lookups by submitter or approver in a workspace go
+    through the (team_id, user_id, id) and (team_id, approver, id) indexes
+    and read only the matching rows.
+    """
+
+    def __init__(
+        self,
+        path: str = "helpdesk.db",
+        max_batch_size: int = 500,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="submission-store", daemon=True
+        )
+        self._writer.start()
+
+    def add(self, request: HelpdeskRequest) -> None:
+        self._queue.put(_to_row(request, time.time()))
+
+    def add_many(self, requests: Iterable[HelpdeskRequest]) -> None:
+        """Inserts requests synchronously in a single transaction."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(INSERT, (_to_row(r, now) for r in requests))
+
+    def flush(self) -> None:
+        """Blocks until every request passed to add() is committed."""
+        self._queue.join()
+
+    def by_user(
+        self, team_id: Optional[str], user_id: str, limit: int = 50
+    ) -> List[HelpdeskRequest]:
+        """Returns the user's latest submissions in the workspace, newest first."""
+        rows = self._connection().execute(
+            f"{SELECT} WHERE team_id IS ? AND user_id = ? ORDER BY id DESC LIMIT ?",
+            (team_id, user_id, limit),
+        )
+        return [_from_row(row) for row in rows]
+
+    def by_approver(
+        self, team_id: Optional[str], approver: str, limit: int = 50
+    ) -> List[HelpdeskRequest]:
+        """Returns the latest submissions waiting for the approver, newest first."""
+        rows = self._connection().execute(
+            f"{SELECT} WHERE team_id IS ? AND approver = ? ORDER BY id DESC LIMIT ?",
+            (team_id, approver, limit),
+        )
+        return [_from_row(row) for row in rows]
+
+    def scan(
+        self,
+        after_id: int = 0,
+        since: float = 0.0,
+        team_id: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Tuple[int, float, HelpdeskRequest]]:
+        """See scan()."""
+        return scan(self._connection(), after_id, since, team_id, batch_size)
+
+    def count(self) -> int:
+        return (
+            self._connection().execute("SELECT count(*) FROM submissions").fetchone()[0]
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write_loop(self) -> None:
+        conn = self._connection()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(INSERT, batch)
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to store {len(batch)} submissions: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
@@ -0,0 +1,331 @@
+import json
+from datetime import date
+from operator import attrgetter
+from typing import Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+from helpdesk.validation import (
+    Future,
+    MaxLength,
+    MinLength,
+    NotSubmitter,
+    OneOf,
+    Rule,
+    parse_iso_date,
+    today,
+)
+
+# All the input elements in the modals use the same action_id
+ACTION_ID = "element"
+
+
+class HelpdeskRequest:
+    __slots__ = (
+        "category",
+        "user_id",
+        "title",
+        "laptop_model",
+        "os",
+        "description",
+        "due_date",
+        "approver",
+        # The workspace (and organization) the request was submitted from
+        "team_id",
+        "enterprise_id",
+    )
+
+    def __init__(
+        self,
+        category: Optional[str],
+        user_id: Optional[str] = None,
+        title: Optional[str] = None,
+        laptop_model: Optional[str] = None,
+        os: Optional[str] = None,
+        description: Optional[str] = None,
+        due_date: Optional[date] = None,
+        approver: Optional[str] = None,
+        team_id: Optional[str] = None,
+        enterprise_id: Optional[str] = None,
+    ):
+        self.category = category
+        self.user_id = user_id
+        self.title = title
+        self.laptop_model = laptop_model
+        self.os = os
+        self.description = description
+        self.due_date = due_date
+        self.approver = approver
+        self.team_id = team_id
+        self.enterprise_id = enterprise_id
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"HelpdeskRequest({fields})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, HelpdeskRequest) and self.to_dict() == other.to_dict()
+
+
+# The slots between user_id and team_id, all filled from the modal's inputs
+_NO_FIELDS = (None,) * (len(HelpdeskRequest.__slots__) - 4)
+
+
+def _plain_text(state: dict) -> Optional[str]:
+    return state.get("value")
+
+
+def _selected_option(state: dict) -> Optional[str]:
+    option = state.get("selected_option")
+    return option["value"] if option else None
+
+
+def _selected_date(state: dict) -> Optional[date]:
+    value = state.get("selected_date")
+    return parse_iso_date(value) if value else None
+
+
+def _selected_user(state: dict) -> Optional[str]:
+    return state.get("selected_user")
+
+
+EXTRACTORS: Dict[str, Callable[[dict], object]] = {
+    "plain_text_input": _plain_text,
+    "static_select": _selected_option,
+    "external_select": _selected_option,
+    "datepicker": _selected_date,
+    "users_select": _selected_user,
+}
+
+
+class Field:
+    """An input block in a step2 modal and the rules applied to its value."""
+
+    __slots__ = (
+        "block_id",
+        "attribute",
+        "element_type",
+        "min_length",
+        "max_length",
+        "future",
+        "choices",
+        "not_submitter",
+    )
+
+    def __init__(
+        self,
+        block_id: str,
+        attribute: str,
+        element_type: str,
+        *,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        future: bool = False,
+        choices: Optional[Collection[str]] = None,
+        not_submitter: bool = False,
+    ):
+        self.block_id = block_id
+        self.attribute = attribute
+        self.element_type = element_type
+        self.min_length = min_length
+        self.max_length = max_length
+        self.future = future
+        self.choices = choices
+        self.not_submitter = not_submitter
+
+    def rules(self) -> List[Rule]:
+        name = self.block_id.capitalize().replace("-", " ")
+        rules: List[Rule] = []
+        if self.min_length is not None:
+            rules.append(
+                MinLength(
+                    self.min_length,
+                    f"{name} must be longer than {self.min_length - 1} characters",
+                )
+            )
+        if self.max_length is not None:
+            rules.append(
+                MaxLength(
+                    self.max_length,
+                    f"{name} must be {self.max_length} characters or shorter",
+                )
+            )
+        if self.future:
+            rules.append(Future(f"{name} must be in the future"))
+        if self.choices is not None:
+            rules.append(OneOf(self.choices, "Select one of the options"))
+        if self.not_submitter:
+            rules.append(NotSubmitter("Select someone other than you"))
+        return rules
+
+
+TITLE = Field("title", "title", "plain_text_input", min_length=6, max_length=150)
+LAPTOP_MODEL = Field("laptop-model", "laptop_model", "external_select")
+# The options of external_selects come from ./catalogs/<block_id>.csv,
+# which can change at any time, so their values are not checked here
+OS = Field("os", "os", "external_select")
+DESCRIPTION = Field("description", "description", "plain_text_input")
+DUE_DATE = Field("due-date", "due_date", "datepicker", future=True)
+APPROVER = Field("approver", "approver", "users_select", not_submitter=True)
+
+CATEGORY_FIELDS: Dict[str, Tuple[Field, ...]] = {
+    "laptop": (TITLE, LAPTOP_MODEL),
+    "mobile": (TITLE, OS, APPROVER, DUE_DATE),
+    "other": (TITLE, DESCRIPTION),
+}
+# Used when a submission does not tell its category in private_metadata
+ALL_FIELDS = (TITLE, LAPTOP_MODEL, OS, DESCRIPTION, DUE_DATE, APPROVER)
+
+
+class Validator:
+    """Checks HelpdeskRequests against the rules of their category's fields.
+
+    Each field's rules are built once. validate_many() checks a batch
+    column by column: every field's rules run once over the values of its
+    attribute in all the requests, with the same "today" for the whole
+    batch, and failures in requests whose category lacks the field are
+    dropped.
+    """
+
+    def __init__(
+        self,
+        category_fields: Dict[str, Sequence[Field]],
+        clock: Callable[[], date] = today,
+    ):
+        self.clock = clock
+        rules: Dict[Field, Tuple[Rule, ...]] = {}
+        for f in (*ALL_FIELDS, *(f for fs in category_fields.values() for f in fs)):
+            if f not in rules:
+                rules[f] = tuple(f.rules())
+        # Per category: ((attribute, block_id, rules), ...) for the fields
+        # with rules, and whether any of them needs "today"
+        self._rules = {
+            category: self._plan(fs, rules) for category, fs in category_fields.items()
+        }
+        self._fallback = self._plan(ALL_FIELDS, rules)
+        # Per field with rules: (field, rules, categories having it)
+        self._columns = [
+            (
+                f,
+                field_rules,
+                frozenset(c for c, fs in category_fields.items() if f in fs),
+            )
+            for f, field_rules in rules.items()
+            if field_rules
+        ]
+
+    @staticmethod
+    def _plan(fields: Sequence[Field], rules: Dict[Field, Tuple[Rule, ...]]) -> Tuple:
+        checks = tuple((f.attribute, f.block_id, rules[f]) for f in fields if rules[f])
+        uses_today = any(r.uses_today for _, _, rs in checks for r in rs)
+        return checks, uses_today
+
+    def validate(self, request: HelpdeskRequest) -> Dict[str, str]:
+        """Returns the errors to display on the modal, keyed by block_id."""
+        errors: Dict[str, str] = {}
+        checks, uses_today = self._rules.get(request.category, self._fallback)
+        today = self.clock() if uses_today else None
+        user_id = request.user_id
+        for attribute, block_id, rules in checks:
+            value = getattr(request, attribute)
+            if value is None:
+                continue
+            for rule in rules:
+                if not rule.ok(value, user_id, today):
+                    errors[block_id] = rule.message
+                    break
+        return errors
+
+    def validate_many(
+        self, requests: Sequence[HelpdeskRequest]
+    ) -> Dict[int, Dict[str, str]]:
+        """Returns the errors of the invalid requests, keyed by their index."""
+        results: Dict[int, Dict[str, str]] = {}
+        today = self.clock()
+        categories = list(map(attrgetter("category"), requests))
+        present = set(categories)
+        # Requests without a known category are checked against ALL_FIELDS
+        unknown = present.difference(self._rules)
+        user_ids = list(map(attrgetter("user_id"), requests))
+        for f, rules, known in self._columns:
+            applies = known | unknown if f in ALL_FIELDS else known
+            if not present & applies:
+                continue
+            everyone = present <= applies
+            values = list(map(attrgetter(f.attribute), requests))
+            for rule in rules:
+                for i in rule.failures(values, user_ids, today):
+                    if everyone or categories[i] in applies:
+                        errors = results.setdefault(i, {})
+                        errors.setdefault(f.block_id, rule.message)
+        return results
+
+
+class SubmissionParser:
+    """Turns view_submission payloads into HelpdeskRequest records.
+
+    The field specs are compiled into one (position, block_id, extractor)
+    tuple per category, so parsing is a single pass over the expected fields
+    without probing for the blocks the category does not have. The same
+    specs decide which rules validate() checks.
+    """
+
+    def __init__(self, category_fields: Dict[str, Sequence[Field]] = None):
+        self.category_fields = category_fields or CATEGORY_FIELDS
+        self._plans = {
+            category: self._compile(fields)
+            for category, fields in self.category_fields.items()
+        }
+        self._fallback = self._compile(ALL_FIELDS)
+        self.validator = Validator(self.category_fields)
+        # private_metadata string -> (category, plan)
+        self._metadata_cache: Dict[Optional[str], Tuple] = {}
+
+    @staticmethod
+    def _compile(fields: Sequence[Field]) -> Tuple:
+        return tuple(
+            (
+                HelpdeskRequest.__slots__.index(f.attribute),
+                f.block_id,
+                EXTRACTORS[f.element_type],
+            )
+            for f in fields
+        )
+
+    def parse(
+        self,
+        view: dict,
+        user_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        enterprise_id: Optional[str] = None,
+    ) -> HelpdeskRequest:
+        metadata = view.get("private_metadata")
+        resolved = self._metadata_cache.get(metadata)
+        if resolved is None:
+            category = category_from_metadata(metadata)
+            resolved = (category, self._plans.get(category, self._fallback))
+            if len(self._metadata_cache) < 1024:
+                self._metadata_cache[metadata] = resolved
+        category, plan = resolved
+        values = view["state"]["values"]
+        # HelpdeskRequest's positional arguments; keywords cost twice as much
+        args = [category, user_id, *_NO_FIELDS, team_id, enterprise_id]
+        for position, block_id, extract in plan:
+            state = values.get(block_id)
+            if state is not None:
+                args[position] = extract(state[ACTION_ID])
+        return HelpdeskRequest(*args)
+
+    def validate(self, request: HelpdeskRequest) -> Dict[str, str]:
+        """Returns the errors to display on the modal, keyed by block_id."""
+        return self.validator.validate(request)
+
+
+def category_from_metadata(metadata: Optional[str]) -> Optional[str]:
+    if not metadata:
+        return None
+    try:
+        return json.loads(metadata).get("category")
+    except (ValueError, AttributeError):
+        return None
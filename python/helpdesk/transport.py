@@ -0,0 +1,195 @@
+import http.client
+import io
+import socket
+import ssl as ssl_module
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+from slack_sdk import WebClient
+
+PoolKey = Tuple[str, str, Optional[int]]
+
+
+class ConnectionPool:
+    """Persistent HTTP/1.1 connections shared by every WebClient in the process.
+
+    urllib.request always sends "Connection: close", so each Web API call
+    pays a new TCP + TLS handshake. This pool keeps up to max_connections
+    keep-alive connections per host and hands the most recently used idle
+    one to the next request.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        idle_timeout: float = 60,
+        ssl: Optional[ssl_module.SSLContext] = None,
+    ):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.ssl = ssl
+        self.created = 0
+        self.reused = 0
+        self._idle: Dict[PoolKey, List[Tuple[float, http.client.HTTPConnection]]] = {}
+        self._slots: Dict[PoolKey, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        timeout: float,
+    ) -> http.client.HTTPResponse:
+        """Sends a request and returns the response with its body already read."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        slots = self._slots_for(key)
+        slots.acquire()
+        try:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                response = self._send(conn, method, path, body, headers)
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server may have closed an idle keep-alive connection
+                conn = self._connect(key, timeout)
+                try:
+                    response = self._send(conn, method, path, body, headers)
+                except BaseException:
+                    conn.close()
+                    raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return response
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = sum(len(c) for c in self._idle.values())
+        return {"created": self.created, "reused": self.reused, "idle": idle}
+
+    @staticmethod
+    def _send(conn, method, path, body, headers) -> http.client.HTTPResponse:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.data = response.read()
+        return response
+
+    def _slots_for(self, key: PoolKey) -> threading.BoundedSemaphore:
+        with self._lock:
+            slots = self._slots.get(key)
+            if slots is None:
+                slots = threading.BoundedSemaphore(self.max_connections)
+                self._slots[key] = slots
+            return slots
+
+    def _checkout(self, key: PoolKey, timeout: float):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                returned_at, conn = idle.pop()
+                if now - returned_at < self.idle_timeout:
+                    self.reused += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._connect(key, timeout), False
+
+    def _checkin(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append((time.monotonic(), conn))
+
+    def _connect(self, key: PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        with self._lock:
+            self.created += 1
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self.ssl
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.connect()
+        # Small request/response exchanges should not wait for Nagle's algorithm
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+
+class PooledWebClient(WebClient):
+    """WebClient sending requests through a shared ConnectionPool.
+
+    Proxied requests still go through urllib.
+    """
+
+    def __init__(self, *, pool: Optional[ConnectionPool] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def __deepcopy__(self, memo: dict) -> "PooledWebClient":
+        # Bolt deep-copies requests for lazy listeners; the copy has to keep
+        # sharing the pool (and the rate limit scheduler) with this client
+        return self
+
+    def _perform_urllib_http_request_internal(self, url: str, req: Request) -> dict:
+        if self.pool is None or self.proxy is not None:
+            return super()._perform_urllib_http_request_internal(url, req)
+        response = self.pool.request(
+            req.get_method(),
+            url,
+            req.data,
+            dict(req.header_items()),
+            self.timeout,
+        )
+        if response.status >= 400:
+            # The same as urlopen() so that WebClient's error handling applies
+            raise HTTPError(
+                url,
+                response.status,
+                response.reason,
+                response.headers,
+                io.BytesIO(response.data),
+            )
+        charset = response.headers.get_content_charset() or "utf-8"
+        body = response.data
+        if response.headers.get_content_type() != "application/gzip":
+            body = body.decode(charset)
+        return {"status": response.status, "headers": response.headers, "body": body}
+
+
+def create_session(
+    limit: int = 100,
+    limit_per_host: int = 10,
+    keepalive_timeout: float = 60,
+    timeout: float = 30,
+) -> "aiohttp.ClientSession":
+    """Returns an aiohttp session to share across all AsyncWebClient instances.
+
+    Without a session, AsyncWebClient creates and closes one per API call.
+    This has to be called while the event loop is running.
+    """
+    # aiohttp is required only by async_app.py
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    )
@@ -0,0 +1,293 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+
+# conversations.open errors meaning that asking again would not help
+NEGATIVE_ERRORS = (
+    "user_not_found",
+    "user_not_visible",
+    "user_disabled",
+    "cannot_dm_bot",
+)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: Hashable, value: Any, ttl: float) -> bool:
+        """Sets the value only when the key is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedCache:
+    """A TTL cache kept in a dict shared by processes (e.g., a Manager().dict()).
+
+    Every operation is a round trip to the process holding the dict, so it
+    is meant to sit behind a per-process TTLCache. Expiry uses wall-clock
+    time because monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, entries: MutableMapping, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries = entries
+        self._writes = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Returns (remaining ttl, value), or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ttl = entry[0] - time.time()
+        if ttl <= 0:
+            return None
+        return ttl, entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.time() + ttl, value)
+        self._writes += 1
+        if self._writes % 256 == 0 and len(self._entries) > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Drop expired entries first, then the ones closest to expiring
+        entries = sorted(self._entries.items(), key=lambda item: item[1][0])
+        now = time.time()
+        excess = len(entries) - self.max_size
+        for index, (key, (expires_at, _)) in enumerate(entries):
+            if index >= excess and expires_at > now:
+                break
+            self._entries.pop(key, None)
+
+
+class _BaseUserCache:
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self._cache = TTLCache(max_size)
+        # Set when several worker processes should share what they fetched
+        self.shared: Optional[SharedCache] = None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "api_calls": self.api_calls,
+        }
+
+    def _lookup(self, key: Hashable) -> Any:
+        value = self._cache.get(key)
+        if value is _MISSING and self.shared is not None:
+            value = self._lookup_shared(key)
+        self._count(value)
+        return value
+
+    def _lookup_shared(self, key: Hashable) -> Any:
+        entry = self.shared.get(key)
+        if entry is None:
+            return _MISSING
+        ttl, value = entry
+        self._cache.set(key, value, ttl)
+        return value
+
+    def _count(self, value: Any) -> None:
+        if value is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        ttl = self._ttl(value)
+        self._cache.set(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl)
+
+    def _ttl(self, value: Any) -> float:
+        return self.ttl if value is not None else self.negative_ttl
+
+
+class UserCache(_BaseUserCache):
+    """Caches the bot's DM channel IDs (from conversations.open) for WebClient.
+
+    Entries are per workspace, as each one has its own bot (and DMs).
+    Users who cannot be sent a DM are cached as None for negative_ttl
+    seconds. Concurrent misses for the same key wait for the one
+    in-flight API call.
+    """
+
+    def __init__(
+        self, max_size: int = 10_000, ttl: float = 3600, negative_ttl: float = 60
+    ):
+        super().__init__(max_size, ttl, negative_ttl)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def dm_channel(
+        self, client: WebClient, team_id: Optional[str], user_id: str
+    ) -> Optional[str]:
+        return self._get(("dm", team_id, user_id), lambda: self._open(client, user_id))
+
+    def _open(self, client: WebClient, user_id: str) -> Optional[str]:
+        try:
+            return client.conversations_open(users=user_id)["channel"]["id"]
+        except SlackApiError as e:
+            if e.response.get("error") in NEGATIVE_ERRORS:
+                return None
+            raise
+
+    def _get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result()
+        try:
+            self.api_calls += 1
+            value = fetch()
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class AsyncUserCache(_BaseUserCache):
+    """The AsyncWebClient version of UserCache.
+
+    Every access to the shared cache is a round trip to another process,
+    so it runs in the default executor instead of on the event loop.
+    """
+
+    def __init__(
+        self, max_size: int = 10_000, ttl: float = 3600, negative_ttl: float = 60
+    ):
+        super().__init__(max_size, ttl, negative_ttl)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def dm_channel(
+        self, client: "AsyncWebClient", team_id: Optional[str], user_id: str
+    ) -> Optional[str]:
+        return await self._get(
+            ("dm", team_id, user_id), lambda: self._open(client, user_id)
+        )
+
+    async def _open(self, client: "AsyncWebClient", user_id: str) -> Optional[str]:
+        try:
+            res = await client.conversations_open(users=user_id)
+            return res["channel"]["id"]
+        except SlackApiError as e:
+            if e.response.get("error") in NEGATIVE_ERRORS:
+                return None
+            raise
+
+    async def _get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        value = self._cache.get(key)
+        if value is _MISSING and self.shared is not None:
+            value = await asyncio.get_running_loop().run_in_executor(
+                None, self._lookup_shared, key
+            )
+        self._count(value)
+        if value is not _MISSING:
+            return value
+        future = self._in_flight.get(key)
+        if future is not None:
+            # shield() so that a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            self.api_calls += 1
+            value = await fetch()
+            await self._async_store(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _async_store(self, key: Hashable, value: Any) -> None:
+        ttl = self._ttl(value)
+        self._cache.set(key, value, ttl)
+        if self.shared is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.shared.set, key, value, ttl
+            )
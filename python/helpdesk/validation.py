@@ -0,0 +1,130 @@
+import functools
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Collection, List, Optional, Sequence, Tuple
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_iso_date(value: str) -> date:
+    """date.fromisoformat, cached; submissions share a few dozen due dates."""
+    return date.fromisoformat(value)
+
+
+class Today:
+    """date.today(), computed once a day instead of on every call."""
+
+    __slots__ = ("_cached",)
+
+    def __init__(self):
+        # (the next local midnight as a timestamp, today)
+        self._cached: Tuple[float, Optional[date]] = (0.0, None)
+
+    def __call__(self) -> date:
+        until, today = self._cached
+        if time.time() >= until:
+            today = date.today()
+            midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            self._cached = (midnight.timestamp(), today)
+        return today
+
+
+today = Today()
+
+
+class Rule(ABC):
+    """A check on a field value; None values are never checked.
+
+    ok() checks a single value, while failures() checks a column of values
+    from many requests and returns the positions of the failing ones.
+    """
+
+    __slots__ = ("message",)
+    # Whether ok() needs "today"; validators skip the clock otherwise
+    uses_today = False
+
+    def __init__(self, message: str):
+        self.message = message
+
+    @abstractmethod
+    def ok(self, value, user_id: Optional[str], today: date) -> bool: ...
+
+    def failures(
+        self, values: Sequence, user_ids: Sequence[Optional[str]], today: date
+    ) -> List[int]:
+        ok = self.ok
+        return [
+            i
+            for i, (v, u) in enumerate(zip(values, user_ids))
+            if v is not None and not ok(v, u, today)
+        ]
+
+
+class MinLength(Rule):
+    __slots__ = ("length",)
+
+    def __init__(self, length: int, message: str):
+        super().__init__(message)
+        self.length = length
+
+    def ok(self, value, user_id, today) -> bool:
+        return len(value) >= self.length
+
+    def failures(self, values, user_ids, today) -> List[int]:
+        n = self.length
+        return [i for i, v in enumerate(values) if v is not None and len(v) < n]
+
+
+class MaxLength(Rule):
+    __slots__ = ("length",)
+
+    def __init__(self, length: int, message: str):
+        super().__init__(message)
+        self.length = length
+
+    def ok(self, value, user_id, today) -> bool:
+        return len(value) <= self.length
+
+    def failures(self, values, user_ids, today) -> List[int]:
+        n = self.length
+        return [i for i, v in enumerate(values) if v is not None and len(v) > n]
+
+
+class Future(Rule):
+    __slots__ = ()
+    uses_today = True
+
+    def ok(self, value, user_id, today) -> bool:
+        return value > today
+
+    def failures(self, values, user_ids, today) -> List[int]:
+        return [i for i, v in enumerate(values) if v is not None and v <= today]
+
+
+class OneOf(Rule):
+    __slots__ = ("choices",)
+
+    def __init__(self, choices: Collection[str], message: str):
+        super().__init__(message)
+        self.choices = frozenset(choices)
+
+    def ok(self, value, user_id, today) -> bool:
+        return value in self.choices
+
+    def failures(self, values, user_ids, today) -> List[int]:
+        choices = self.choices
+        return [i for i, v in enumerate(values) if v is not None and v not in choices]
+
+
+class NotSubmitter(Rule):
+    __slots__ = ()
+
+    def ok(self, value, user_id, today) -> bool:
+        return value != user_id
+
+    def failures(self, values, user_ids, today) -> List[int]:
+        return [
+            i
+            for i, (v, u) in enumerate(zip(values, user_ids))
+            if v is not None and v == u
+        ]
@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Shared with the JavaScript app; set HELPDESK_MODALS_DIR where python/ is
+# deployed on its own (e.g. a Lambda bundle with a copy of them)
+MODALS_DIR = os.environ.get(
+    "HELPDESK_MODALS_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "src", "modals"),
+)
+
+# Modifies a view loaded from a file before it is compiled
+Transform = Callable[[dict], None]
+
+
+class TemplateError(Exception):
+    pass
+
+
+def freeze(value: Any) -> Any:
+    """Returns a read-only deep copy of a Block Kit structure."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def serialize(view: Mapping) -> str:
+    return json.dumps(view, separators=(",", ":"), default=_unfreeze)
+
+
+def _unfreeze(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def validate(view: Any, source: str = "view") -> None:
+    """Checks the parts of the Block Kit view schema the app relies on."""
+    if not isinstance(view, Mapping):
+        raise TemplateError(f"{source}: a view must be a JSON object")
+    if view.get("type") not in ("modal", "home"):
+        raise TemplateError(f"{source}: unsupported view type {view.get('type')!r}")
+    if view["type"] == "modal":
+        title = view.get("title")
+        if not isinstance(title, Mapping) or title.get("type") != "plain_text":
+            raise TemplateError(f"{source}: a modal requires a plain_text title")
+        if len(title.get("text", "")) > 24:
+            raise TemplateError(f"{source}: title must be 24 characters or less")
+    blocks = view.get("blocks")
+    if not isinstance(blocks, (list, tuple)) or len(blocks) > 100:
+        raise TemplateError(f"{source}: blocks must be a list of up to 100 items")
+    block_ids = set()
+    for index, block in enumerate(blocks):
+        if not isinstance(block, Mapping) or "type" not in block:
+            raise TemplateError(f"{source}: blocks[{index}] has no type")
+        block_id = block.get("block_id")
+        if block_id is not None:
+            if block_id in block_ids:
+                raise TemplateError(f"{source}: duplicate block_id {block_id!r}")
+            block_ids.add(block_id)
+        if block["type"] == "input":
+            element = block.get("element")
+            if "label" not in block or not isinstance(element, Mapping):
+                raise TemplateError(f"{source}: blocks[{index}] is an invalid input")
+            if "action_id" not in element:
+                raise TemplateError(f"{source}: blocks[{index}] has no action_id")
+
+
+class ViewTemplate:
+    """A validated view with a precompiled plan for per-request values.
+
+    Placeholders are declared as dotted paths such as
+    ``blocks.title.element.initial_value`` (``blocks.<block_id>`` selects a
+    block) or ``private_metadata``. The view is serialized once with a marker
+    at every placeholder position and split into literal segments, so
+    rendering a request-specific payload is a single string join instead of
+    a deep copy plus a full JSON encode.
+    """
+
+    def __init__(self, view: Mapping, placeholders: Optional[Dict[str, str]] = None):
+        validate(view)
+        self.view = freeze(view)
+        self.payload = serialize(self.view)
+        self._names: List[str] = []
+        self._segments: List[str] = [self.payload]
+        self._defaults: Dict[str, Any] = {}
+        if placeholders:
+            self._compile(view, placeholders)
+
+    def render(self, **values: Any) -> str:
+        if not values:
+            return self.payload
+        segments = self._segments
+        parts = [segments[0]]
+        for i, name in enumerate(self._names):
+            value = values.get(name, self._defaults[name])
+            parts.append(json.dumps(value))
+            parts.append(segments[i + 1])
+        return "".join(parts)
+
+    def _compile(self, view: Mapping, placeholders: Dict[str, str]) -> None:
+        marked = json.loads(json.dumps(view))
+        markers = {}
+        for name, path in placeholders.items():
+            container, key = _resolve(marked, path)
+            self._defaults[name] = container[key]
+            marker = f"\x00{name}\x00"
+            container[key] = marker
+            markers[json.dumps(marker)] = name
+        text = serialize(marked)
+        # Markers are split out in the order they appear in the JSON text
+        positions: List[Tuple[int, str]] = sorted((text.index(m), m) for m in markers)
+        segments, start = [], 0
+        for position, marker in positions:
+            segments.append(text[start:position])
+            self._names.append(markers[marker])
+            start = position + len(marker)
+        segments.append(text[start:])
+        self._segments = segments
+
+
+def _resolve(view: dict, path: str) -> Tuple[dict, str]:
+    keys = path.split(".")
+    node: Any = view
+    if keys[0] == "blocks" and len(keys) > 2:
+        node = next((b for b in view["blocks"] if b.get("block_id") == keys[1]), None)
+        keys = keys[2:]
+    for key in keys[:-1]:
+        node = node.get(key) if isinstance(node, dict) else None
+    if not isinstance(node, dict) or keys[-1] not in node:
+        raise TemplateError(f"placeholder path {path!r} does not exist")
+    return node, keys[-1]
+
+
+class TemplateLoader:
+    """Loads view templates from JSON files, memoized by file mtime."""
+
+    def __init__(self, directory: str = MODALS_DIR):
+        self.directory = directory
+        self._cache: Dict[Tuple, Tuple[int, ViewTemplate]] = {}
+
+    def load(
+        self,
+        filename: str,
+        placeholders: Optional[Dict[str, str]] = None,
+        transform: Optional[Transform] = None,
+    ) -> ViewTemplate:
+        path = os.path.join(self.directory, filename)
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, tuple(sorted((placeholders or {}).items())), transform)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            try:
+                view = json.load(f)
+            except ValueError as e:
+                raise TemplateError(f"{filename}: {e}") from e
+        try:
+            if transform is not None:
+                transform(view)
+            template = ViewTemplate(view, placeholders)
+        except TemplateError as e:
+            raise TemplateError(f"{filename}: {e}") from e
+        self._cache[key] = (mtime, template)
+        return template
+
+
+class ViewRegistry:
+    """Views built once at startup and handed to the client pre-serialized.
+
+    Each registered view is frozen so that no handler can mutate a shared
+    definition, and its JSON representation is computed up front.
+    views.open / views.update accept the view as a JSON-encoded string,
+    so handlers pass ``registry.payload(name)`` and the SDK no longer walks
+    the whole block tree on every request. Views loaded from files are
+    re-checked for changes at most once per ``reload_interval`` seconds;
+    a file that fails to load (e.g. half-written) is logged and the view
+    last loaded from it is kept.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[TemplateLoader] = None,
+        reload_interval: Optional[float] = 1.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.loader = loader or TemplateLoader()
+        self.reload_interval = reload_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._templates: Dict[str, ViewTemplate] = {}
+        self._sources: Dict[str, Tuple] = {}
+        self._next_check = 0.0
+
+    def register(
+        self,
+        name: str,
+        view: Mapping,
+        placeholders: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._templates[name] = ViewTemplate(view, placeholders)
+
+    def load(
+        self,
+        name: str,
+        filename: str,
+        placeholders: Optional[Dict[str, str]] = None,
+        transform: Optional[Transform] = None,
+    ) -> None:
+        self._templates[name] = self.loader.load(filename, placeholders, transform)
+        self._sources[name] = (filename, placeholders, transform)
+
+    def refresh(self) -> None:
+        for name, source in self._sources.items():
+            try:
+                self._templates[name] = self.loader.load(*source)
+            except Exception as e:
+                # e.g. TemplateError; handlers keep getting the last good view
+                self.logger.error(f"Failed to reload the {name} view: {e}")
+
+    def get(self, name: str) -> Mapping:
+        return self._template(name).view
+
+    def payload(self, name: str, **values: Any) -> str:
+        return self._template(name).render(**values)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def _template(self, name: str) -> ViewTemplate:
+        if self._sources and self.reload_interval is not None:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.reload_interval
+                self.refresh()
+        return self._templates[name]
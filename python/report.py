@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from helpdesk.reports import (
+    ReportAggregates,
+    build_report_message,
+    export_csv,
+    export_jsonl,
+)
+from helpdesk.store import open_read_only, scan
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Export and summarize requests")
+    parser.add_argument("command", choices=("csv", "jsonl", "summary"))
+    parser.add_argument("--db", default=os.environ.get("HELPDESK_DB", "helpdesk.db"))
+    parser.add_argument(
+        "--since", help="only the requests submitted on or after this date"
+    )
+    parser.add_argument("--team", help="only the requests from this workspace ID")
+    parser.add_argument(
+        "--text", action="store_true", help="print the summary as mrkdwn"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        # Read only; nothing is created or changed, even with a mistyped --db
+        conn = open_read_only(args.db)
+        conn.execute("SELECT 1 FROM submissions LIMIT 1")
+    except sqlite3.Error as e:
+        parser.error(f"cannot read requests from {args.db}: {e}")
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else 0.0
+    # Rows are read from the database in batches and written out one by one
+    rows = scan(conn, since=since, team_id=args.team)
+    if args.command == "csv":
+        count = export_csv(rows, sys.stdout)
+    elif args.command == "jsonl":
+        count = export_jsonl(rows, sys.stdout)
+    else:
+        aggregates = ReportAggregates()
+        for _, created_at, request in rows:
+            aggregates.add(created_at, request)
+        summary = aggregates.to_dict()
+        print(
+            build_report_message(summary, max_approvers=sys.maxsize)
+            if args.text
+            else json.dumps(summary, indent=2)
+        )
+        count = aggregates.total
+    print(f"{count} requests", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+# python report.py csv --since 2020-09-01 > requests.csv
+# python report.py jsonl > requests.jsonl
+# python report.py summary --team T12345678 [--text]
@@ -0,0 +1,36 @@
+import os
+
+from helpdesk.serverless import LazyLambdaHandler
+
+# No auth.test call while booting; Bolt makes it on the first request instead
+os.environ.setdefault("SLACK_TOKEN_VERIFICATION", "false")
+# The only writable directory in Lambda; each execution environment has its own
+os.environ.setdefault("HELPDESK_DB", "/tmp/helpdesk.db")
+
+
+def load_app():
+    # Bolt, the listeners, and their clients, on the first invocation
+    from app import app
+
+    return app
+
+
+def finish_background_work():
+    from app import log_listener, notifications, store
+
+    # The execution environment may be frozen (or never thawed) right after,
+    # so nothing is left for a later invocation, including held digests
+    notifications.join()
+    notifications.flush()
+    store.flush()
+    log_listener.join()
+
+
+# The same listeners as app.py, behind API Gateway or a function URL
+handler = LazyLambdaHandler(load_app, after=finish_background_work)
+
+# pip install -r requirements_serverless.txt
+# cp -r ../src/modals ./modals (the bundle has python/ only)
+# Handler: serverless_app.handler (needs lambda:InvokeFunction on itself)
+# Environment: SLACK_BOT_TOKEN, SLACK_SIGNING_SECRET, HELPDESK_MODALS_DIR=modals,
+#   LOG_FORMAT=json, ...
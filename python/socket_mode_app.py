@@ -0,0 +1,34 @@
+import os
+import threading
+
+from app import app, metrics
+from helpdesk.server import AppServer
+from helpdesk.socket_mode import SocketModeRunner
+
+# The same listeners as app.py, receiving requests over WebSocket connections
+# instead of on a public HTTP endpoint (no request signatures to verify)
+runner = SocketModeRunner(
+    app,
+    app_token=os.environ["SLACK_APP_TOKEN"],
+    # Slack allows up to 10 connections per app; each request comes on one
+    connections=int(os.environ.get("SOCKET_MODE_CONNECTIONS", 2)),
+    # Threads running the listeners, whatever the number of connections
+    concurrency=int(os.environ.get("SOCKET_MODE_CONCURRENCY", 10)),
+    # Each envelope's acknowledgement is its response to Slack
+    ack_seconds=metrics.ack_seconds,
+)
+
+if __name__ == "__main__":
+    # No requests from Slack over HTTP; only /metrics for Prometheus to scrape
+    metrics_server = AppServer(
+        app,
+        port=int(os.environ.get("PORT", 3000)),
+        path=None,
+        pages={"/metrics": metrics.render},
+    )
+    threading.Thread(target=metrics_server.start, daemon=True).start()
+    runner.start()
+
+# export SLACK_APP_TOKEN=xapp-***
+# export SLACK_BOT_TOKEN=xoxb-***
+# python socket_mode_app.py